@@ -0,0 +1,236 @@
+"""
+Batch command-line query runner.
+
+Loads the knowledge base once, then reads one JSON query per line from a file or stdin
+and writes one JSON result per line as soon as each query is answered.
+
+Query lines look like:
+    {"id": 1, "relation": "sibling", "args": [null, "Alice"]}
+    {"id": 2, "helper": "is_cousin_within_n", "args": ["Sarah", "George", 2]}
+    {"id": 3, "ask": "step_parent(X, \\"Sophia\\") & is_male(X)"}
+
+In "relation" queries, null arguments are left unbound and returned in the results.
+Adding "limit", "offset" and/or "after" returns one page and a "next" keyset cursor; pass it
+back as "after" to get the following page (null when there are no more rows):
+    {"id": 4, "relation": "cousin", "args": [null, null], "limit": 50, "after": ["Adam", "Ella"]}
+Any query may carry "limits", e.g. {"max_seconds": 2, "max_derived": 100000, "max_results": 500},
+overriding the defaults set with --max-seconds, --max-derived and --max-results (see src.governor).
+A query that crosses a limit fails with the partial statistics in "stats".
+Step and in-law relation queries may carry "as_of" (an ISO date), answering them for the
+family as it stood on that date (see src.timeline); the second argument must be bound:
+    {"id": 5, "relation": "step_parent", "args": [null, "David"], "as_of": "1990-06-01"}
+
+Example usage:
+    python family-expert-system/src/cli.py queries.jsonl > results.jsonl
+    cat queries.jsonl | python family-expert-system/src/cli.py -
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import json
+import time
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+from src.metrics import ask
+from src.facts import CSV_FILEPATH
+from src.closures import CLOSURE_RELATIONS
+from src.pagination import iter_relation, page_relation, query_string
+from src.governor import QueryLimitExceeded, check_result_count, check_time, query_limits, set_default_limits
+from src import queries
+
+# Helpers from src.queries that can be called by name
+HELPERS: Dict[str, Callable[..., Any]] = {
+    'relatives_within_generations': queries.relatives_within_generations,
+    'unrelated_individuals': queries.unrelated_individuals,
+    'is_direct_line_of_descent': queries.is_direct_line_of_descent,
+    'is_aunt_or_uncle': queries.is_aunt_or_uncle,
+    'is_cousin_within_n': queries.is_cousin_within_n,
+    'ancestors_at': queries.ancestors_at,
+    'descendants_at': queries.descendants_at,
+    'kinship_coefficient': queries.kinship_coefficient,
+    'kinship_coefficients': queries.kinship_coefficients,
+    'find_person': queries.find_person,
+    'kinship_profile': queries.kinship_profile,
+    'closest_relatives': queries.closest_relatives,
+    'what_if': queries.what_if,
+    'relatives_as_of': queries.relatives_as_of,
+    'has_multiple_marriages': queries.has_multiple_marriages,
+}
+
+def _to_json_value(value: Any) -> Any:
+    """Converts helper results (sets, tuples) into JSON-friendly values."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_to_json_value(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    return value
+
+def _relation_query(relation: str, args: List[Any]) -> Any:
+    """
+    Builds and runs a pyDatalog query for relation(args), where None arguments are unbound.
+    The recursive relations are read from the closure table instead (see src.closures).
+
+    Returns:
+        True/False when every argument is bound, a sorted list of names when one argument
+        is unbound, otherwise a sorted list of rows.
+    """
+    num_unbound = sum(arg is None for arg in args)
+    if relation in CLOSURE_RELATIONS:
+        # No engine evaluation to govern: the limits are checked row by row instead
+        rows = iter_relation(relation, args)
+        if num_unbound == 0:
+            return next(rows, None) is not None
+        position = args.index(None) if num_unbound == 1 else None
+        results = []
+        for row in rows:
+            check_time()
+            results.append(row[position] if position is not None else list(row))
+            check_result_count(len(results))
+        return results
+
+    answer = ask(query_string(relation, args))
+
+    if num_unbound == 0:
+        return bool(answer)
+    if not answer:
+        return []
+    if num_unbound == 1:
+        return sorted(set(str(r[0]) for r in answer.answers))
+    return [list(r) for r in sorted(set(tuple(str(v) for v in r) for r in answer.answers))]
+
+def _relation_as_of(relation: str, args: List[Any], as_of: str) -> Any:
+    """
+    Runs relation(args) on the family as of a date, shaped like _relation_query.
+
+    Raises:
+        ValueError: If the second argument is unbound, or as FamilyTimeline.relatives.
+    """
+    if len(args) != 2 or args[1] is None:
+        raise ValueError("as_of queries need two arguments with the second one bound")
+    relatives = queries.relatives_as_of(relation, args[1], as_of)
+    return args[0] in relatives if args[0] is not None else relatives
+
+def _relation_page(query: Dict[str, Any]) -> Tuple[Any, Optional[List[str]]]:
+    """
+    Runs a paginated relation query ("limit", "offset" and/or "after" present).
+
+    Returns:
+        (results, next_cursor), with results shaped like those of _relation_query.
+    """
+    args = list(query.get("args", []))
+    rows, cursor = page_relation(query["relation"], args, limit=query.get("limit", 100),
+                                 after=query.get("after"), offset=query.get("offset", 0))
+    unbound = [i for i, arg in enumerate(args) if arg is None]
+    if len(unbound) == 1:
+        results = [row[unbound[0]] for row in rows]
+    else:
+        results = [[row[i] for i in unbound] for row in rows]
+    return results, list(cursor) if cursor is not None else None
+
+def execute_query(query: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Executes one query against the currently loaded KB.
+
+    Args:
+        query: A dict with either "relation" and "args", "helper" and "args", or "ask".
+
+    Returns:
+        A JSON-serializable dict echoing the query "id", with "ok", "results" (or "error",
+        plus "stats" when a limit was crossed), "next" for paginated queries, and "elapsed_ms".
+    """
+    result: Dict[str, Any] = {"id": query.get("id")}
+    start = time.perf_counter()
+    try:
+        with query_limits(**query.get("limits", {})):
+            if "relation" in query and any(key in query for key in ("limit", "offset", "after")):
+                results, result["next"] = _relation_page(query)
+            elif "relation" in query and "as_of" in query:
+                results = _relation_as_of(query["relation"], list(query.get("args", [])), query["as_of"])
+            elif "relation" in query:
+                results = _relation_query(query["relation"], list(query.get("args", [])))
+            elif "helper" in query:
+                helper = HELPERS.get(query["helper"])
+                if helper is None:
+                    raise ValueError(f"Unknown helper: {query['helper']}")
+                results = _to_json_value(helper(*query.get("args", [])))
+            elif "ask" in query:
+                answer = ask(query["ask"])
+                rows = sorted(set(tuple(str(v) for v in r) for r in answer.answers)) if answer else []
+                results = [list(r) for r in rows]
+            else:
+                raise ValueError("Query must contain one of 'relation', 'helper' or 'ask'")
+            if isinstance(results, list):
+                check_result_count(len(results))
+        result["results"] = results
+        result["ok"] = True
+    except QueryLimitExceeded as exc:
+        result["ok"] = False
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        result["stats"] = {**exc.stats, "elapsed_s": round(exc.stats["elapsed_s"], 6)}
+    except Exception as exc:  # one bad line must not stop the batch
+        result["ok"] = False
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+def run_batch(lines: Iterable[str], out: IO[str]) -> int:
+    """
+    Executes JSON query lines one by one, writing and flushing one JSON result per line.
+    Blank lines are skipped; lines that are not valid JSON produce an error result.
+
+    Returns:
+        The number of queries processed.
+    """
+    count = 0
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = json.loads(line)
+            if not isinstance(query, dict):
+                raise ValueError("Query line must be a JSON object")
+        except ValueError as exc:
+            result = {"id": None, "line": line_number, "ok": False, "error": f"Invalid query: {exc}"}
+        else:
+            result = execute_query(query)
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        count += 1
+    return count
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run family relation queries from a JSONL file or stdin.")
+    parser.add_argument("queries", nargs="?", default="-", help="JSONL query file, or '-' for stdin (default)")
+    parser.add_argument("--csv", default=CSV_FILEPATH, help="Family facts CSV (or .npz/.parquet tables file) to load")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file, or '-' for stdout (default)")
+    parser.add_argument("--max-seconds", type=float, help="Default wall-time limit per query")
+    parser.add_argument("--max-derived", type=int, help="Default limit on facts derived per query")
+    parser.add_argument("--max-results", type=int, help="Default limit on results per query")
+    args = parser.parse_args(argv)
+    set_default_limits(max_seconds=args.max_seconds, max_derived=args.max_derived, max_results=args.max_results)
+
+    in_stream = sys.stdin if args.queries == "-" else open(args.queries, encoding="utf-8")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        with contextlib.ExitStack() as stack:
+            # The loading summary goes to stderr so that stdout only carries JSON results
+            with contextlib.redirect_stdout(sys.stderr):
+                stack.enter_context(queries.kb_session(args.csv))
+            run_batch(in_stream, out_stream)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
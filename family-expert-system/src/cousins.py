@@ -0,0 +1,137 @@
+"""
+All-pairs cousin degree and removal for a family component, computed with NumPy.
+
+Each member gets an ancestor-depth vector (the fewest parent links up to every
+ancestor, 0 for themselves). For a pair (x, y), the common ancestor minimizing
+depth_x + depth_y decides the relationship (ties go to the closer line):
+    degree  = min(depth_x, depth_y) - 1    (1 = first cousins, 2 = second cousins, ...)
+    removal = |depth_x - depth_y|          (0 = same generation, 1 = once removed, ...)
+Pairs that are not cousins (the same person, direct line, siblings, aunts/uncles, or
+unrelated) get -1 in both matrices. Rows are computed in blocks with a vectorized
+min-plus reduction, so large components can be streamed block by block.
+
+Example usage:
+    names, degree, removal = cousin_matrix(graph, graph.component_of("John"))
+    cousin_relationship(graph, "Nora", "Noah")    # (1, 1): first cousins once removed
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.graph import FamilyGraph
+
+NOT_COUSINS = -1
+_UNREACHABLE = 1 << 14  # depth used for "not an ancestor"; larger than any real depth
+_BLOCK_BYTES = 64 << 20  # memory budget for one block's (rows x members x ancestors) reduction
+
+def _ancestor_depths(graph: FamilyGraph, person: str, biological_only: bool) -> dict:
+    """Fewest parent links from person to each ancestor (breadth-first, cycle safe)."""
+    parents_of = graph.biological_parents if biological_only else graph.parents
+    depths = {person: 0}
+    frontier = [person]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for x in frontier:
+            for p in parents_of(x):
+                if p not in depths:
+                    depths[p] = depth
+                    next_frontier.append(p)
+        frontier = next_frontier
+    return depths
+
+def ancestor_depth_matrix(graph: FamilyGraph, members: Sequence[str],
+                          biological_only: bool = False) -> Tuple[np.ndarray, List[str]]:
+    """
+    Builds the members x ancestors matrix of depths (unreachable entries are a large sentinel).
+
+    Returns:
+        (depths, ancestor_names), with one column per person that is an ancestor (or self) of a member.
+    """
+    per_member = [_ancestor_depths(graph, m, biological_only) for m in members]
+    ancestor_names = sorted(set().union(*per_member)) if per_member else []
+    column = {name: i for i, name in enumerate(ancestor_names)}
+    depths = np.full((len(members), len(ancestor_names)), _UNREACHABLE, dtype=np.int32)
+    for row, member_depths in enumerate(per_member):
+        cols = [column[a] for a in member_depths]
+        depths[row, cols] = list(member_depths.values())
+    return depths, ancestor_names
+
+def _relationship_block(block: np.ndarray, depths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Degree and removal of the rows in block against every row of depths."""
+    left = block[:, None, :]
+    right = depths[None, :, :]
+    total = (left + right).astype(np.int64)
+    closer = np.minimum(left, right)
+    # Minimize total depth first, then the closer of the two lines, in a single reduction
+    key = (total * (_UNREACHABLE * 4) + closer).min(axis=2)
+    total_min = key // (_UNREACHABLE * 4)
+    closer_min = key % (_UNREACHABLE * 4)
+
+    is_cousin = (closer_min >= 2) & (total_min < _UNREACHABLE)
+    degree = np.where(is_cousin, closer_min - 1, NOT_COUSINS).astype(np.int16)
+    removal = np.where(is_cousin, total_min - 2 * closer_min, NOT_COUSINS).astype(np.int16)
+    return degree, removal
+
+def iter_cousin_blocks(graph: FamilyGraph, members: Sequence[str], block_size: Optional[int] = None,
+                       biological_only: bool = False) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Streams the cousin matrices in row blocks.
+
+    Args:
+        graph: The family graph.
+        members: The people to relate (typically one connected component).
+        block_size: Rows per block; by default sized to keep each block's reduction within ~64 MB.
+        biological_only: Follow only father/mother links, ignoring adoptions.
+
+    Yields:
+        (row_start, degree_block, removal_block) with blocks of shape (rows, len(members)).
+    """
+    depths, _ = ancestor_depth_matrix(graph, members, biological_only)
+    # Only ancestors shared by two or more members can relate anyone
+    depths = depths[:, (depths < _UNREACHABLE).sum(axis=0) >= 2]
+    reachable = depths < _UNREACHABLE
+    if block_size is None:
+        per_row = max(1, depths.shape[0] * depths.shape[1] * 8 * 3)
+        block_size = max(1, _BLOCK_BYTES // per_row)
+    for start in range(0, len(members), block_size):
+        block = depths[start:start + block_size]
+        degree = np.full((len(block), len(members)), NOT_COUSINS, dtype=np.int16)
+        removal = degree.copy()
+        # Restrict the reduction to the block's ancestors and the members sharing one of them
+        cols = reachable[start:start + block_size].any(axis=0)
+        rows = reachable[:, cols].any(axis=1)
+        if cols.any():
+            degree[:, rows], removal[:, rows] = _relationship_block(block[:, cols], depths[rows][:, cols])
+        yield start, degree, removal
+
+def cousin_matrix(graph: FamilyGraph, members: Optional[Sequence[str]] = None, block_size: Optional[int] = None,
+                  biological_only: bool = False) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Dense cousin degree and removal matrices for members (default: everyone in the graph).
+
+    Returns:
+        (names, degree, removal), where degree[i, j] and removal[i, j] relate names[i] and names[j].
+    """
+    names = list(graph.names if members is None else members)
+    degree = np.empty((len(names), len(names)), dtype=np.int16)
+    removal = np.empty_like(degree)
+    for start, degree_block, removal_block in iter_cousin_blocks(graph, names, block_size, biological_only):
+        degree[start:start + len(degree_block)] = degree_block
+        removal[start:start + len(removal_block)] = removal_block
+    return names, degree, removal
+
+def cousin_relationship(graph: FamilyGraph, x: str, y: str,
+                        biological_only: bool = False) -> Optional[Tuple[int, int]]:
+    """(degree, removal) if x and y are cousins, otherwise None."""
+    _, degree, removal = cousin_matrix(graph, [x, y], biological_only=biological_only)
+    return (int(degree[0, 1]), int(removal[0, 1])) if degree[0, 1] != NOT_COUSINS else None
@@ -0,0 +1,225 @@
+"""
+Bulk export of every derived relationship to (compressed) CSV or JSONL files.
+
+Derived relations never connect people of different family components (every rule
+joins through parent links and marriages), so the family is split into components.
+A component larger than its share of the family is further split into ranges of names:
+each range loads the whole component but only exports the rows whose first argument
+lies in the range, so several workers share one large family. The pieces are packed
+into balanced partitions, and each partition is loaded into its own knowledge base
+(see src.instances) and evaluated in a worker process.
+
+Workers stream rows one person at a time (see src.pagination.iter_relation) and write
+one part file per relation and partition; the parts are then concatenated into one file
+per relation (gzip members concatenate into a valid gzip file). Only one person's answers
+are held in memory, not a whole relation.
+
+Rows are sorted within a partition, and partitions follow each other in order.
+Throughput is reported per relation: rows, evaluation time summed over the workers,
+rows per second and bytes written.
+
+Example usage:
+    stats = export_relations("out/", fmt="jsonl", workers=4)
+    stats["cousin"]        # {'rows': 212, 'seconds': 0.08, 'rows_per_s': 2650.0, 'bytes': 1432, ...}
+
+    python src/export.py out/ --format csv --workers 4
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import argparse
+import csv
+import gzip
+import heapq
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, IO, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import pandas as pd
+from tabulate import tabulate
+
+from src.facts import CSV_FILEPATH, load_facts_dataframe
+from src.graph import FamilyGraph
+from src.instances import FamilyKB
+from src.pagination import iter_relation
+from src.rules import DERIVED_RELATIONS, RELATION_ARITIES
+
+FORMATS = ("csv", "jsonl")
+COMPRESSIONS = ("gzip", None)
+
+# Column names of the exported rows, by arity: relation(x, y) reads "x is the <relation> of y"
+COLUMNS = {1: ("x",), 2: ("x", "y")}
+
+# A partition: the names whose knowledge base it loads, and the names whose rows it exports
+Partition = Tuple[List[str], List[str]]
+
+def plan_partitions(graph: FamilyGraph, num_partitions: int) -> List[Partition]:
+    """
+    Splits the family into at most num_partitions partitions exporting a similar number of
+    people. Components larger than their share are split into ranges of names, which
+    still load the whole component; the pieces are packed largest first, each into the
+    currently smallest partition.
+
+    Returns:
+        Non-empty (loaded, exported) pairs of sorted name lists; every name is exported
+        by exactly one partition, which loads its whole component.
+    """
+    num_partitions = max(num_partitions, 1)
+    share = -(-len(graph.names) // num_partitions)
+    pieces = []
+    for component in graph.components():
+        num_ranges = -(-len(component) // share) if share else 1
+        size = -(-len(component) // num_ranges)
+        pieces.extend((component, component[i:i + size]) for i in range(0, len(component), size))
+
+    heap = [(0, i) for i in range(num_partitions)]
+    loaded: List[Set[str]] = [set() for _ in heap]
+    exported: List[List[str]] = [[] for _ in heap]
+    for component, names in sorted(pieces, key=lambda piece: -len(piece[1])):
+        size, i = heapq.heappop(heap)
+        loaded[i].update(component)
+        exported[i].extend(names)
+        heapq.heappush(heap, (size + len(names), i))
+    return [(sorted(members), sorted(names)) for members, names in zip(loaded, exported) if names]
+
+def file_name(relation: str, fmt: str, compression: Optional[str]) -> str:
+    return f"{relation}.{fmt}" + (".gz" if compression == "gzip" else "")
+
+def _open(path: str, compression: Optional[str]) -> IO[str]:
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+def _write_rows(handle: IO[str], relation: str, rows: Iterable[Tuple[str, ...]], fmt: str) -> None:
+    if fmt == "csv":
+        csv.writer(handle).writerows(rows)
+    else:
+        columns = COLUMNS[RELATION_ARITIES[relation]]
+        for row in rows:
+            handle.write(json.dumps(dict(zip(columns, row))) + "\n")
+
+def _export_partition(index: int, records: List[Dict[str, Any]], names: List[str], relations: Sequence[str],
+                      fmt: str, compression: Optional[str], part_dir: str) -> Dict[str, Tuple[int, float]]:
+    """
+    Worker: loads one partition and writes one part file per relation, with the rows
+    whose first argument is one of names, evaluated one person at a time.
+
+    Returns:
+        relation -> (number of rows, evaluation and writing time in seconds)
+    """
+    kb = FamilyKB(f"partition-{index}")
+    kb.load(pd.DataFrame.from_records(records))
+    stats = {}
+    with kb.activate():
+        for relation in relations:
+            start = time.perf_counter()
+            unbound = [None] * (RELATION_ARITIES[relation] - 1)
+            num_rows = 0
+            with _open(os.path.join(part_dir, f"{relation}.{index:05d}"), compression) as handle:
+                for name in names:
+                    rows = list(iter_relation(relation, [name] + unbound))
+                    _write_rows(handle, relation, rows, fmt)
+                    num_rows += len(rows)
+            stats[relation] = (num_rows, time.perf_counter() - start)
+    kb.drop()
+    return stats
+
+def _merge_parts(output_path: str, relation: str, fmt: str, compression: Optional[str],
+                 part_dir: str, num_partitions: int) -> None:
+    """Concatenates the header (CSV only) and the part files of relation into output_path."""
+    header = os.path.join(part_dir, f"{relation}.header")
+    with _open(header, compression) as handle:
+        if fmt == "csv":
+            csv.writer(handle).writerow(COLUMNS[RELATION_ARITIES[relation]])
+    parts = [header] + [os.path.join(part_dir, f"{relation}.{i:05d}") for i in range(num_partitions)]
+    with open(output_path, "wb") as out:
+        for part in parts:
+            with open(part, "rb") as handle:
+                shutil.copyfileobj(handle, out)
+            os.remove(part)
+
+def export_relations(output_dir: str, relations: Optional[Iterable[str]] = None, fmt: str = "csv",
+                     compression: Optional[str] = "gzip", workers: Optional[int] = None,
+                     source: Union[str, pd.DataFrame] = CSV_FILEPATH) -> Dict[str, Dict[str, float]]:
+    """
+    Exports every row of the given relations, one file per relation.
+
+    Args:
+        output_dir: Directory of the output files (created if missing), e.g. out/cousin.csv.gz.
+        relations: Relations to export (default: every derived relation).
+        fmt: "csv" (with an x,y header) or "jsonl" ({"x": ..., "y": ...} per line).
+        compression: "gzip" or None.
+        workers: Worker processes (default: one per CPU); 1 evaluates in this process.
+        source: A family facts CSV path or a DataFrame from load_facts_dataframe.
+
+    Returns:
+        relation -> {"rows", "seconds", "rows_per_s", "bytes", "path"}, plus "_total" with
+        the overall rows, wall-clock seconds, rows per second and partition count.
+
+    Raises:
+        ValueError: If the format, compression or a relation is unknown.
+    """
+    relations = list(DERIVED_RELATIONS if relations is None else relations)
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}, got '{fmt}'")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS}, got '{compression}'")
+    unknown = [r for r in relations if r not in RELATION_ARITIES]
+    if unknown:
+        raise ValueError(f"Unknown relations: {unknown}")
+
+    start = time.perf_counter()
+    df = source if isinstance(source, pd.DataFrame) else load_facts_dataframe(source)
+    workers = workers or os.cpu_count() or 1
+    partitions = plan_partitions(FamilyGraph.from_dataframe(df), workers)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as part_dir:
+        jobs = [(i, df[df["Name"].isin(members)].to_dict("records"), names, relations, fmt, compression, part_dir)
+                for i, (members, names) in enumerate(partitions)]
+        if workers == 1:
+            results = [_export_partition(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                results = list(pool.map(_export_partition, *zip(*jobs)))
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for relation in relations:
+            path = os.path.join(output_dir, file_name(relation, fmt, compression))
+            _merge_parts(path, relation, fmt, compression, part_dir, len(partitions))
+            rows = sum(result[relation][0] for result in results)
+            seconds = sum(result[relation][1] for result in results)
+            stats[relation] = {"rows": rows, "seconds": seconds,
+                               "rows_per_s": rows / seconds if seconds else float("inf"),
+                               "bytes": os.path.getsize(path), "path": path}
+
+    elapsed = time.perf_counter() - start
+    total_rows = sum(s["rows"] for s in stats.values())
+    stats["_total"] = {"rows": total_rows, "seconds": elapsed, "rows_per_s": total_rows / elapsed,
+                       "bytes": sum(s["bytes"] for s in stats.values()), "partitions": len(partitions)}
+    return stats
+
+def format_stats(stats: Dict[str, Dict[str, float]]) -> str:
+    table = [[relation, s["rows"], f"{s['seconds']:.3f}", f"{s['rows_per_s']:.0f}", s["bytes"]]
+             for relation, s in stats.items()]
+    return tabulate(table, headers=["relation", "rows", "seconds", "rows/s", "bytes"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export every derived relationship to CSV or JSONL files.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--source", default=CSV_FILEPATH, help="family facts CSV")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--no-compression", action="store_true", help="write plain files instead of gzip")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--relations", nargs="*", default=None, help="relations to export (default: all derived)")
+    args = parser.parse_args()
+    print(format_stats(export_relations(args.output_dir, args.relations, args.format,
+                                        None if args.no_compression else "gzip", args.workers, args.source)))
@@ -6,10 +6,27 @@ Example usage:
     df = load_facts_into_pydatalog("family-expert-system/data/family_facts.csv")
     print(df.head())
 """
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Tuple
 import re
 
+from src.validation import ValidationReport, validate_facts, quarantine_facts
+from src.metrics import timed_stage
+
+# Header of the facts CSV
+COLUMNS = ["Name", "Gender", "Father", "Mother", "Spouses", "Notes"]
+
+# What load_facts_dataframe does with records that fail validation (see src.validation)
+VALIDATION_MODES = ("ignore", "report", "quarantine", "raise")
+
 try:
     from pyDatalog import pyDatalog
 except ImportError:
@@ -36,32 +53,100 @@ def _normalize_name(name: str) -> str:
         return ""
     return re.sub(r'\s+', ' ', name).strip()
 
-def load_facts_dataframe(filepath: str) -> pd.DataFrame:
+@timed_stage("read_csv")
+def load_facts_dataframe(filepath: str, on_invalid: str = "report") -> pd.DataFrame:
     """
-    Loads family data from a CSV file, normalizes names, and ensures the correct header.
+    Loads family data from a CSV file, normalizes names, ensures the correct header,
+    and validates the records (cycles, self-references, gender and dangling references).
 
     Args:
         filepath: The path to the CSV file.
+        on_invalid: "report" attaches the ValidationReport as df.attrs["validation"] and keeps
+            every record; "quarantine" also removes the offending references; "raise" raises
+            on any issue; "ignore" skips validation.
 
     Returns:
         A cleaned pandas DataFrame with family facts.
+
+    Raises:
+        ValueError: If the header is wrong, on_invalid is unknown, or on_invalid is "raise"
+            and validation finds an issue.
     """
+    if on_invalid not in VALIDATION_MODES:
+        raise ValueError(f"on_invalid must be one of {VALIDATION_MODES}, got '{on_invalid}'")
+
     df = pd.read_csv(filepath)
 
     # Ensure header matches exactly
-    expected_header = ["Name", "Gender", "Father", "Mother", "Spouses", "Notes"]
-    if list(df.columns) != expected_header:
-        raise ValueError(f"CSV header does not match expected: {expected_header}")
+    if list(df.columns) != COLUMNS:
+        raise ValueError(f"CSV header does not match expected: {COLUMNS}")
 
-    # Normalize relevant columns
-    for col in ["Name", "Father", "Mother", "Spouses"]:
+    # Normalize relevant columns (empty cells become "")
+    for col in ["Name", "Father", "Mother", "Spouses", "Notes"]:
         df[col] = df[col].apply(_normalize_name)
 
+    if on_invalid == "ignore":
+        return df
+    report = validate_facts(df)
+    if on_invalid == "raise" and not report.ok:
+        raise ValueError(f"Invalid family facts in {filepath}: {report}")
+    if on_invalid == "quarantine":
+        df = quarantine_facts(df, report)
+    df.attrs["validation"] = report
     return df
 
+def validation_report(df: pd.DataFrame) -> ValidationReport:
+    """The ValidationReport attached by load_facts_dataframe, or a fresh one for other DataFrames."""
+    report = df.attrs.get("validation")
+    return report if isinstance(report, ValidationReport) else validate_facts(df)
+
+# Attribute of the pyDatalog logic holding the DataFrame its facts were registered from
+LOADED_FACTS_ATTRIBUTE = '_loaded_facts'
+
+Fact = Tuple[str, ...]
+
+def row_facts(row) -> List[Fact]:
+    """
+    The base facts contributed by one row of the facts DataFrame, as (predicate, *args) tuples.
+    Each marriage gives spouse facts in both orientations; both partners usually list the
+    same marriage.
+    """
+    person_name = row["Name"]
+    facts: List[Fact] = []
+
+    # Gender facts
+    if row["Gender"] == "Male":
+        facts.append(('is_male', person_name))
+    elif row["Gender"] == "Female":
+        facts.append(('is_female', person_name))
+
+    # Father and mother facts
+    if row["Father"]:
+        facts.append(('father', row["Father"], person_name))
+    if row["Mother"]:
+        facts.append(('mother', row["Mother"], person_name))
+
+    # Spouse facts (symmetric)
+    if row["Spouses"]:
+        spouses = {s for s in row["Spouses"].split(';') if s and s != person_name}
+        for spouse_name in sorted(spouses):
+            facts.append(('spouse', person_name, spouse_name))
+            facts.append(('spouse', spouse_name, person_name))
+
+    # Adoptive parent facts from Notes (not biological mother or father)
+    notes = row["Notes"]
+    if notes:
+        if "Adoptive mother of" in notes:
+            facts.append(('adoptive_mother', person_name, notes.split("Adoptive mother of ")[1].strip()))
+        elif "Adoptive father of" in notes:
+            facts.append(('adoptive_father', person_name, notes.split("Adoptive father of ")[1].strip()))
+    return facts
+
+@timed_stage("register_facts")
 def register_pydatalog_facts(df: pd.DataFrame) -> Dict[str, int]:
     """
     Registers family facts from a DataFrame into PyDatalog.
+    The DataFrame is kept on the logic, so that src.reload can later apply only the changes.
 
     Args:
         df: A pandas DataFrame containing family facts.
@@ -80,63 +165,24 @@ def register_pydatalog_facts(df: pd.DataFrame) -> Dict[str, int]:
         "num_males": 0,
         "num_females": 0,
     }
+    counters = {'father': "num_fathers", 'mother': "num_mothers", 'is_male': "num_males", 'is_female': "num_females"}
 
-    # Track unique spouse pairs for accurate counting across all individuals
-    unique_spouse_pairs = set()
+    # Track unique spouse facts, for accurate counting across all individuals
+    unique_spouses = set()
 
-    # Add facts from DataFrame
     for _, row in df.iterrows():
-        person_name = row["Name"]
-        gender = row["Gender"]
-        father_name = row["Father"]
-        mother_name = row["Mother"]
-        spouses_str = row["Spouses"]
-
-        # Add gender facts
-        if gender == "Male":
-            + is_male(person_name)
-            summary["num_males"] += 1
-        elif gender == "Female":
-            + is_female(person_name)
-            summary["num_females"] += 1
-
-         #Add father facts
-        if father_name:
-            + father(father_name, person_name)
-            summary["num_fathers"] += 1
-
-        # Add mother facts
-        if mother_name:
-            + mother(mother_name,person_name)
-            summary["num_mothers"] += 1
-
-        # Add spouse facts (symmetric)
-        if spouses_str:
-            spouses_list = [s for s in spouses_str.split(';') if s and s != person_name]
-            for spouse_name in set(spouses_list): # Use set to handle duplicates
-                if spouse_name:
-                    # Add symmetric facts to PyDatalog
-                    + spouse(person_name, spouse_name)
-                    + spouse(spouse_name, person_name)
-
-                    # Add to unique_spouse_pairs set (unordered)
-                    pair = frozenset({person_name, spouse_name})
-                    unique_spouse_pairs.add(pair)
-
-        # Handle adoptive parent facts from Notes
-        notes = row["Notes"]
-        if notes:
-            if "Adoptive mother of" in notes:
-                child_name = notes.split("Adoptive mother of ")[1].strip()
-                + adoptive_mother(person_name, child_name)
-                # Do not add as biological mother or father
-            elif "Adoptive father of" in notes:
-                child_name = notes.split("Adoptive father of ")[1].strip()
-                + adoptive_father(person_name, child_name)
-                # Do not add as biological mother or father
+        for fact in row_facts(row):
+            if fact[0] == 'spouse':
+                if fact in unique_spouses:
+                    continue
+                unique_spouses.add(fact)
+            elif fact[0] in counters:
+                summary[counters[fact[0]]] += 1
+            pyDatalog.assert_fact(*fact)
 
     # Update num_spouses in summary after processing all individuals
-    summary["num_spouses"] = len(unique_spouse_pairs)
+    summary["num_spouses"] = len(unique_spouses) // 2
+    setattr(pyDatalog.Logic(True), LOADED_FACTS_ATTRIBUTE, df)
 
     return summary
 
@@ -160,6 +206,7 @@ def load_facts_into_pydatalog(filepath: str) -> pd.DataFrame:
     print(f"Number of father facts registered: {summary['num_fathers']}")
     print(f"Number of mother facts registered: {summary['num_mothers']}")
     print(f"Number of spouse facts registered (symmetric): {summary['num_spouses']}")
+    print(f"Number of validation issues in registered records: {len(validation_report(df).issues)}")
     print("------------------------------------------")
 
     return df
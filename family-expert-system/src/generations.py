@@ -0,0 +1,106 @@
+"""
+Generation levels and k-th ancestor/descendant lookups.
+
+One topological pass over the parent DAG assigns every person a generation level
+(0 for people without known parents, otherwise one more than their deepest parent)
+and records, per person, the ancestors and descendants found at each generation
+distance. "All 5th-generation descendants of John" is then a single index lookup
+instead of a chain of parent joins.
+
+Distances count parent links along any path, as the grandparent and great_grandparent
+rules do, so someone can appear at several distances. Edges ignored by
+FamilyGraph.topological_order (self-parenting and cycles) are left out.
+
+Example usage:
+    index = GenerationIndex(graph)
+    index.descendants_at("John", 3)    # great-grandchildren of John
+    index.ancestors_at("Adam", 2)      # grandparents of Adam
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Dict, List, Tuple
+
+from src.graph import FamilyGraph, current_graph
+from src.views import cached_on_logic
+
+class GenerationIndex:
+    """
+    Per-person generation level and per-distance ancestor/descendant sets.
+    """
+
+    def __init__(self, graph: FamilyGraph):
+        order, ignored = graph.topological_order()
+        ignored = set(ignored)
+        self.order: Tuple[str, ...] = tuple(order)
+
+        dag_parents = {x: [p for p in graph.parents(x) if (p, x) not in ignored] for x in order}
+        dag_children = {x: [c for c in graph.children(x) if (x, c) not in ignored] for x in order}
+
+        self._levels: Dict[str, int] = {}
+        for x in order:
+            self._levels[x] = 1 + max((self._levels[p] for p in dag_parents[x]), default=-1)
+
+        self._ancestors = self._distance_sets(order, dag_parents)
+        self._descendants = self._distance_sets(reversed(order), dag_children)
+
+    @staticmethod
+    def _distance_sets(order, neighbours) -> Dict[str, Tuple[Tuple[str, ...], ...]]:
+        """
+        For each person, the people reachable by exactly k steps (k = 1, 2, ...), where every
+        neighbour is processed before the people pointing to it.
+        """
+        frozen: Dict[str, Tuple[frozenset, ...]] = {}
+        for x in order:
+            levels: List[set] = [set(neighbours[x])]
+            for n in neighbours[x]:
+                for k, people in enumerate(frozen[n], start=1):
+                    if k == len(levels):
+                        levels.append(set())
+                    levels[k] |= people
+            frozen[x] = tuple(frozenset(people) for people in levels if people)
+        return {x: tuple(tuple(sorted(people)) for people in levels) for x, levels in frozen.items()}
+
+    def generation(self, person: str) -> int:
+        """Generation level of person: 0 without known parents, else 1 + deepest parent's level."""
+        return self._levels[person]
+
+    def people_at_generation(self, level: int) -> List[str]:
+        """Everyone at the given generation level, sorted."""
+        return sorted(x for x, lv in self._levels.items() if lv == level)
+
+    def ancestors_at(self, person: str, k: int) -> Tuple[str, ...]:
+        """Sorted ancestors exactly k parent links above person (k=1 parents, k=2 grandparents, ...)."""
+        return self._at(self._ancestors, person, k)
+
+    def descendants_at(self, person: str, k: int) -> Tuple[str, ...]:
+        """Sorted descendants exactly k parent links below person (k=1 children, k=2 grandchildren, ...)."""
+        return self._at(self._descendants, person, k)
+
+    @staticmethod
+    def _at(index, person: str, k: int) -> Tuple[str, ...]:
+        if k < 0:
+            raise ValueError("Generation distance must be non-negative")
+        if person not in index:
+            return ()
+        if k == 0:
+            return (person,)
+        levels = index[person]
+        return levels[k - 1] if k <= len(levels) else ()
+
+    def max_distance_above(self, person: str) -> int:
+        """Number of generations of recorded ancestry above person."""
+        return len(self._ancestors.get(person, ()))
+
+    def max_distance_below(self, person: str) -> int:
+        """Number of generations of recorded descendants below person."""
+        return len(self._descendants.get(person, ()))
+
+def current_generation_index() -> GenerationIndex:
+    """GenerationIndex of the currently loaded knowledge base, built on first use."""
+    return cached_on_logic('generations', lambda: GenerationIndex(current_graph()))
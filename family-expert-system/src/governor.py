@@ -0,0 +1,219 @@
+"""
+Per-query resource limits for PyDatalog evaluation.
+
+A single recursive query (cousin, step_cousin, ancestor over a large family) can run
+for minutes and derive millions of intermediate facts. PyDatalog's engine is compiled
+and cannot be interrupted from the outside, but it reports every newly derived fact to
+the 'pyDatalog.pyEngine' logger when pyEngine.Logging is on. While a limit is active,
+a logging filter counts those facts and checks the clock, and raises
+QueryLimitExceeded from inside the evaluation as soon as a limit is crossed.
+
+Limits:
+    max_seconds: wall time of the evaluation (checked whenever a fact is derived, and
+                 before and after every ask)
+    max_derived: number of facts derived while answering (base facts looked up included;
+                 reported in the statistics only when max_seconds or max_derived is set)
+    max_results: number of answers returned (checked once the answers are known)
+
+Defaults apply to every governed query and can be changed with set_default_limits;
+per-call keyword arguments override them. None means unlimited.
+
+Example usage:
+    set_default_limits(max_seconds=5)
+    answers = governed_ask('cousin(X, Y)', max_derived=100_000)
+    with query_limits(max_seconds=1) as stats:
+        is_cousin_within_n("Sarah", "George", 3)
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pyDatalog import pyEngine
+from src.metrics import add_ask_check, ask
+
+LIMIT_NAMES = ("max_seconds", "max_derived", "max_results")
+
+_default_limits: Dict[str, Optional[float]] = {name: None for name in LIMIT_NAMES}
+
+class QueryLimitExceeded(Exception):
+    """
+    Raised when a governed query crosses one of its limits.
+
+    Attributes:
+        limit: Name of the limit that was crossed ("max_seconds", "max_derived" or "max_results").
+        stats: Statistics gathered up to that point (elapsed_s, derived, results, query, limits).
+    """
+
+    def __init__(self, limit: str, stats: Dict[str, Any]):
+        self.limit = limit
+        self.stats = stats
+        super().__init__(f"Query exceeded {limit}={stats['limits'][limit]} "
+                         f"after {stats['elapsed_s']:.3f}s and {stats['derived']} derived facts")
+
+def set_default_limits(**limits: Optional[float]) -> None:
+    """
+    Sets the default limits of governed queries, e.g. set_default_limits(max_seconds=10).
+
+    Raises:
+        ValueError: If an unknown limit is given.
+    """
+    _check_names(limits)
+    _default_limits.update(limits)
+
+def get_default_limits() -> Dict[str, Optional[float]]:
+    return dict(_default_limits)
+
+def _check_names(limits: Dict[str, Any]) -> None:
+    unknown = set(limits) - set(LIMIT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown query limits {sorted(unknown)}; expected {LIMIT_NAMES}")
+
+class _Budget:
+    """The limits and counters of the governed query running in one thread."""
+
+    def __init__(self, limits: Dict[str, Optional[float]], query: Optional[str]):
+        self.limits = limits
+        self.query = query
+        self.start = time.perf_counter()
+        self.derived = 0
+        self.results: Optional[int] = None
+        self.deadline = self.start + limits["max_seconds"] if limits["max_seconds"] is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"query": self.query, "elapsed_s": time.perf_counter() - self.start,
+                "derived": self.derived, "results": self.results, "limits": dict(self.limits)}
+
+    def check(self) -> None:
+        self.derived += 1
+        if self.limits["max_derived"] is not None and self.derived > self.limits["max_derived"]:
+            raise QueryLimitExceeded("max_derived", self.stats())
+        self.check_time()
+
+    def check_time(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise QueryLimitExceeded("max_seconds", self.stats())
+
+    def check_results(self, count: int) -> None:
+        self.results = count
+        if self.limits["max_results"] is not None and count > self.limits["max_results"]:
+            raise QueryLimitExceeded("max_results", self.stats())
+
+class _FactCounter(logging.Filter):
+    """Charges every "New fact" record to the governed query of the current thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        budget = getattr(_active, "budget", None)
+        if budget is not None:
+            budget.check()
+        return False  # nothing is ever printed
+
+_active = threading.local()
+_lock = threading.Lock()
+_governed_count = 0
+_saved_logging: Tuple[Any, ...] = ()
+_engine_logger = logging.getLogger(pyEngine.__name__)
+_counter = _FactCounter()
+
+def _enable_fact_logging() -> None:
+    global _governed_count, _saved_logging
+    with _lock:
+        if _governed_count == 0:
+            _saved_logging = (pyEngine.Logging, _engine_logger.level, _engine_logger.propagate)
+            _engine_logger.addFilter(_counter)
+            _engine_logger.setLevel(logging.INFO)
+            _engine_logger.propagate = False
+            pyEngine.Logging = True
+        _governed_count += 1
+
+def _disable_fact_logging() -> None:
+    global _governed_count
+    with _lock:
+        _governed_count -= 1
+        if _governed_count == 0:
+            pyEngine.Logging, level, _engine_logger.propagate = _saved_logging
+            _engine_logger.setLevel(level)
+            _engine_logger.removeFilter(_counter)
+
+@contextmanager
+def query_limits(query: Optional[str] = None, **limits: Optional[float]) -> Iterator[Dict[str, Any]]:
+    """
+    Governs every PyDatalog evaluation run in this thread inside the block.
+
+    Args:
+        query: Optional label reported in the statistics.
+        **limits: max_seconds, max_derived and/or max_results, overriding the defaults.
+
+    Yields:
+        A dict that is filled with the final statistics when the block exits normally.
+
+    Raises:
+        QueryLimitExceeded: If a limit is crossed inside the block.
+    """
+    _check_names(limits)
+    if getattr(_active, "budget", None) is not None:
+        raise RuntimeError("Governed queries cannot be nested")
+    budget = _Budget({**_default_limits, **limits}, query)
+    stats: Dict[str, Any] = {}
+    # Fact logging slows evaluation down, so it is only switched on when something needs counting
+    counting = budget.limits["max_seconds"] is not None or budget.limits["max_derived"] is not None
+    if counting:
+        _enable_fact_logging()
+    _active.budget = budget
+    try:
+        yield stats
+    finally:
+        _active.budget = None
+        if counting:
+            _disable_fact_logging()
+    stats.update(budget.stats())
+
+def check_result_count(count: int) -> None:
+    """
+    Enforces max_results of the governed query running in this thread (no-op outside query_limits).
+
+    Raises:
+        QueryLimitExceeded: If count exceeds max_results.
+    """
+    budget = getattr(_active, "budget", None)
+    if budget is not None:
+        budget.check_results(count)
+
+def check_time() -> None:
+    """
+    Enforces max_seconds of the governed query running in this thread (no-op outside query_limits).
+    Runs before and after every ask, so evaluations deriving no new facts are bounded too.
+
+    Raises:
+        QueryLimitExceeded: If the deadline has passed.
+    """
+    budget = getattr(_active, "budget", None)
+    if budget is not None:
+        budget.check_time()
+
+add_ask_check(check_time)
+
+def governed_ask(query: str, **limits: Optional[float]) -> List[Tuple[Any, ...]]:
+    """
+    Runs pyDatalog.ask(query) under the given limits (and the defaults).
+
+    Returns:
+        The answer tuples (an empty list when there is no answer).
+
+    Raises:
+        QueryLimitExceeded: If a limit is crossed; its stats hold the partial counts.
+    """
+    with query_limits(query, **limits):
+        answer = ask(query)
+        answers = list(answer.answers) if answer else []
+        check_result_count(len(answers))
+    return answers
@@ -0,0 +1,258 @@
+"""
+In-memory adjacency over the family facts, for algorithms that walk the pedigree
+directly instead of going through PyDatalog queries.
+
+The graph holds exactly the base facts that src.facts registers (father, mother,
+adoptive_father, adoptive_mother, spouse, is_male, is_female), with every marriage
+indexed under both spouses. "Parents" follow the parent rule in src.rules, i.e. they
+include adoptive parents.
+
+Example usage:
+    graph = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_FILEPATH))
+    graph.parents("Adam")    # ('Emily', 'James')
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.metrics import ask
+from src.tables import Tables, tables_from_dataframe
+from src.validation import _strongly_connected_components
+from src.views import cached_on_logic
+
+def _index(pairs: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, ...]]:
+    """Groups (key, value) pairs into a dict of sorted, deduplicated value tuples."""
+    grouped: Dict[str, set] = {}
+    for key, value in pairs:
+        grouped.setdefault(key, set()).add(value)
+    return {key: tuple(sorted(values)) for key, values in grouped.items()}
+
+class FamilyGraph:
+    """
+    Person-keyed adjacency lists of the base family facts.
+    All lookups return sorted tuples; unknown names return an empty tuple.
+    """
+
+    def __init__(self, genders: Dict[str, str], fathers: Iterable[Tuple[str, str]],
+                 mothers: Iterable[Tuple[str, str]], adoptive_fathers: Iterable[Tuple[str, str]],
+                 adoptive_mothers: Iterable[Tuple[str, str]], marriages: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            genders: Gender ("Male", "Female" or "") of every person row.
+            fathers, mothers, adoptive_fathers, adoptive_mothers: (parent, child) pairs.
+            marriages: (a, b) pairs, in either or both orientations.
+        """
+        fathers, mothers = list(fathers), list(mothers)
+        adoptive_fathers, adoptive_mothers = list(adoptive_fathers), list(adoptive_mothers)
+        marriages = [(a, b) for a, b in marriages if a != b]
+        parent_pairs = fathers + mothers + adoptive_fathers + adoptive_mothers
+
+        self.genders: Dict[str, str] = dict(genders)
+        self._fathers = _index((c, p) for p, c in fathers)
+        self._mothers = _index((c, p) for p, c in mothers)
+        self._adoptive_fathers = _index((c, p) for p, c in adoptive_fathers)
+        self._adoptive_mothers = _index((c, p) for p, c in adoptive_mothers)
+        self._adoptive_parents = _index((c, p) for p, c in adoptive_fathers + adoptive_mothers)
+        self._parents = _index((c, p) for p, c in parent_pairs)
+        self._children = _index(parent_pairs)
+        self._biological_children = _index(fathers + mothers)
+        self._spouses = _index(marriages + [(b, a) for a, b in marriages])
+
+        # Everyone mentioned anywhere, including names that only appear in a parent or spouse column
+        names = set(self.genders)
+        for pairs in (parent_pairs, marriages):
+            for a, b in pairs:
+                names.add(a)
+                names.add(b)
+        self.names: Tuple[str, ...] = tuple(sorted(names))
+        self._topological: Optional[Tuple[List[str], List[Tuple[str, str]]]] = None
+
+    @classmethod
+    def from_tables(cls, tables: Tables) -> "FamilyGraph":
+        """Builds the graph from normalized tables (see src.tables)."""
+        people, parentage, adoptions = tables["people"], tables["parentage"], tables["adoptions"]
+        genders = dict(zip(people["name"].tolist(), people["gender"].tolist()))
+
+        def pairs(table, role):
+            mask = table["role"] == role
+            return zip(table["parent"][mask].tolist(), table["child"][mask].tolist())
+
+        return cls(genders, pairs(parentage, "father"), pairs(parentage, "mother"),
+                   pairs(adoptions, "father"), pairs(adoptions, "mother"),
+                   zip(tables["marriages"]["a"].tolist(), tables["marriages"]["b"].tolist()))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "FamilyGraph":
+        """Builds the graph from a cleaned facts DataFrame (see load_facts_dataframe)."""
+        return cls.from_tables(tables_from_dataframe(df))
+
+    @classmethod
+    def from_kb(cls) -> "FamilyGraph":
+        """Builds the graph from the base facts currently registered in PyDatalog."""
+        def pairs(predicate):
+            answer = ask(f'{predicate}(X, Y)')
+            return [(str(r[0]), str(r[1])) for r in answer.answers] if answer else []
+
+        def names(predicate):
+            answer = ask(f'{predicate}(X)')
+            return [str(r[0]) for r in answer.answers] if answer else []
+
+        genders = {name: "Male" for name in names('is_male')}
+        genders.update((name, "Female") for name in names('is_female'))
+        return cls(genders, pairs('father'), pairs('mother'), pairs('adoptive_father'),
+                   pairs('adoptive_mother'), pairs('spouse'))
+
+    def fathers(self, person: str) -> Tuple[str, ...]:
+        return self._fathers.get(person, ())
+
+    def mothers(self, person: str) -> Tuple[str, ...]:
+        return self._mothers.get(person, ())
+
+    def biological_parents(self, person: str) -> Tuple[str, ...]:
+        return tuple(sorted(set(self.fathers(person)) | set(self.mothers(person))))
+
+    def adoptive_fathers(self, person: str) -> Tuple[str, ...]:
+        return self._adoptive_fathers.get(person, ())
+
+    def adoptive_mothers(self, person: str) -> Tuple[str, ...]:
+        return self._adoptive_mothers.get(person, ())
+
+    def adoptive_parents(self, person: str) -> Tuple[str, ...]:
+        return self._adoptive_parents.get(person, ())
+
+    def parents(self, person: str) -> Tuple[str, ...]:
+        """Biological and adoptive parents, as in the parent rule."""
+        return self._parents.get(person, ())
+
+    def children(self, person: str) -> Tuple[str, ...]:
+        """Biological and adoptive children."""
+        return self._children.get(person, ())
+
+    def biological_children(self, person: str) -> Tuple[str, ...]:
+        return self._biological_children.get(person, ())
+
+    def spouses(self, person: str) -> Tuple[str, ...]:
+        return self._spouses.get(person, ())
+
+    def is_male(self, person: str) -> bool:
+        return self.genders.get(person) == "Male"
+
+    def is_female(self, person: str) -> bool:
+        return self.genders.get(person) == "Female"
+
+    def parent_edges(self) -> List[Tuple[str, str]]:
+        """All (parent, child) pairs, sorted."""
+        return sorted((p, c) for p, children in self._children.items() for c in children)
+
+    def topological_order(self) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Orders everyone so that parents come before their children (Kahn's algorithm,
+        ties broken by name). Self-parenting edges are skipped. When the remaining edges
+        contain a cycle, it is broken inside its strongly connected component: the
+        alphabetically first member whose unplaced parents all belong to that component
+        is placed, ignoring only its edges from those parents. Edges from outside the
+        cycle, and edges below it, are always honoured.
+
+        Returns:
+            (order, ignored_edges), where ignored_edges are the (parent, child) pairs
+            that could not be honoured. Computed once per graph.
+        """
+        if self._topological is not None:
+            return self._topological
+
+        indegree = {name: 0 for name in self.names}
+        for child, parents in self._parents.items():
+            indegree[child] = sum(1 for p in parents if p != child)
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        component: Dict[str, int] = {}
+        placed = set()
+        order: List[str] = []
+        ignored: List[Tuple[str, str]] = []
+
+        while len(order) < len(self.names):
+            if not ready:
+                if not component:
+                    edges = [(p, c) for p, c in self.parent_edges() if p != c]
+                    for i, members in enumerate(_strongly_connected_components(edges)):
+                        component.update((member, i) for member in members)
+                # Members of a component that no other unplaced component points into
+                person = next(x for x in self.names if x not in placed and all(
+                    p in placed or p == x or component[p] == component[x] for p in self.parents(x)))
+                ignored.extend((p, person) for p in self.parents(person) if p != person and p not in placed)
+                heapq.heappush(ready, person)
+            person = heapq.heappop(ready)
+            if person in placed:
+                continue
+            placed.add(person)
+            order.append(person)
+            for child in self.children(person):
+                if child != person and child not in placed:
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        heapq.heappush(ready, child)
+        ignored.extend((person, person) for person in self.names if person in self.parents(person))
+
+        self._topological = (order, sorted(ignored))
+        return self._topological
+
+    def components(self, include_spouses: bool = True) -> List[Tuple[str, ...]]:
+        """
+        Connected family components over parent links (and marriages, by default),
+        each as a sorted tuple of names, largest first.
+        """
+        root = {name: name for name in self.names}
+
+        def find(x):
+            while root[x] != x:
+                root[x] = root[root[x]]
+                x = root[x]
+            return x
+
+        edges = self.parent_edges()
+        if include_spouses:
+            edges += [(a, b) for a, spouses in self._spouses.items() for b in spouses if a < b]
+        for a, b in edges:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                root[max(ra, rb)] = min(ra, rb)
+
+        grouped: Dict[str, List[str]] = {}
+        for name in self.names:
+            grouped.setdefault(find(name), []).append(name)
+        return sorted((tuple(members) for members in grouped.values()), key=lambda c: (-len(c), c))
+
+    def component_of(self, person: str, include_spouses: bool = True) -> Tuple[str, ...]:
+        """The connected family component containing person (empty if the name is unknown)."""
+        if person not in self.genders and not self.parents(person) and not self.children(person) \
+                and not self.spouses(person):
+            return ()
+        seen = {person}
+        frontier = [person]
+        while frontier:
+            x = frontier.pop()
+            neighbours = self.parents(x) + self.children(x) + (self.spouses(x) if include_spouses else ())
+            for n in neighbours:
+                if n not in seen:
+                    seen.add(n)
+                    frontier.append(n)
+        return tuple(sorted(seen))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"FamilyGraph({len(self.names)} people)"
+
+def current_graph() -> FamilyGraph:
+    """FamilyGraph of the currently loaded knowledge base, built on first use (see src.views.cached_on_logic)."""
+    return cached_on_logic('graph', FamilyGraph.from_kb)
@@ -0,0 +1,156 @@
+"""
+Marriage-unit (household) index for the step and blended-family relations.
+
+The step rules of src.rules join spouse with parent and then filter with negations
+(~parent(X, Y), ~sibling(X, Y)), which makes them the slowest rules on families with
+many remarriages. A Household is one marriage with the children of its partners split
+into joint children (of both), and the children of the first and of the second partner
+only. Every person is indexed under the households they head and the households where
+they are a child, so the step relations follow directly:
+
+    step_parent(X, Y)   X heads a household where Y is a child of the other partner only
+    step_child(X, Y)    the reverse
+    step_sibling(X, Y)  Y is a child of one partner only, X a child of the other partner
+                        and not a sibling of Y
+    step_grandparent    step parent of a parent, or grandparent of a step parent
+    step_cousin         child of a step sibling of a parent, or child of a sibling of a
+                        step parent
+
+Each lookup only visits the households of the person (and of their parents or siblings),
+not every marriage. Parents include adoptive parents, as in the parent rule.
+
+Example usage:
+    index = current_households()
+    index.households_of("Mary")          # (Household('John', 'Mary', ...), Household('Mary', 'Peter', ...))
+    index.step_parents("David")          # ('Peter',)
+    index.relation_pairs("step_sibling")
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+from src.graph import FamilyGraph, current_graph
+from src.views import cached_on_logic
+
+# Relations answered by HouseholdIndex.relation_pairs
+HOUSEHOLD_RELATIONS = ('step_parent', 'step_child', 'step_sibling', 'step_grandparent', 'step_cousin')
+
+class Household:
+    """One marriage (a < b) and the children of its partners."""
+
+    __slots__ = ("a", "b", "joint", "a_only", "b_only")
+
+    def __init__(self, a: str, b: str, a_children: Tuple[str, ...], b_children: Tuple[str, ...]):
+        self.a, self.b = a, b
+        b_set = set(b_children)
+        self.joint: Tuple[str, ...] = tuple(c for c in a_children if c in b_set)
+        self.a_only: Tuple[str, ...] = tuple(c for c in a_children if c not in b_set)
+        self.b_only: Tuple[str, ...] = tuple(sorted(b_set - set(a_children)))
+
+    def partner(self, person: str) -> str:
+        return self.b if person == self.a else self.a
+
+    def own_children(self, person: str) -> Tuple[str, ...]:
+        """Children of person only (not of the other partner)."""
+        return self.a_only if person == self.a else self.b_only
+
+    def children_of(self, person: str) -> Tuple[str, ...]:
+        """Every child of person, joint ones included."""
+        return self.joint + self.own_children(person)
+
+    def __repr__(self) -> str:
+        return (f"Household({self.a!r}, {self.b!r}, joint={self.joint}, "
+                f"a_only={self.a_only}, b_only={self.b_only})")
+
+class HouseholdIndex:
+    """Every household of a family graph, indexed by partner and by child."""
+
+    def __init__(self, graph: FamilyGraph):
+        self.graph = graph
+        self.households: List[Household] = []
+        self._by_partner: Dict[str, List[Household]] = {}
+        # child -> (household, the partner who is the child's parent) for children of one partner only
+        self._by_single_child: Dict[str, List[Tuple[Household, str]]] = {}
+        for a in graph.names:
+            for b in graph.spouses(a):
+                if a < b:
+                    self._add(Household(a, b, graph.children(a), graph.children(b)))
+
+    def _add(self, household: Household) -> None:
+        self.households.append(household)
+        for partner in (household.a, household.b):
+            self._by_partner.setdefault(partner, []).append(household)
+            for child in household.own_children(partner):
+                self._by_single_child.setdefault(child, []).append((household, partner))
+
+    def households_of(self, person: str) -> Tuple[Household, ...]:
+        """Households headed by person."""
+        return tuple(self._by_partner.get(person, ()))
+
+    def _siblings(self, y: str) -> Set[str]:
+        g = self.graph
+        return {x for p in g.parents(y) for x in g.children(p) if x != y}
+
+    def step_parents(self, y: str) -> Tuple[str, ...]:
+        return tuple(sorted({h.partner(p) for h, p in self._by_single_child.get(y, ())}))
+
+    def step_children(self, y: str) -> Tuple[str, ...]:
+        return tuple(sorted({c for h in self._by_partner.get(y, ()) for c in h.own_children(h.partner(y))}))
+
+    def step_siblings(self, y: str) -> Tuple[str, ...]:
+        singles = self._by_single_child.get(y, ())
+        if not singles:
+            return ()
+        siblings = self._siblings(y)
+        return tuple(sorted({x for h, p in singles for x in h.children_of(h.partner(p))
+                             if x != y and x not in siblings}))
+
+    def step_grandparents(self, y: str) -> Tuple[str, ...]:
+        g = self.graph
+        found = {x for p in g.parents(y) for x in self.step_parents(p)}
+        found.update(x for p in self.step_parents(y) for q in g.parents(p) for x in g.parents(q))
+        return tuple(sorted(found))
+
+    def step_cousins(self, y: str) -> Tuple[str, ...]:
+        g = self.graph
+        found = {x for p2 in g.parents(y) for p1 in self.step_siblings(p2) for x in g.children(p1)}
+        found.update(x for p2 in self.step_parents(y) for p1 in self._siblings(p2) for x in g.children(p1))
+        found.discard(y)
+        return tuple(sorted(found))
+
+    def relation_pairs(self, relation: str) -> Iterator[Tuple[str, str]]:
+        """
+        Every (X, Y) pair of one of HOUSEHOLD_RELATIONS.
+
+        Raises:
+            ValueError: If the relation is not answered by the index.
+        """
+        lookups: Dict[str, Callable[[str], Tuple[str, ...]]] = {
+            'step_parent': self.step_parents, 'step_child': self.step_children,
+            'step_sibling': self.step_siblings, 'step_grandparent': self.step_grandparents,
+            'step_cousin': self.step_cousins,
+        }
+        if relation not in lookups:
+            raise ValueError(f"Not a household relation: '{relation}'")
+        # Only people in a household, or children of people in one, can have step relatives
+        people = set(self._by_partner)
+        people.update(c for p in self._by_partner for c in self.graph.children(p))
+        people.update(c for p in list(people) for c in self.graph.children(p))
+        lookup = lookups[relation]
+        return ((x, y) for y in sorted(people) for x in lookup(y))
+
+    def __len__(self) -> int:
+        return len(self.households)
+
+    def __repr__(self) -> str:
+        return f"HouseholdIndex({len(self.households)} households)"
+
+def current_households() -> HouseholdIndex:
+    """HouseholdIndex of the currently loaded knowledge base, built on first use."""
+    return cached_on_logic('households', lambda: HouseholdIndex(current_graph()))
@@ -0,0 +1,215 @@
+"""
+Isolated knowledge bases, several per process.
+
+PyDatalog keeps facts and rules in a per-thread "logic" object, and pyDatalog.clear()
+(called by register_pydatalog_facts) merely starts a new one. A FamilyKB keeps its own
+logic object: load() builds it from a CSV file or DataFrame without touching the logic
+the caller is using, and activate() makes it current for the duration of a block. Every
+structure cached on the logic (views, family graph, generation index, kinship, see
+src.views.cached_on_logic) therefore belongs to one instance, and the helpers of
+src.queries work on the active instance instead of reloading the shipped CSV.
+
+Activation installs a copy of the instance's logic in the calling thread (that is how
+PyDatalog hands a logic to a thread), so different threads can query the same or
+different instances at the same time. Facts asserted inside a block are kept; loading,
+reloading and dropping are serialized per instance.
+
+Example usage:
+    registry = KBRegistry()
+    registry.load("acme", "data/acme.csv")
+    registry.load("globex", globex_dataframe)
+    registry.get("acme").ask('sibling(X, "Alice")')
+    with registry.get("globex").activate():
+        is_aunt_or_uncle("Olivia", "Kevin")
+    registry.memory_usage()             # {'acme': 412345, 'globex': 98765}
+    registry.drop("acme")
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import gc
+import threading
+import types
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from pyDatalog import pyDatalog
+
+from src.facts import load_facts_dataframe, register_pydatalog_facts
+from src.governor import governed_ask
+from src.rules import define_family_rules
+
+# Attribute marking a logic as belonging to a FamilyKB (kept by invalidate_views)
+_INSTANCE_ATTRIBUTE = '_kb_instance'
+
+# Objects shared by every logic, not charged to an instance
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+def current_instance() -> Optional[str]:
+    """Name of the FamilyKB active in this thread, or None outside FamilyKB.activate()."""
+    return getattr(pyDatalog.Logic(True), _INSTANCE_ATTRIBUTE, None)
+
+def _deep_size(root: object) -> int:
+    """Bytes of every object reachable from root (modules, classes and functions excluded)."""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+class FamilyKB:
+    """
+    One knowledge base (facts, rules and cached indexes), independent of the others
+    and of the logic PyDatalog is currently using.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.summary: Dict[str, int] = {}
+        self._logic = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._logic is not None
+
+    def load(self, source: Union[str, pd.DataFrame], on_invalid: str = "report") -> Dict[str, int]:
+        """
+        Replaces the facts of this instance with those of a CSV file or a cleaned DataFrame,
+        and defines the rules. The caller's current logic is left as it was.
+
+        Args:
+            source: Path of a family facts CSV, or a DataFrame from load_facts_dataframe.
+            on_invalid: Validation mode when reading a CSV (see load_facts_dataframe).
+
+        Returns:
+            The registration summary (number of fathers, mothers, spouses, males, females).
+        """
+        df = source if isinstance(source, pd.DataFrame) else load_facts_dataframe(source, on_invalid)
+        previous = pyDatalog.Logic(True)
+        try:
+            summary = register_pydatalog_facts(df)  # starts a fresh logic in this thread
+            define_family_rules()
+            logic = pyDatalog.Logic(True)
+            setattr(logic, _INSTANCE_ATTRIBUTE, self.name)
+        finally:
+            pyDatalog.Logic(previous)
+        with self._lock:
+            self._logic = logic
+            self.summary = summary
+        return summary
+
+    def drop(self) -> None:
+        """Releases the facts, rules and indexes of this instance."""
+        with self._lock:
+            self._logic = None
+            self.summary = {}
+
+    @contextmanager
+    def activate(self) -> Iterator["FamilyKB"]:
+        """
+        Makes this instance the current knowledge base of the calling thread inside the block.
+
+        Raises:
+            RuntimeError: If the instance is not loaded.
+        """
+        with self._lock:
+            logic = self._logic
+        if logic is None:
+            raise RuntimeError(f"Knowledge base '{self.name}' is not loaded")
+        previous = pyDatalog.Logic(True)
+        pyDatalog.Logic(logic)
+        try:
+            yield self
+        finally:
+            active = pyDatalog.Logic(True)
+            with self._lock:
+                # Keep indexes and facts added in the block, unless the instance was reloaded meanwhile
+                if self._logic is logic and getattr(active, _INSTANCE_ATTRIBUTE, None) == self.name:
+                    self._logic = active
+            pyDatalog.Logic(previous)
+
+    def ask(self, query: str, **limits: Optional[float]) -> List[Tuple[str, ...]]:
+        """
+        Runs a PyDatalog query on this instance, under optional limits (see src.governor).
+
+        Returns:
+            The sorted, deduplicated answer rows as tuples of strings.
+        """
+        with self.activate():
+            return sorted(set(tuple(str(v) for v in row) for row in governed_ask(query, **limits)))
+
+    def memory_bytes(self) -> int:
+        """Estimated memory held by this instance (facts, rules, tables and cached indexes), in bytes."""
+        with self._lock:
+            logic = self._logic
+        return _deep_size(logic) if logic is not None else 0
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "empty"
+        return f"FamilyKB({self.name!r}, {state})"
+
+class KBRegistry:
+    """Named FamilyKB instances of one process, e.g. one per client."""
+
+    def __init__(self):
+        self._instances: Dict[str, FamilyKB] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str, source: Union[str, pd.DataFrame], on_invalid: str = "report") -> FamilyKB:
+        """Loads (or reloads) the instance called name from a CSV file or DataFrame and returns it."""
+        with self._lock:
+            kb = self._instances.get(name)
+            if kb is None:
+                kb = self._instances[name] = FamilyKB(name)
+        kb.load(source, on_invalid)
+        return kb
+
+    def get(self, name: str) -> FamilyKB:
+        """
+        Raises:
+            KeyError: If no instance of that name is loaded.
+        """
+        with self._lock:
+            if name not in self._instances:
+                raise KeyError(f"No knowledge base named '{name}'")
+            return self._instances[name]
+
+    def drop(self, name: str) -> None:
+        """
+        Drops the instance called name and its memory.
+
+        Raises:
+            KeyError: If no instance of that name is loaded.
+        """
+        with self._lock:
+            kb = self._instances.pop(name)
+        kb.drop()
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._instances)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Estimated bytes held by each instance."""
+        with self._lock:
+            instances = sorted(self._instances.items())
+        return {name: kb.memory_bytes() for name, kb in instances}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._instances
+
+    def __len__(self) -> int:
+        return len(self._instances)
@@ -0,0 +1,76 @@
+"""
+A static centered interval tree for point ("as of") lookups.
+
+Intervals are half-open, [start, end), and any totally ordered keys can be used
+(dates, numbers). A lookup visits O(log n + k) intervals for k matches instead of
+scanning all n.
+
+Example usage:
+    tree = IntervalTree([(1, 5, "a"), (3, 9, "b")])
+    tree.at(4)    # ['a', 'b']
+"""
+from typing import Any, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start    # intervals overlapping center, ascending start
+        self.by_end = by_end        # the same intervals, descending end
+        self.left = left
+        self.right = right
+
+class IntervalTree(Generic[T]):
+    """
+    Immutable interval tree over (start, end, payload) triples.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, T]]):
+        items = [iv for iv in intervals if iv[0] < iv[1]]  # empty intervals never match
+        self._size = len(items)
+        self._root = self._build(items)
+
+    @classmethod
+    def _build(cls, items: List[Tuple[Any, Any, T]]) -> Optional[_Node]:
+        if not items:
+            return None
+        # The median start always lands in this node, so every level makes progress
+        starts = sorted(iv[0] for iv in items)
+        center = starts[len(starts) // 2]
+        here, left, right = [], [], []
+        for iv in items:
+            if iv[1] <= center:
+                left.append(iv)
+            elif iv[0] > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+        return _Node(center,
+                     sorted(here, key=lambda iv: iv[0]),
+                     sorted(here, key=lambda iv: iv[1], reverse=True),
+                     cls._build(left), cls._build(right))
+
+    def at(self, point: Any) -> List[T]:
+        """Payloads of all intervals with start <= point < end."""
+        found = []
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                for start, end, payload in node.by_start:
+                    if start > point:
+                        break
+                    found.append(payload)
+                node = node.left
+            else:
+                for start, end, payload in node.by_end:
+                    if end <= point:
+                        break
+                    found.append(payload)
+                node = node.right
+        return found
+
+    def __len__(self) -> int:
+        return self._size
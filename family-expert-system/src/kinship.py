@@ -0,0 +1,157 @@
+"""
+Kinship coefficients over the biological (father/mother) pedigree.
+
+The kinship coefficient phi(x, y) is the probability that an allele drawn at random
+from x and one drawn from y are identical by descent. It is computed with the
+standard recursive pedigree algorithm, expanding whichever of the two people comes
+later in the topological order (so never an ancestor of the other):
+    phi(x, x) = (1 + phi(father_x, mother_x)) / 2
+    phi(x, y) = (phi(father_x, y) + phi(mother_x, y)) / 2
+An unknown parent contributes 0. Adoptive links are not followed, and edges ignored
+by FamilyGraph.topological_order (self-parenting and cycles) are left out.
+
+Computed pairs are memoized in a bounded cache. When it is full, the pairs lowest in
+the pedigree are evicted first: pairs of earlier generations are the ones shared by
+most later queries.
+
+Example usage:
+    calculator = KinshipCalculator(graph)
+    calculator.coefficient("Paul", "Emma")       # 0.125: nephew and aunt
+    calculator.coefficient("Isla", "Isla")       # 0.6875: her parents are related
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.graph import FamilyGraph, current_graph
+from src.views import cached_on_logic
+
+DEFAULT_CACHE_SIZE = 100_000
+
+class KinshipCalculator:
+    """
+    Memoized kinship coefficients for one family graph.
+    """
+
+    def __init__(self, graph: FamilyGraph, max_cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            graph: The family graph.
+            max_cache_size: Maximum number of memoized pairs kept between queries.
+        """
+        if max_cache_size < 0:
+            raise ValueError("max_cache_size must be non-negative")
+        order, ignored = graph.topological_order()
+        ignored = set(ignored)
+        self._position: Dict[str, int] = {name: i for i, name in enumerate(order)}
+        self._parents: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for name in order:
+            father = next((p for p in graph.fathers(name) if (p, name) not in ignored), None)
+            mother = next((p for p in graph.mothers(name) if (p, name) not in ignored), None)
+            self._parents[name] = (father, mother)
+
+        self.max_cache_size = max_cache_size
+        self._cache: Dict[Tuple[str, str], float] = {}
+        self._eviction: List[Tuple[int, int, Tuple[str, str]]] = []  # max-heap on the later member's position
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, x: str, y: str) -> Tuple[str, str]:
+        """Orders a pair so that the second member is the one to expand."""
+        return (x, y) if self._position[x] <= self._position[y] else (y, x)
+
+    def _dependencies(self, key: Tuple[str, str]) -> List[Tuple[str, str]]:
+        earlier, later = key
+        father, mother = self._parents[later]
+        if earlier == later:
+            return [self._key(father, mother)] if father and mother else []
+        return [self._key(parent, earlier) for parent in (father, mother) if parent]
+
+    def _combine(self, key: Tuple[str, str], values: Dict[Tuple[str, str], float]) -> float:
+        earlier, later = key
+        father, mother = self._parents[later]
+        if earlier == later:
+            return (1.0 + (values[self._key(father, mother)] if father and mother else 0.0)) / 2
+        return sum(values[self._key(parent, earlier)] for parent in (father, mother) if parent) / 2
+
+    def _remember(self, key: Tuple[str, str], value: float) -> None:
+        if self.max_cache_size == 0 or key in self._cache:
+            return
+        while len(self._cache) >= self.max_cache_size:
+            _, _, evicted = heapq.heappop(self._eviction)
+            del self._cache[evicted]
+        self._cache[key] = value
+        heapq.heappush(self._eviction, (-self._position[key[1]], -self._position[key[0]], key))
+
+    def coefficient(self, x: str, y: str) -> float:
+        """
+        Kinship coefficient of x and y. People outside the graph are treated as unrelated
+        founders (0.5 with themselves, 0 with anyone else).
+        """
+        if x not in self._position or y not in self._position:
+            return 0.5 if x == y else 0.0
+        target = self._key(x, y)
+        if target in self._cache:
+            self._hits += 1
+            return self._cache[target]
+        self._misses += 1
+
+        # Iterative depth-first evaluation, so deep lineages do not hit the recursion limit.
+        # Values of this query are kept locally until it finishes, so evictions cannot lose them.
+        values: Dict[Tuple[str, str], float] = {}
+        stack = [target]
+        while stack:
+            key = stack[-1]
+            if key in values:
+                stack.pop()
+                continue
+            if key in self._cache:
+                values[key] = self._cache[key]
+                stack.pop()
+                continue
+            missing = [d for d in self._dependencies(key) if d not in values and d not in self._cache]
+            if missing:
+                stack.extend(missing)
+                continue
+            for d in self._dependencies(key):
+                if d not in values:
+                    values[d] = self._cache[d]
+            values[key] = self._combine(key, values)
+            stack.pop()
+
+        for key in sorted(values, key=lambda k: self._position[k[1]]):
+            self._remember(key, values[key])
+        return values[target]
+
+    def coefficients(self, pairs: Iterable[Tuple[str, str]]) -> List[float]:
+        """
+        Kinship coefficients for many pairs, in input order. Pairs are evaluated from the
+        earliest generation down, so later pairs reuse the memoized ancestral ones.
+        """
+        pairs = list(pairs)
+        def depth(pair):
+            return max(self._position.get(pair[0], -1), self._position.get(pair[1], -1))
+        results: List[float] = [0.0] * len(pairs)
+        for i in sorted(range(len(pairs)), key=lambda i: depth(pairs[i])):
+            results[i] = self.coefficient(*pairs[i])
+        return results
+
+    def inbreeding(self, person: str) -> float:
+        """Inbreeding coefficient of person: the kinship coefficient of their parents."""
+        return 2 * self.coefficient(person, person) - 1
+
+    def cache_info(self) -> Dict[str, int]:
+        """Cache hits and misses (counted per coefficient call) and current size."""
+        return {"hits": self._hits, "misses": self._misses,
+                "size": len(self._cache), "max_size": self.max_cache_size}
+
+def current_kinship() -> KinshipCalculator:
+    """KinshipCalculator of the currently loaded knowledge base, built on first use."""
+    return cached_on_logic('kinship', lambda: KinshipCalculator(current_graph()))
@@ -0,0 +1,263 @@
+"""
+Operational metrics of the query and load paths.
+
+Counters and latency histograms are kept in one process-wide registry:
+
+    family_load_seconds{stage}          histogram  read_csv, register_facts, define_rules, reload
+    family_helper_seconds{helper}       histogram  every public helper of src.queries
+    family_helper_asks{helper}          histogram  pyDatalog.ask calls issued per helper call,
+                                                   those of nested helpers included
+    family_helper_errors_total{helper}  counter    helper calls that raised
+    family_asks_total{helper,relation}  counter    pyDatalog.ask calls, by innermost calling
+                                                   helper ("" outside helpers) and first predicate
+    family_ask_seconds{relation}        histogram  latency of each pyDatalog.ask
+
+The size of the currently loaded knowledge base is reported with every snapshot:
+
+    family_facts{relation}              gauge      base facts per relation
+    family_derived_tuples{relation}     gauge      rows of every materialized view (src.views)
+
+Asks are recorded by calling ask() instead of pyDatalog.ask, helpers by decorating them
+with instrumented_helper and load stages with timed_stage. Recording takes one lock and a
+few dictionary updates per event.
+
+Example usage:
+    is_aunt_or_uncle("Kevin", "Kevin")
+    snapshot()["counters"]["family_asks_total"]    # [{'labels': {'helper': 'is_aunt_or_uncle', 'relation': 'aunt'}, 'value': 1}, ...]
+    print(to_prometheus())
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import functools
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from pyDatalog import pyDatalog
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upper bounds of the asks-per-helper-call histogram buckets
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# metric -> (type, help text, bucket bounds for histograms)
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "family_load_seconds": ("histogram", "Duration of load stages", LATENCY_BUCKETS),
+    "family_helper_seconds": ("histogram", "Duration of public helper calls", LATENCY_BUCKETS),
+    "family_helper_asks": ("histogram", "pyDatalog.ask calls issued per helper call", COUNT_BUCKETS),
+    "family_helper_errors_total": ("counter", "Helper calls that raised an exception", ()),
+    "family_asks_total": ("counter", "pyDatalog.ask calls by calling helper and relation", ()),
+    "family_ask_seconds": ("histogram", "Duration of pyDatalog.ask calls", LATENCY_BUCKETS),
+    "family_facts": ("gauge", "Base facts in the loaded knowledge base", ()),
+    "family_derived_tuples": ("gauge", "Rows of the materialized relation views", ()),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, num_buckets: int):
+        self.counts = [0] * (num_buckets + 1)  # the last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+_current = threading.local()  # stack of [helper name, asks issued] of the helpers running in this thread
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted(labels.items()))
+
+def increment(metric: str, value: float = 1, **labels: str) -> None:
+    key = (metric, _labels(**labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(metric: str, value: float, **labels: str) -> None:
+    """Records value in the histogram metric."""
+    bounds = METRICS[metric][2]
+    key = (metric, _labels(**labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(len(bounds))
+        histogram.counts[bisect_left(bounds, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+def reset() -> None:
+    """Forgets every recorded counter and histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+_PREDICATE = re.compile(r"\s*~?\s*(\w+)\s*\(")
+# Called before and after every ask, e.g. the time limit of src.governor
+_ask_checks: List[Callable[[], None]] = []
+
+def add_ask_check(check: Callable[[], None]) -> None:
+    """Registers a check run before and after every ask(); it may raise to abort the caller."""
+    _ask_checks.append(check)
+
+def ask(query: str):
+    """pyDatalog.ask(query), counted and timed under the current helper and the query's first predicate."""
+    match = _PREDICATE.match(query)
+    relation = match.group(1) if match else ""
+    stack = getattr(_current, "stack", None)
+    for frame in stack or ():
+        frame[1] += 1
+    start = time.perf_counter()
+    try:
+        for check in _ask_checks:
+            check()
+        answer = pyDatalog.ask(query)
+        for check in _ask_checks:
+            check()
+        return answer
+    finally:
+        observe("family_ask_seconds", time.perf_counter() - start, relation=relation)
+        increment("family_asks_total", helper=stack[-1][0] if stack else "", relation=relation)
+
+def instrumented_helper(function: F) -> F:
+    """Records the duration, errors and number of asks of every call of a public helper."""
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stack = getattr(_current, "stack", None)
+        if stack is None:
+            stack = _current.stack = []
+        frame = [name, 0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            increment("family_helper_errors_total", helper=name)
+            raise
+        finally:
+            stack.pop()
+            observe("family_helper_seconds", time.perf_counter() - start, helper=name)
+            observe("family_helper_asks", frame[1], helper=name)
+
+    return wrapper  # type: ignore[return-value]
+
+@contextmanager
+def _stage_timer(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("family_load_seconds", time.perf_counter() - start, stage=stage)
+
+def timed_stage(stage: str) -> Callable[[F], F]:
+    """Decorator recording the duration of every call in family_load_seconds{stage}."""
+    def decorate(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _stage_timer(stage):
+                return function(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+def kb_size() -> Dict[str, Dict[str, int]]:
+    """
+    Size of the currently loaded knowledge base: base facts per relation (one count query
+    each) and rows per materialized view. Relations without a view are not evaluated.
+    """
+    # Imported here: src.rules and src.views load src.facts, which is itself instrumented
+    from src.rules import BASE_RELATIONS, RELATION_ARITIES
+    from src.views import peek_cached
+
+    facts = {}
+    for relation in BASE_RELATIONS:
+        variables = ", ".join(f"Q{i}" for i in range(RELATION_ARITIES[relation]))
+        answer = ask(f"{relation}({variables})")
+        facts[relation] = len(answer.answers) if answer else 0
+    views = peek_cached('views') or {}
+    return {"facts": facts, "derived_tuples": {name: len(view) for name, view in sorted(views.items())}}
+
+def snapshot(include_kb: bool = True) -> Dict[str, Any]:
+    """
+    Every metric as JSON-serializable data: {"counters": {...}, "histograms": {...}, "gauges": {...}},
+    each metric holding a list of {"labels", ...} series. Histogram buckets are cumulative,
+    keyed by their upper bound ("+Inf" last).
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(h.counts), h.sum, h.count)) for key, h in _histograms.items())
+    result: Dict[str, Any] = {"counters": {}, "histograms": {}, "gauges": {}}
+    for (metric, labels), value in counters:
+        result["counters"].setdefault(metric, []).append({"labels": dict(labels), "value": value})
+    for (metric, labels), (counts, total, count) in histograms:
+        bounds = [str(b) for b in METRICS[metric][2]] + ["+Inf"]
+        cumulative, running = {}, 0
+        for bound, n in zip(bounds, counts):
+            running += n
+            cumulative[bound] = running
+        result["histograms"].setdefault(metric, []).append(
+            {"labels": dict(labels), "buckets": cumulative, "sum": total, "count": count})
+    if include_kb:
+        size = kb_size()
+        result["gauges"]["family_facts"] = [{"labels": {"relation": r}, "value": n} for r, n in size["facts"].items()]
+        result["gauges"]["family_derived_tuples"] = [{"labels": {"relation": r}, "value": n}
+                                                     for r, n in size["derived_tuples"].items()]
+    return result
+
+def to_json(include_kb: bool = True) -> str:
+    return json.dumps(snapshot(include_kb))
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in items)
+    return "{" + ",".join(escaped) + "}"
+
+def to_prometheus(include_kb: bool = True) -> str:
+    """The snapshot in the Prometheus text exposition format."""
+    data = snapshot(include_kb)
+    lines: List[str] = []
+    for kind in ("counters", "histograms", "gauges"):
+        for metric, series in data[kind].items():
+            metric_type, help_text, _ = METRICS[metric]
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for s in series:
+                if kind != "histograms":
+                    lines.append(f"{metric}{_format_labels(s['labels'])} {s['value']}")
+                    continue
+                for bound, n in s["buckets"].items():
+                    lines.append(f"{metric}_bucket{_format_labels(s['labels'], ('le', bound))} {n}")
+                lines.append(f"{metric}_sum{_format_labels(s['labels'])} {s['sum']}")
+                lines.append(f"{metric}_count{_format_labels(s['labels'])} {s['count']}")
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import io
+
+    parser = argparse.ArgumentParser(description="Run the sample queries and print the metrics.")
+    parser.add_argument("--format", choices=("prometheus", "json"), default="prometheus")
+    args = parser.parse_args()
+    # The helpers record into src.metrics, not into this module run as __main__
+    from src import metrics, queries
+    with contextlib.redirect_stdout(io.StringIO()):
+        queries.run_all_queries()
+        queries.relatives_within_generations('Adam', 2)
+    print(metrics.to_prometheus() if args.format == "prometheus" else metrics.to_json())
@@ -0,0 +1,153 @@
+"""
+Fuzzy person lookup.
+
+Queries need exact names, so "alice", "Zoe" for "Zoë" or a typo silently match nobody.
+NameIndex folds every name (Unicode decomposition without accents, case folding,
+collapsed whitespace) and indexes the folded form by character trigrams. A lookup
+first tries the folded form exactly, then shortlists the people sharing most of the
+query's rarest trigrams and scores them by bigram similarity (Dice coefficient), which
+is more forgiving than trigrams of a typo in a short name. Only posting lists up to a
+fixed budget are scanned, so the cost does not grow with the number of names; a query
+made only of trigrams too common to fit the budget gets no fuzzy candidates.
+
+find returns candidates and only resolves the query to a person when that is
+unambiguous: a single exact (folded) match, or a fuzzy winner that is similar enough
+word by word and clearly ahead of the runner-up. The word check keeps a shared first
+name from carrying a different surname ("Anna Mdqvac" is not "Anna Kovac"). Several
+people folding to the same name, or a close tie, are reported as ambiguous instead of
+being guessed.
+
+Example usage:
+    index = NameIndex(graph.names)
+    index.find("alcie")     # {'query': 'alcie', 'match': 'Alice', 'ambiguous': False,
+                            #  'candidates': [('Alice', 0.5), ...]}
+    find_person("ZOE", k=3)
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import heapq
+import unicodedata
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from src.graph import current_graph
+from src.views import cached_on_logic
+
+# Minimum similarity of a fuzzy match that may be resolved without being exact
+MIN_SCORE = 0.5
+# Lead the best fuzzy candidate needs over the second one to be resolved
+MIN_MARGIN = 0.1
+# Posting entries scanned per lookup; longer (more common) posting lists are skipped
+MAX_POSTINGS = 4000
+# Candidates (by rare-trigram overlap) scored exactly per lookup, besides k
+SHORTLIST = 50
+
+def fold(name: str) -> str:
+    """Case- and accent-insensitive form of a name: 'Zoë  O’Neil' -> 'zoe o’neil'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+def ngrams(folded: str, n: int) -> Set[str]:
+    """Character n-grams of a folded name, padded so that short names have some."""
+    padded = " " * (n - 1) + folded + " "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def similarity(a: str, b: str) -> float:
+    """Dice coefficient of the bigrams of two folded names (1.0 when equal)."""
+    grams_a, grams_b = ngrams(a, 2), ngrams(b, 2)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+def token_similarity(a: str, b: str) -> float:
+    """
+    Similarity of the worst-matched word of two folded names: every word of either name
+    is compared with its most similar word in the other.
+    """
+    tokens_a, tokens_b = a.split() or [a], b.split() or [b]
+    return min(min(max(similarity(x, y) for y in tokens_b) for x in tokens_a),
+               min(max(similarity(x, y) for x in tokens_a) for y in tokens_b))
+
+class NameIndex:
+    """
+    Folded-name and trigram index over a collection of names.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: Tuple[str, ...] = tuple(sorted(set(names)))
+        self._folded: Tuple[str, ...] = tuple(fold(name) for name in self.names)
+        self._exact: Dict[str, List[int]] = {}
+        postings: Dict[str, List[int]] = {}
+        for i, folded in enumerate(self._folded):
+            self._exact.setdefault(folded, []).append(i)
+            for gram in ngrams(folded, 3):
+                postings.setdefault(gram, []).append(i)
+        self._postings: Dict[str, np.ndarray] = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def ambiguous_names(self) -> Dict[str, Tuple[str, ...]]:
+        """Folded forms shared by several people, e.g. {'zoe': ('Zoe', 'Zoë')}."""
+        return {folded: tuple(self.names[i] for i in ids) for folded, ids in self._exact.items() if len(ids) > 1}
+
+    def candidates(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """The k most similar names with their similarity (1.0 for an exact folded match), best first."""
+        folded = fold(query)
+        grams = ngrams(folded, 3)
+        exact = self._exact.get(folded, [])
+        rare = []
+        budget = MAX_POSTINGS
+        for gram in sorted((g for g in grams if g in self._postings), key=lambda g: len(self._postings[g])):
+            ids = self._postings[gram]
+            if len(ids) > budget:
+                break
+            rare.append(ids)
+            budget -= len(ids)
+        shortlist = set(exact)
+        if rare:
+            # Best candidates by rare-trigram overlap, then scored exactly
+            ids, counts = np.unique(np.concatenate(rare), return_counts=True)
+            best = ids[counts >= counts.max() - 2]
+            if len(best) > SHORTLIST + k:
+                best = ids[np.argsort(-counts, kind="stable")[:SHORTLIST + k]]
+            shortlist.update(best.tolist())
+        scored = [(self.names[i], 1.0 if i in exact else similarity(folded, self._folded[i])) for i in shortlist]
+        return heapq.nsmallest(k, scored, key=lambda item: (-item[1], item[0]))
+
+    def find(self, query: str, k: int = 5) -> Dict[str, Any]:
+        """
+        Resolves a person's name, tolerating case, accents, spacing and small typos.
+
+        Returns:
+            {"query", "match", "ambiguous", "candidates"}: match is the resolved name, or None
+            when no candidate is good enough or the query is ambiguous; candidates lists up to
+            k (name, score) pairs, best first.
+        """
+        exact = self._exact.get(fold(query), [])
+        if exact:
+            # Exact (folded) matches are the best candidates; no need to scan the trigrams
+            candidates = [(self.names[i], 1.0) for i in exact]
+        else:
+            candidates = self.candidates(query, max(k, 2))
+        match = None
+        ambiguous = False
+        if exact:
+            ambiguous = len(exact) > 1
+            match = None if ambiguous else self.names[exact[0]]
+        elif candidates and candidates[0][1] >= MIN_SCORE \
+                and token_similarity(fold(query), fold(candidates[0][0])) >= MIN_SCORE:
+            runner_up = candidates[1][1] if len(candidates) > 1 else 0.0
+            ambiguous = candidates[0][1] - runner_up < MIN_MARGIN
+            match = None if ambiguous else candidates[0][0]
+        return {"query": query, "match": match, "ambiguous": ambiguous, "candidates": candidates[:k]}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+def current_name_index() -> NameIndex:
+    """NameIndex over every person of the currently loaded knowledge base, built on first use."""
+    return cached_on_logic('names', lambda: NameIndex(current_graph().names))
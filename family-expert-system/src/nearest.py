@@ -0,0 +1,103 @@
+"""
+Nearest relatives of a person, ranked by a weighted kinship distance.
+
+The family is searched as a weighted graph with five kinds of edges: biological parent,
+biological child, spouse, sibling (sharing a parent, as in the sibling rule) and adoption
+(adoptive parent or adoptive child, both ways). The distance of a relative is the
+cheapest path to them (Dijkstra's algorithm). People are settled in increasing distance,
+ties broken by name, and the search stops as soon as k people are settled, so only the
+neighbourhood needed for the answer is expanded.
+
+Example usage:
+    closest_relatives(graph, "Liam", 3)         # [('Ella', 1.0), ('Emily', 1.0), ('Emma', 1.0)]
+    closest_relatives(graph, "Liam", 5, weights={"spouse": 3.0})
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from src.graph import FamilyGraph
+
+# Weight of each kind of edge: marriage and adoption ties count a little further than blood ties
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "parent": 1.0,
+    "child": 1.0,
+    "sibling": 1.0,
+    "spouse": 1.5,
+    "adoption": 1.5,
+}
+
+def _weights(overrides: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """
+    DEFAULT_WEIGHTS with the given overrides.
+
+    Raises:
+        ValueError: If an edge kind is unknown or a weight is not positive.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for kind, weight in (overrides or {}).items():
+        if kind not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown edge kind '{kind}'; expected one of {tuple(DEFAULT_WEIGHTS)}")
+        if not weight > 0:
+            raise ValueError(f"Weight of '{kind}' edges must be positive, got {weight}")
+        weights[kind] = float(weight)
+    return weights
+
+def _edges(g: FamilyGraph, person: str, weights: Dict[str, float]) -> List[Tuple[str, float]]:
+    """(neighbour, weight) pairs of person; a neighbour linked in several ways appears several times."""
+    biological_children = g.biological_children(person)
+    adopted = [c for c in g.children(person) if c not in biological_children]
+    siblings = {x for p in g.parents(person) for x in g.children(p) if x != person}
+    return ([(p, weights["parent"]) for p in g.biological_parents(person)] +
+            [(c, weights["child"]) for c in biological_children] +
+            [(s, weights["sibling"]) for s in siblings] +
+            [(s, weights["spouse"]) for s in g.spouses(person)] +
+            [(a, weights["adoption"]) for a in g.adoptive_parents(person) + tuple(adopted)])
+
+def closest_relatives(g: FamilyGraph, person: str, k: int,
+                      weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+    """
+    The k relatives of person with the smallest weighted distance.
+
+    Args:
+        g: The family graph.
+        person: Whose relatives to rank; not part of the result.
+        k: Number of relatives to return (fewer if the family is smaller).
+        weights: Overrides of DEFAULT_WEIGHTS, e.g. {"spouse": 3.0}.
+
+    Returns:
+        (name, distance) pairs, nearest first, ties by name.
+
+    Raises:
+        ValueError: If k is negative, or an edge kind or weight is invalid.
+    """
+    if k < 0:
+        raise ValueError(f"k must be non-negative, got {k}")
+    weights = _weights(weights)
+    best: Dict[str, float] = {person: 0.0}
+    settled = {person}
+    heap: List[Tuple[float, str]] = []
+    ranked: List[Tuple[str, float]] = []
+    current = person
+    while len(ranked) < k:
+        for neighbour, weight in _edges(g, current, weights):
+            distance = best[current] + weight
+            if neighbour not in settled and distance < best.get(neighbour, float("inf")):
+                best[neighbour] = distance
+                heapq.heappush(heap, (distance, neighbour))
+        # Skip heap entries superseded by a shorter path
+        while heap and heap[0][1] in settled:
+            heapq.heappop(heap)
+        if not heap:
+            break
+        distance, current = heapq.heappop(heap)
+        settled.add(current)
+        ranked.append((current, distance))
+    return ranked
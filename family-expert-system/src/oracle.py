@@ -0,0 +1,438 @@
+"""
+Differential testing of the alternative evaluation paths against PyDatalog.
+
+The same relations are answered by several engines: PyDatalog itself (the reference),
+the person-centric functions of src.relations over a FamilyGraph, the streaming
+iter_relation of src.pagination, the materialized views of src.views and the
+GenerationIndex of src.generations. The helpers of src.queries are likewise compared
+with direct graph implementations of their definitions.
+
+random_pedigree generates families with remarriages (half-siblings, step relations),
+single parents, adoptions, marriages between relatives and optional deep lines of
+descent. For every mismatch the pedigree is shrunk (rows removed, then fields blanked)
+while the mismatch persists, and the smallest failing CSV is reported.
+
+Running the oracle replaces the currently loaded knowledge base.
+
+Example usage:
+    reports = run_oracle(seeds=range(20), num_people=30)
+    print(format_report(reports))
+
+    python src/oracle.py --seeds 50 --people 40
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+from functools import lru_cache
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from pyDatalog import pyDatalog
+
+from src import queries
+from src.facts import COLUMNS
+from src.generations import GenerationIndex
+from src.graph import FamilyGraph, current_graph
+from src.pagination import iter_relation
+from src.relations import PERSON_PREDICATES, PERSON_RELATIONS, ancestors, aunts, siblings, uncles
+from src.rules import RELATION_ARITIES
+from src.views import DEFAULT_VIEWS, materialize_views
+
+Row = Tuple[Any, ...]
+# An engine answers a relation with the set of its rows, or None when it does not support it
+Engine = Callable[[str], Optional[Set[Row]]]
+
+# Pairs checked per pairwise helper; smaller pedigrees are checked exhaustively
+MAX_PAIRS = 300
+
+def random_pedigree(seed: int, num_people: int = 30, remarriage_rate: float = 0.2,
+                    marriage_rate: float = 0.3, single_parent_rate: float = 0.1,
+                    adoption_rate: float = 0.1, deep_generations: int = 0) -> pd.DataFrame:
+    """
+    Generates a random family in the CSV format of data/family_facts.csv.
+
+    Args:
+        seed: Seed of the random generator (the same seed gives the same family).
+        num_people: Number of people before the deep line is added.
+        remarriage_rate: Chance that a step adds a new spouse to someone already present.
+        marriage_rate: Chance that a new child marries someone already present (relatives included).
+        single_parent_rate: Chance that a child has only its father or only its mother recorded.
+        adoption_rate: Chance that a person is adopted by someone listed before them.
+        deep_generations: Length of an extra single line of descent from a random person.
+
+    Returns:
+        A DataFrame with the columns Name, Gender, Father, Mother, Spouses and Notes.
+    """
+    rng = random.Random(seed)
+    people: Dict[str, Dict[str, Any]] = {}
+    couples: List[Tuple[str, str]] = []
+
+    def add(gender: str, father: str = "", mother: str = "") -> str:
+        name = f"P{len(people):03d}"
+        people[name] = {"Name": name, "Gender": gender, "Father": father, "Mother": mother,
+                        "Spouses": [], "Notes": ""}
+        return name
+
+    def marry(a: str, b: str) -> None:
+        people[a]["Spouses"].append(b)
+        people[b]["Spouses"].append(a)
+        couples.append((a, b) if people[a]["Gender"] == "Male" else (b, a))
+
+    def other(gender: str) -> str:
+        return "Female" if gender == "Male" else "Male"
+
+    for _ in range(2):
+        marry(add("Male"), add("Female"))
+
+    while len(people) < num_people:
+        if rng.random() < remarriage_rate:
+            person = rng.choice(list(people))
+            marry(person, add(other(people[person]["Gender"])))
+            continue
+        father, mother = rng.choice(couples)
+        if rng.random() < single_parent_rate:
+            father, mother = (father, "") if rng.random() < 0.5 else ("", mother)
+        child = add(rng.choice(["Male", "Female"]), father, mother)
+        if rng.random() < marriage_rate:
+            candidates = [x for x in people if people[x]["Gender"] == other(people[child]["Gender"])
+                          and x not in (father, mother) and x not in people[child]["Spouses"]]
+            if candidates:
+                marry(child, rng.choice(candidates))
+
+    current = rng.choice(list(people))
+    for _ in range(deep_generations):
+        gender = people[current]["Gender"]
+        current = add(rng.choice(["Male", "Female"]), *((current, "") if gender == "Male" else ("", current)))
+
+    names = list(people)
+    for i, child in enumerate(names[1:], start=1):
+        if rng.random() < adoption_rate:
+            # Adopters come earlier in the list, so adoption never creates a parent cycle
+            adopters = [x for x in names[:i] if not people[x]["Notes"]
+                        and x not in (people[child]["Father"], people[child]["Mother"])]
+            if adopters:
+                adopter = rng.choice(adopters)
+                role = "father" if people[adopter]["Gender"] == "Male" else "mother"
+                people[adopter]["Notes"] = f"Adoptive {role} of {child}"
+
+    rows = [{**row, "Spouses": ";".join(row["Spouses"])} for row in people.values()]
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+@contextlib.contextmanager
+def pedigree_session(df: pd.DataFrame) -> Iterator[None]:
+    """Loads the facts of df (through a temporary CSV) and the rules, pinned as in kb_session."""
+    with tempfile.TemporaryDirectory() as tmp, contextlib.ExitStack() as stack:
+        path = os.path.join(tmp, "pedigree.csv")
+        df.to_csv(path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stack.enter_context(queries.kb_session(path))
+        yield
+
+# Engines
+
+def datalog_rows(relation: str) -> Set[Row]:
+    """The reference answer: every row of relation from a single PyDatalog query."""
+    variables = ", ".join(f"Q{i}" for i in range(RELATION_ARITIES[relation]))
+    answer = pyDatalog.ask(f"{relation}({variables})")
+    return {tuple(str(v) for v in row) for row in answer.answers} if answer else set()
+
+def graph_engine(relation: str) -> Optional[Set[Row]]:
+    """src.relations over every name of the graph."""
+    g = current_graph()
+    if relation in PERSON_PREDICATES:
+        return {(x,) for x in g.names if PERSON_PREDICATES[relation](g, x)}
+    return {(x, y) for y in g.names for x in PERSON_RELATIONS[relation](g, y)}
+
+def pagination_engine(relation: str) -> Optional[Set[Row]]:
+    """src.pagination.iter_relation, one first argument at a time."""
+    return set(iter_relation(relation))
+
+def views_engine(relation: str) -> Optional[Set[Row]]:
+    """The materialized views of src.views (default views only)."""
+    if relation not in DEFAULT_VIEWS:
+        return None
+    return set(materialize_views([relation])[relation].pairs)
+
+def generations_engine(relation: str) -> Optional[Set[Row]]:
+    """The ancestor/descendant relations answered by a GenerationIndex."""
+    g = current_graph()
+    index = GenerationIndex(g)
+    distances = {'grandparent': (index.ancestors_at, [2]), 'great_grandparent': (index.ancestors_at, [3]),
+                 'grandchild': (index.descendants_at, [2]),
+                 'ancestor': (index.ancestors_at, None), 'descendant': (index.descendants_at, None)}
+    if relation not in distances:
+        return None
+    lookup, levels = distances[relation]
+    rows = set()
+    for y in g.names:
+        depth = index.max_distance_above(y) if lookup == index.ancestors_at else index.max_distance_below(y)
+        for k in levels or range(1, depth + 1):
+            rows.update((x, y) for x in lookup(y, k))
+    return rows
+
+ENGINES: Dict[str, Engine] = {
+    'graph': graph_engine,
+    'pagination': pagination_engine,
+    'views': views_engine,
+    'generations': generations_engine,
+}
+
+# Helper checks: each returns (helper rows, graph rows) over deterministic arguments
+
+def _pairs(names: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    pairs = [(x, y) for x, y in product(names, names)]
+    return pairs if len(pairs) <= MAX_PAIRS else random.Random(len(names)).sample(pairs, MAX_PAIRS)
+
+def _relatives_within(g: FamilyGraph, person: str, generations: int) -> Set[str]:
+    """queries.relatives_within_generations, step for step, over the graph."""
+    to_explore = {(person, 0)}
+    found: Set[str] = set()
+    visited = {person}
+    current_generation = 0
+    while current_generation <= generations:
+        next_to_explore = set()
+        for current, depth in to_explore:
+            if depth > current_generation:
+                continue
+            for neighbours, step in ((g.parents, 1), (g.children, 1),
+                                     (lambda p: siblings(g, p), 0), (g.spouses, 0)):
+                for other in neighbours(current):
+                    if other not in visited:
+                        found.add(other)
+                        next_to_explore.add((other, depth + step))
+                        visited.add(other)
+        to_explore = {(p, d) for p, d in next_to_explore if d <= generations}
+        current_generation += 1
+    found.discard(person)
+    return found
+
+def _cousin_within(g: FamilyGraph, x: str, y: str, n: int) -> bool:
+    """Some ancestor is exactly d <= n generations above both x and y (shortest distances), x != y, not siblings."""
+    def depths(person):
+        found, frontier, depth = {}, [person], 0
+        seen = {person}
+        while frontier and depth < n:
+            depth += 1
+            frontier = [p for c in frontier for p in g.parents(c) if p not in seen and not seen.add(p)]
+            found.update((p, depth) for p in frontier)
+        return found
+
+    dx, dy = depths(x), depths(y)
+    return x != y and x not in siblings(g, y) and any(dx[a] == dy[a] for a in dx.keys() & dy.keys())
+
+def _at_distance(step, person: str, k: int) -> Set[str]:
+    level = {person}
+    for _ in range(k):
+        level = {p for c in level for p in step(c)}
+    return level
+
+def _kinship(g: FamilyGraph) -> Callable[[str, str], float]:
+    """
+    The textbook recursion: phi(x, x) = (1 + phi(f, m)) / 2, else average over the later one's
+    parents. Edges ignored by the topological order (cycles) are left out, as documented.
+    """
+    order, ignored = g.topological_order()
+    ignored = set(ignored)
+    position = {x: i for i, x in enumerate(order)}
+
+    def kept(parents, child):
+        return [p for p in parents if (p, child) not in ignored]
+
+    @lru_cache(maxsize=None)
+    def phi(x: str, y: str) -> float:
+        if x == y:
+            f, m = kept(g.fathers(x), x), kept(g.mothers(x), x)
+            return (1 + (phi(f[0], m[0]) if f and m else 0.0)) / 2
+        if position[x] < position[y]:
+            x, y = y, x
+        return sum(phi(p, y) for p in kept(g.fathers(x), x) + kept(g.mothers(x), x)) / 2
+
+    return phi
+
+def _helper_checks(g: FamilyGraph) -> Dict[str, Callable[[], Tuple[Set[Row], Set[Row]]]]:
+    names = g.names
+    pairs = _pairs(names)
+    index_depth = 4
+
+    def direct_line():
+        return ({(x, y) for x, y in pairs if queries.is_direct_line_of_descent(x, y)},
+                {(x, y) for x, y in pairs if y in ancestors(g, x)})
+
+    def aunt_or_uncle():
+        def expected(x, y):
+            return "aunt" if x in aunts(g, y) else "uncle" if x in uncles(g, y) else ""
+        return ({(x, y, queries.is_aunt_or_uncle(x, y)[1]) for x, y in pairs},
+                {(x, y, expected(x, y)) for x, y in pairs})
+
+    def cousin_within():
+        return ({(x, y, n) for x, y in pairs for n in (1, 2) if queries.is_cousin_within_n(x, y, n)},
+                {(x, y, n) for x, y in pairs for n in (1, 2) if _cousin_within(g, x, y, n)})
+
+    def relatives_within():
+        return ({(p, n, r) for p in names for n in (1, 2) for r in queries.relatives_within_generations(p, n)},
+                {(p, n, r) for p in names for n in (1, 2) for r in _relatives_within(g, p, n)})
+
+    def at_distance():
+        return ({(p, k, a) for p in names for k in range(index_depth) for a in queries.ancestors_at(p, k)} |
+                {(p, -k, d) for p in names for k in range(index_depth) for d in queries.descendants_at(p, k)},
+                {(p, k, a) for p in names for k in range(index_depth) for a in _at_distance(g.parents, p, k)} |
+                {(p, -k, d) for p in names for k in range(index_depth) for d in _at_distance(g.children, p, k)})
+
+    def kinship():
+        phi = _kinship(g)
+        coefficients = queries.kinship_coefficients(pairs)
+        return ({(x, y, round(c, 12)) for (x, y), c in zip(pairs, coefficients)},
+                {(x, y, round(phi(x, y), 12)) for x, y in pairs})
+
+    def profile():
+        return ({(y, x, r) for y in names for x, labels in queries.kinship_profile(y).items() for r in labels},
+                {(y, x, r) for y in names for r, relatives in PERSON_RELATIONS.items()
+                 for x in relatives(g, y)})
+
+    def unrelated():
+        return ({(x,) for x in queries.unrelated_individuals()},
+                {(x,) for x in names if not g.parents(x) and not g.children(x) and not g.spouses(x)})
+
+    return {'is_direct_line_of_descent': direct_line, 'is_aunt_or_uncle': aunt_or_uncle,
+            'is_cousin_within_n': cousin_within, 'relatives_within_generations': relatives_within,
+            'ancestors_at/descendants_at': at_distance, 'kinship_coefficient': kinship,
+            'kinship_profile': profile, 'unrelated_individuals': unrelated}
+
+HELPER_CHECKS = ('is_direct_line_of_descent', 'is_aunt_or_uncle', 'is_cousin_within_n',
+                 'relatives_within_generations', 'ancestors_at/descendants_at', 'kinship_coefficient',
+                 'kinship_profile', 'unrelated_individuals')
+
+# Comparison and shrinking
+
+def _mismatch(check: str, engine: str, expected: Set[Row], actual: Set[Row]) -> Optional[Dict[str, Any]]:
+    if expected == actual:
+        return None
+    return {"check": check, "engine": engine,
+            "missing": sorted(expected - actual, key=str), "extra": sorted(actual - expected, key=str)}
+
+def _run_check(check: str, engine: str, engines: Dict[str, Engine]) -> Optional[Dict[str, Any]]:
+    """Runs one check on the loaded knowledge base."""
+    if engine == 'helpers':
+        expected, actual = _helper_checks(current_graph())[check]()
+        return _mismatch(check, engine, expected, actual)
+    actual = engines[engine](check)
+    if actual is None:
+        return None
+    return _mismatch(check, engine, datalog_rows(check), actual)
+
+def compare_engines(df: pd.DataFrame, engines: Optional[Dict[str, Engine]] = None,
+                    relations: Iterable[str] = tuple(RELATION_ARITIES),
+                    helpers: Iterable[str] = HELPER_CHECKS) -> List[Dict[str, Any]]:
+    """
+    Loads df and compares every engine with PyDatalog on every relation, and every helper
+    with its graph implementation.
+
+    Returns:
+        One dict per mismatch: check, engine ('helpers' for helper checks), and the
+        missing/extra rows relative to the reference.
+    """
+    engines = ENGINES if engines is None else engines
+    checks = [(relation, engine) for relation in relations for engine in engines]
+    checks += [(helper, 'helpers') for helper in helpers]
+    with pedigree_session(df):
+        mismatches = [_run_check(check, engine, engines) for check, engine in checks]
+    return [mismatch for mismatch in mismatches if mismatch]
+
+def shrink(df: pd.DataFrame, fails: Callable[[pd.DataFrame], bool]) -> pd.DataFrame:
+    """
+    Smallest pedigree found that still fails: rows are removed in halving chunks, then
+    single rows, then the Spouses, Notes, Father and Mother fields are blanked one by one.
+
+    Args:
+        df: A failing pedigree.
+        fails: Returns True when a candidate pedigree still shows the failure.
+    """
+    df = df.reset_index(drop=True)
+    chunk = max(len(df) // 2, 1)
+    while True:
+        start = 0
+        while start < len(df):
+            candidate = df.drop(index=df.index[start:start + chunk]).reset_index(drop=True)
+            if len(candidate) and fails(candidate):
+                df = candidate
+            else:
+                start += chunk
+        if chunk == 1:
+            break
+        chunk = max(chunk // 2, 1)
+
+    for i in range(len(df)):
+        for column in ("Spouses", "Notes", "Father", "Mother"):
+            if df.at[i, column]:
+                candidate = df.copy()
+                candidate.at[i, column] = ""
+                if fails(candidate):
+                    df = candidate
+    return df
+
+def run_oracle(seeds: Iterable[int], num_people: int = 30, engines: Optional[Dict[str, Engine]] = None,
+               relations: Iterable[str] = tuple(RELATION_ARITIES), helpers: Iterable[str] = HELPER_CHECKS,
+               **pedigree_options: Any) -> List[Dict[str, Any]]:
+    """
+    Compares the engines on one random pedigree per seed and shrinks every mismatch.
+
+    Args:
+        seeds: Seeds of the pedigrees (see random_pedigree).
+        num_people: Size of each pedigree.
+        engines: Engines to compare with PyDatalog (default: ENGINES).
+        relations, helpers: Relations and helper checks to run (default: all).
+        **pedigree_options: Further arguments of random_pedigree.
+
+    Returns:
+        One report per mismatch: the mismatch dict plus seed, the minimal pedigree's
+        mismatch rows, and its CSV text ("csv").
+    """
+    engines = ENGINES if engines is None else engines
+    relations, helpers = tuple(relations), tuple(helpers)
+    reports = []
+    for seed in seeds:
+        df = random_pedigree(seed, num_people, **pedigree_options)
+        for mismatch in compare_engines(df, engines, relations, helpers):
+            check, engine = mismatch["check"], mismatch["engine"]
+
+            def fails(candidate, check=check, engine=engine):
+                with pedigree_session(candidate):
+                    return _run_check(check, engine, engines) is not None
+
+            minimal = shrink(df, fails)
+            with pedigree_session(minimal):
+                final = _run_check(check, engine, engines)
+            reports.append({**final, "seed": seed,
+                            "original_missing": len(mismatch["missing"]),
+                            "original_extra": len(mismatch["extra"]),
+                            "csv": minimal.to_csv(index=False)})
+    return reports
+
+def format_report(reports: List[Dict[str, Any]]) -> str:
+    if not reports:
+        return "No mismatches."
+    blocks = []
+    for report in reports:
+        blocks.append(f"{report['check']} [{report['engine']}] seed={report['seed']}: "
+                      f"{report['original_missing']} missing, {report['original_extra']} extra; minimal case:\n"
+                      f"  missing: {report['missing']}\n  extra: {report['extra']}\n{report['csv']}")
+    return "\n".join(blocks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare every evaluation engine with PyDatalog on random families.")
+    parser.add_argument("--seeds", type=int, default=20, help="number of random pedigrees (seeds 0..N-1)")
+    parser.add_argument("--people", type=int, default=30, help="people per pedigree")
+    parser.add_argument("--deep", type=int, default=8, help="length of an extra single line of descent")
+    args = parser.parse_args()
+    print(format_report(run_oracle(range(args.seeds), args.people, deep_generations=args.deep)))
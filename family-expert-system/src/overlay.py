@@ -0,0 +1,318 @@
+"""
+What-if queries: temporary fact additions and retractions over the loaded family.
+
+An Overlay records base facts to assert and to retract (as (predicate, *args) tuples,
+like src.facts.row_facts) on top of a base FamilyGraph, without touching the base or
+the PyDatalog knowledge base. The relations of src.rules are evaluated on base plus
+overlay through src.relations, on an OverlayGraph whose lookups fall through to the base
+for every person the overlay does not touch. diff() reports what a hypothesis changes
+in a whole relation by evaluating only the affected people: those near a touched person
+(every non-recursive rule reads at most RULE_REACH links around its second argument),
+plus their ancestors and descendants for the recursive relations.
+
+The base graph is never modified, so any number of overlays (one per thread or request)
+can run against one base concurrently; an overlay itself is not meant to be shared
+between threads. discard() drops the changes in constant time.
+
+Example usage:
+    # If Isla were adopted by Anna and Daniel married Zoe, who becomes a step cousin of Grace?
+    with what_if() as overlay:
+        overlay.assert_fact('adoptive_mother', 'Anna', 'Isla')
+        overlay.assert_fact('spouse', 'Daniel', 'Zoe')
+        overlay.compare('step_cousin', 'Grace')      # {'gained': [...], 'lost': [...]}
+        overlay.diff('step_parent')                  # {'added': [...], 'removed': [...]}
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.facts import Fact
+from src.graph import FamilyGraph, current_graph
+from src.relations import PERSON_PREDICATES, PERSON_RELATIONS
+from src.rules import BASE_RELATIONS, RELATION_ARITIES
+
+# Parent, child and spouse links a non-recursive rule may follow from its second argument
+# (step_cousin: parent, spouse, child, child, then the parents of X for ~sibling), plus one
+RULE_REACH = 7
+
+# Relations whose rules recurse over the parent links
+_UPWARD_RELATIONS = frozenset({'ancestor', 'cousin'})   # depend on the ancestors of Y
+_DOWNWARD_RELATIONS = frozenset({'descendant'})          # depend on the descendants of Y
+
+# Parent-child predicates, stored under the child (first index) and the parent (second)
+_PARENT_PREDICATES = ('father', 'mother', 'adoptive_father', 'adoptive_mother')
+
+def _base_children(base: FamilyGraph, predicate: str, parent: str) -> Tuple[str, ...]:
+    """Children of parent through one parent-child predicate of the base graph."""
+    parents_of = {'father': base.fathers, 'mother': base.mothers,
+                  'adoptive_father': base.adoptive_fathers, 'adoptive_mother': base.adoptive_mothers}[predicate]
+    candidates = base.biological_children(parent) if predicate in ('father', 'mother') else base.children(parent)
+    return tuple(c for c in candidates if parent in parents_of(c))
+
+class OverlayGraph:
+    """
+    A base FamilyGraph plus asserted and retracted base facts: same lookups as FamilyGraph.
+    People the overlay does not touch are answered by the base graph directly.
+    """
+
+    def __init__(self, base: FamilyGraph):
+        self.base = base
+        # (index, person) -> (added, removed); indexes: '<predicate>' by child (or either
+        # partner for spouse) and '<predicate>_children' by parent
+        self._delta: Dict[Tuple[str, str], Tuple[Set[str], Set[str]]] = {}
+        # Gender facts of the people whose is_male/is_female facts changed: like PyDatalog,
+        # a person can hold both, so asserting one does not retract the other
+        self._genders: Dict[str, Set[str]] = {}
+        self.touched: Set[str] = set()
+
+    def _base_lookup(self, index: str, person: str) -> Tuple[str, ...]:
+        base = self.base
+        if index == 'spouse':
+            return base.spouses(person)
+        if index.endswith('_children'):
+            return _base_children(base, index[:-len('_children')], person)
+        return {'father': base.fathers, 'mother': base.mothers, 'adoptive_father': base.adoptive_fathers,
+                'adoptive_mother': base.adoptive_mothers}[index](person)
+
+    def _change(self, index: str, person: str, other: str, present: bool) -> None:
+        added, removed = self._delta.setdefault((index, person), (set(), set()))
+        in_base = other in self._base_lookup(index, person)
+        if present:
+            removed.discard(other)
+            if not in_base:
+                added.add(other)
+        else:
+            added.discard(other)
+            if in_base:
+                removed.add(other)
+        self.touched.add(person)
+
+    def apply(self, fact: Fact, present: bool) -> None:
+        """Asserts (present=True) or retracts one base fact."""
+        predicate, *args = fact
+        if predicate in ('is_male', 'is_female'):
+            gender = "Male" if predicate == 'is_male' else "Female"
+            genders = self._genders.get(args[0])
+            if genders is None:
+                genders = self._genders[args[0]] = set(self.gender_set(args[0]))
+            if present:
+                genders.add(gender)
+            else:
+                genders.discard(gender)
+            self.touched.add(args[0])
+        elif predicate == 'spouse':
+            # Spouse facts are registered in both orientations, so one fact stands for the marriage
+            a, b = args
+            self._change('spouse', a, b, present)
+            self._change('spouse', b, a, present)
+        else:
+            parent, child = args
+            self._change(predicate, child, parent, present)
+            self._change(predicate + '_children', parent, child, present)
+
+    def _lookup(self, index: str, person: str) -> Tuple[str, ...]:
+        delta = self._delta.get((index, person))
+        if delta is None:
+            return self._base_lookup(index, person)
+        added, removed = delta
+        return tuple(sorted((set(self._base_lookup(index, person)) - removed) | added))
+
+    def _union(self, indexes: Iterable[str], person: str) -> Tuple[str, ...]:
+        return tuple(sorted({x for index in indexes for x in self._lookup(index, person)}))
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        new = {x for (_, person), (added, _) in self._delta.items() for x in added | {person}}
+        new.update(self._genders)
+        return tuple(sorted(new.union(self.base.names)))
+
+    def gender_set(self, person: str) -> FrozenSet[str]:
+        """The genders person has a fact for: none, one, or both "Male" and "Female"."""
+        if person in self._genders:
+            return frozenset(self._genders[person])
+        gender = self.base.genders.get(person)
+        return frozenset((gender,)) if gender else frozenset()
+
+    def fathers(self, person: str) -> Tuple[str, ...]:
+        return self._lookup('father', person) if person in self.touched else self.base.fathers(person)
+
+    def mothers(self, person: str) -> Tuple[str, ...]:
+        return self._lookup('mother', person) if person in self.touched else self.base.mothers(person)
+
+    def adoptive_fathers(self, person: str) -> Tuple[str, ...]:
+        return self._lookup('adoptive_father', person) if person in self.touched else self.base.adoptive_fathers(person)
+
+    def adoptive_mothers(self, person: str) -> Tuple[str, ...]:
+        return self._lookup('adoptive_mother', person) if person in self.touched else self.base.adoptive_mothers(person)
+
+    def biological_parents(self, person: str) -> Tuple[str, ...]:
+        if person not in self.touched:
+            return self.base.biological_parents(person)
+        return self._union(('father', 'mother'), person)
+
+    def adoptive_parents(self, person: str) -> Tuple[str, ...]:
+        if person not in self.touched:
+            return self.base.adoptive_parents(person)
+        return self._union(('adoptive_father', 'adoptive_mother'), person)
+
+    def parents(self, person: str) -> Tuple[str, ...]:
+        """Biological and adoptive parents, as in the parent rule."""
+        if person not in self.touched:
+            return self.base.parents(person)
+        return self._union(_PARENT_PREDICATES, person)
+
+    def children(self, person: str) -> Tuple[str, ...]:
+        """Biological and adoptive children."""
+        if person not in self.touched:
+            return self.base.children(person)
+        return self._union((p + '_children' for p in _PARENT_PREDICATES), person)
+
+    def biological_children(self, person: str) -> Tuple[str, ...]:
+        if person not in self.touched:
+            return self.base.biological_children(person)
+        return self._union(('father_children', 'mother_children'), person)
+
+    def spouses(self, person: str) -> Tuple[str, ...]:
+        return self._lookup('spouse', person) if person in self.touched else self.base.spouses(person)
+
+    def is_male(self, person: str) -> bool:
+        return "Male" in self._genders[person] if person in self._genders else self.base.is_male(person)
+
+    def is_female(self, person: str) -> bool:
+        return "Female" in self._genders[person] if person in self._genders else self.base.is_female(person)
+
+def _neighbours(g, person: str) -> Set[str]:
+    return set(g.parents(person)) | set(g.children(person)) | set(g.spouses(person))
+
+def _within(g, start: Set[str], reach: int) -> Set[str]:
+    """Everyone at most reach parent, child or spouse links from a person in start."""
+    found = set(start)
+    frontier = set(start)
+    for _ in range(reach):
+        frontier = {x for p in frontier for x in _neighbours(g, p)} - found
+        found |= frontier
+    return found
+
+def _closure(step, start: Set[str]) -> Set[str]:
+    """start and everyone reachable from it (worklist, no recursion)."""
+    found = set(start)
+    frontier = list(start)
+    while frontier:
+        for x in step(frontier.pop()):
+            if x not in found:
+                found.add(x)
+                frontier.append(x)
+    return found
+
+class Overlay:
+    """Hypothetical changes to the base facts, evaluated against a base family graph."""
+
+    def __init__(self, base: Optional[FamilyGraph] = None):
+        """
+        Args:
+            base: The family graph to layer over (default: the currently loaded knowledge base).
+        """
+        self.base = base if base is not None else current_graph()
+        self.graph = OverlayGraph(self.base)
+        self._affected: Optional[Dict[str, Set[str]]] = None
+
+    def _change(self, predicate: str, args: Tuple[str, ...], present: bool) -> "Overlay":
+        if predicate not in BASE_RELATIONS:
+            raise ValueError(f"Only base facts can be changed, got '{predicate}'; expected one of {BASE_RELATIONS}")
+        if len(args) != RELATION_ARITIES[predicate]:
+            raise ValueError(f"'{predicate}' takes {RELATION_ARITIES[predicate]} argument(s), got {len(args)}")
+        self.graph.apply((predicate,) + tuple(args), present)
+        self._affected = None
+        return self
+
+    def assert_fact(self, predicate: str, *args: str) -> "Overlay":
+        """
+        Adds a base fact, e.g. assert_fact('spouse', 'Daniel', 'Zoe').
+
+        Raises:
+            ValueError: If predicate is not a base relation or has the wrong number of arguments.
+        """
+        return self._change(predicate, args, True)
+
+    def retract_fact(self, predicate: str, *args: str) -> "Overlay":
+        """Removes a base fact (a no-op if it does not hold); raises as assert_fact."""
+        return self._change(predicate, args, False)
+
+    def discard(self) -> None:
+        """Drops every change: the overlay answers as the base again."""
+        self.graph = OverlayGraph(self.base)
+        self._affected = None
+
+    def relatives(self, relation: str, person: str) -> List[str]:
+        """
+        Sorted X such that relation(X, person) holds on base plus overlay.
+
+        Raises:
+            ValueError: If relation is not a binary relation of src.rules.
+        """
+        return sorted(self._evaluate(self.graph, relation, person))
+
+    def holds(self, relation: str, *args: str) -> bool:
+        """Whether relation(*args) holds on base plus overlay (unary relations included)."""
+        if len(args) == 1 and relation in PERSON_PREDICATES:
+            return bool(PERSON_PREDICATES[relation](self.graph, args[0]))
+        if len(args) == 2:
+            return args[0] in self._evaluate(self.graph, relation, args[1])
+        raise ValueError(f"Unknown relation '{relation}' with {len(args)} argument(s)")
+
+    def compare(self, relation: str, person: str) -> Dict[str, List[str]]:
+        """{"gained", "lost"}: the X for which relation(X, person) starts or stops holding."""
+        before = self._evaluate(self.base, relation, person)
+        after = self._evaluate(self.graph, relation, person)
+        return {"gained": sorted(after - before), "lost": sorted(before - after)}
+
+    def affected_people(self, relation: str) -> Set[str]:
+        """The people Y for whom relation(X, Y) may differ between base and overlay."""
+        if self._affected is None:
+            touched = set(self.graph.touched)
+            near = _within(self.base, touched, RULE_REACH) | _within(self.graph, touched, RULE_REACH)
+            self._affected = {
+                'near': near,
+                'below': _closure(self.base.children, near) | _closure(self.graph.children, near),
+                'above': _closure(self.base.parents, near) | _closure(self.graph.parents, near),
+            }
+        if relation in _UPWARD_RELATIONS:
+            return self._affected['below']
+        if relation in _DOWNWARD_RELATIONS:
+            return self._affected['above']
+        return self._affected['near']
+
+    def diff(self, relation: str) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        {"added", "removed"}: the sorted (X, Y) pairs of relation that the overlay makes
+        hold or stop holding, evaluating only the affected people.
+        """
+        added, removed = set(), set()
+        for y in self.affected_people(relation):
+            before = self._evaluate(self.base, relation, y)
+            after = self._evaluate(self.graph, relation, y)
+            added.update((x, y) for x in after - before)
+            removed.update((x, y) for x in before - after)
+        return {"added": sorted(added), "removed": sorted(removed)}
+
+    @staticmethod
+    def _evaluate(g, relation: str, person: str) -> Set[str]:
+        if relation not in PERSON_RELATIONS:
+            raise ValueError(f"Unknown binary relation '{relation}'")
+        return set(PERSON_RELATIONS[relation](g, person))
+
+@contextmanager
+def what_if(base: Optional[FamilyGraph] = None) -> Iterator[Overlay]:
+    """An Overlay over base (default: the loaded knowledge base), discarded on exit."""
+    overlay = Overlay(base)
+    try:
+        yield overlay
+    finally:
+        overlay.discard()
@@ -0,0 +1,159 @@
+"""
+Streaming, paginated relation queries.
+
+pyDatalog.ask('sibling(X, Y)') evaluates and returns every answer at once. iter_relation
+instead yields the rows of a relation one by one in sorted order, evaluating one first
+argument at a time: sibling("Adam", Y), then sibling("Alice", Y), ... over the sorted
+names of the family (a query with a bound argument, like sibling(X, "Alice"), is asked once). Only one person's answers are held in memory, and a consumer that
+stops early (limit reached, page full) never evaluates the remaining people.
+When the relation is already materialized as a view (see src.views), rows are read
+straight from the view instead, and the recursive relations (ancestor, descendant,
+cousin) from the closure table of src.closures.
+
+Rows are full tuples (bound arguments included), ordered lexicographically, so the
+last row of a page is a stable keyset cursor: passing it as after= resumes right after
+it, even if rows were added before it in the meantime (unlike offset).
+
+Example usage:
+    for row in iter_relation('sibling', limit=10):
+        print(row)                                    # ('Adam', 'Sarah'), ...
+    rows, cursor = page_relation('cousin', [None, None], limit=50)
+    rows, cursor = page_relation('cousin', [None, None], limit=50, after=cursor)
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.metrics import ask
+from src.closures import CLOSURE_RELATIONS, current_closures
+from src.graph import current_graph
+from src.rules import RELATION_ARITIES
+from src.views import peek_cached
+
+Row = Tuple[str, ...]
+
+def query_string(relation: str, args: Sequence[Optional[str]]) -> str:
+    """
+    Builds the pyDatalog query relation(args), with None arguments as the unbound
+    variables Q0, Q1, ... in order.
+
+    Raises:
+        ValueError: If the relation is unknown or the number of arguments does not match.
+    """
+    if relation not in RELATION_ARITIES:
+        raise ValueError(f"Unknown relation: {relation}")
+    if len(args) != RELATION_ARITIES[relation]:
+        raise ValueError(f"{relation} expects {RELATION_ARITIES[relation]} arguments, got {len(args)}")
+    terms = []
+    num_unbound = 0
+    for arg in args:
+        if arg is None:
+            terms.append(f"Q{num_unbound}")
+            num_unbound += 1
+        else:
+            terms.append(repr(str(arg)))
+    return f"{relation}({', '.join(terms)})"
+
+def _ask_rows(relation: str, args: Sequence[Optional[str]]) -> List[Row]:
+    """Sorted, deduplicated full rows of relation(args)."""
+    answer = ask(query_string(relation, args))
+    if not answer:
+        return []
+    unbound = [i for i, arg in enumerate(args) if arg is None]
+    rows = set()
+    for values in answer.answers:
+        row = list(args)
+        for i, value in zip(unbound, values):
+            row[i] = str(value)
+        rows.add(tuple(row))
+    return sorted(rows)
+
+def _view_rows(view, args: Sequence[Optional[str]], after: Optional[Row]) -> Iterable[Row]:
+    """Rows of a materialized view matching args, starting near the cursor."""
+    x, y = args
+    if x is not None and y is not None:
+        return [(x, y)] if (x, y) in view else []
+    if x is not None:
+        return ((x, second) for second in view.seconds(x))
+    if y is not None:
+        return ((first, y) for first in view.firsts(y))
+    return view.iter_pairs(after)
+
+def _row_chunks(relation: str, args: Sequence[Optional[str]], after: Optional[Row]) -> Iterator[Iterable[Row]]:
+    """Sorted chunks of rows whose concatenation is the sorted relation."""
+    views = peek_cached('views')
+    if views is not None and relation in views:
+        yield _view_rows(views[relation], args, after)
+        return
+    if relation in CLOSURE_RELATIONS:
+        yield _view_rows(current_closures().relation(relation), args, after)
+        return
+    if len(args) == 2 and args[0] is None and args[1] is None:
+        names = current_graph().names
+        start = bisect_left(names, after[0]) if after is not None else 0
+        for name in names[start:]:
+            yield _ask_rows(relation, [name, args[1]])
+        return
+    yield _ask_rows(relation, args)
+
+def iter_relation(relation: str, args: Optional[Sequence[Optional[str]]] = None, limit: Optional[int] = None,
+                  offset: int = 0, after: Optional[Sequence[str]] = None) -> Iterator[Row]:
+    """
+    Lazily yields the rows of relation(args) in sorted order. Assumes facts and rules are loaded.
+
+    Args:
+        relation: A relation name from RELATION_ARITIES.
+        args: Arguments, with None for unbound ones (default: all unbound).
+        limit: Maximum number of rows to yield (None for all).
+        offset: Number of rows to skip (after the cursor, if any).
+        after: Keyset cursor: only rows strictly greater than this full row are yielded.
+
+    Yields:
+        Full rows as tuples of names.
+
+    Raises:
+        ValueError: If the relation is unknown or args has the wrong length.
+    """
+    args = list(args) if args is not None else [None] * RELATION_ARITIES.get(relation, 0)
+    query_string(relation, args)  # fails on a bad relation before anything is evaluated
+    after = tuple(after) if after is not None else None
+    if limit is not None and limit <= 0:
+        return
+
+    skipped = produced = 0
+    for chunk in _row_chunks(relation, args, after):
+        for row in chunk:
+            if after is not None and row <= after:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            yield row
+            produced += 1
+            if limit is not None and produced >= limit:
+                return
+
+def page_relation(relation: str, args: Optional[Sequence[Optional[str]]] = None, limit: int = 100,
+                  after: Optional[Sequence[str]] = None, offset: int = 0) -> Tuple[List[Row], Optional[Row]]:
+    """
+    One page of relation(args).
+
+    Returns:
+        (rows, next_cursor), where next_cursor is the last row when more rows follow, else None.
+
+    Raises:
+        ValueError: If limit is smaller than 1, or as iter_relation.
+    """
+    if limit < 1:
+        raise ValueError("Page limit must be at least 1")
+    rows = list(iter_relation(relation, args, limit + 1, offset, after))
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]
+    return rows, None
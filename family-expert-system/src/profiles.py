@@ -0,0 +1,197 @@
+"""
+Whole-person kinship profiles: every relative of one person, with every relation of
+src.rules that holds between them.
+
+Answering each relation separately (one pyDatalog query, or one src.relations call per
+relation) walks the same neighbourhood again and again: siblings of the parents for
+uncles, aunts, first cousins and step cousins, spouses of the parents for step parents
+and step siblings, and so on. A profile instead walks the person's neighbourhood once,
+memoizing every intermediate set (siblings, step parents, first cousins, ... of each
+person met) for the duration of the call, and derives all relations from those sets.
+The walk covers the parents' and grandparents' families, the in-laws, and the ancestors
+and descendants (for ancestor, descendant and cousin).
+
+relation(X, person) is reported for X; the unary relations are left out.
+
+Example usage:
+    kinship_profile(graph, "David")["Peter"]     # ('step_parent',)
+    kinship_profile(graph, "Liam")["Paul"]       # ('ancestor', 'biological_parent', 'cousin', 'father', ...)
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Callable, Dict, Set, Tuple
+
+from src.graph import FamilyGraph
+
+class _Neighbourhood:
+    """Derived sets of the people met while profiling one person, each computed once."""
+
+    def __init__(self, g: FamilyGraph):
+        self.g = g
+        self._memo: Dict[Tuple[str, str], Set[str]] = {}
+
+    def _cached(self, kind: str, person: str, compute: Callable[[str], Set[str]]) -> Set[str]:
+        key = (kind, person)
+        if key not in self._memo:
+            self._memo[key] = compute(person)
+        return self._memo[key]
+
+    def siblings(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('sibling', y, lambda y: {x for p in g.parents(y) for x in g.children(p) if x != y})
+
+    def shares_father(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('shares_father', y, lambda y: {
+            x for f in g.fathers(y) for x in g.biological_children(f) if x != y and f in g.fathers(x)})
+
+    def shares_mother(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('shares_mother', y, lambda y: {
+            x for m in g.mothers(y) for x in g.biological_children(m) if x != y and m in g.mothers(x)})
+
+    def half_siblings(self, y: str) -> Set[str]:
+        return self._cached('half_sibling', y, lambda y: self.shares_father(y) ^ self.shares_mother(y))
+
+    def grandparents(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('grandparent', y, lambda y: {x for p in g.parents(y) for x in g.parents(p)})
+
+    def step_parents(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('step_parent', y, lambda y: {
+            x for p in g.parents(y) for x in g.spouses(p) if x not in g.parents(y)})
+
+    def step_siblings(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('step_sibling', y, lambda y: {
+            x for p2 in g.parents(y) for p1 in g.spouses(p2) for x in g.children(p1)
+            if x != y and x not in self.siblings(y)})
+
+    def first_cousins(self, y: str) -> Set[str]:
+        g = self.g
+        return self._cached('first_cousin', y, lambda y: {
+            x for p2 in g.parents(y) for p1 in self.siblings(p2) for x in g.children(p1) if x != y})
+
+    def closure(self, step: Callable[[str], Tuple[str, ...]], y: str) -> Set[str]:
+        """Everyone reachable from y in one or more steps."""
+        found: Set[str] = set()
+        frontier = list(step(y))
+        while frontier:
+            x = frontier.pop()
+            if x not in found:
+                found.add(x)
+                frontier.extend(step(x))
+        return found
+
+    def cousins(self, y: str, ancestors: Set[str]) -> Set[str]:
+        """Least fixpoint of the recursive cousin rule over y and its ancestors."""
+        g = self.g
+        people = {y} | ancestors
+        found = {p: set(self.first_cousins(p)) for p in people}
+        changed = True
+        while changed:
+            changed = False
+            for p in people:
+                derived = {x for p2 in g.parents(p) for p1 in found[p2] for x in g.children(p1) if x != p}
+                if not derived <= found[p]:
+                    found[p] |= derived
+                    changed = True
+        return found[y]
+
+def relative_sets(g: FamilyGraph, y: str) -> Dict[str, Set[str]]:
+    """
+    relation -> {X : relation(X, y)} for every binary relation of src.rules,
+    all derived from one walk of y's neighbourhood.
+    """
+    n = _Neighbourhood(g)
+    parents, children, spouses = set(g.parents(y)), set(g.children(y)), set(g.spouses(y))
+    siblings = n.siblings(y)
+    males = g.is_male
+    females = g.is_female
+
+    def male(people: Set[str]) -> Set[str]:
+        return {x for x in people if males(x)}
+
+    def female(people: Set[str]) -> Set[str]:
+        return {x for x in people if females(x)}
+
+    grandparents = n.grandparents(y)
+    ancestors = n.closure(g.parents, y)
+    uncles_aunts = {x for p in parents for x in n.siblings(p)}
+    first_cousins = n.first_cousins(y)
+    brothers_in_law = {x for p in spouses for x in male(n.siblings(p))}
+    sisters_in_law = {x for p in spouses for x in female(n.siblings(p))}
+    siblings_in_law = brothers_in_law | sisters_in_law
+    nieces_nephews_in_law = {x for p in siblings_in_law for x in g.children(p)}
+    children_in_law = {x for c in children for x in g.spouses(c)}
+    step_parents = n.step_parents(y)
+    step_cousins = {x for p2 in parents for p1 in n.step_siblings(p2) for x in g.children(p1)}
+    step_cousins.update(x for p2 in step_parents for p1 in n.siblings(p2) for x in g.children(p1))
+    step_cousins.discard(y)
+
+    return {
+        'father': set(g.fathers(y)),
+        'mother': set(g.mothers(y)),
+        'adoptive_father': set(g.adoptive_fathers(y)),
+        'adoptive_mother': set(g.adoptive_mothers(y)),
+        'spouse': spouses,
+        'parent': parents,
+        'child': children,
+        'son': male(children),
+        'daughter': female(children),
+        'sibling': siblings,
+        'shares_mother': n.shares_mother(y),
+        'shares_father': n.shares_father(y),
+        'full_sibling': n.shares_father(y) & n.shares_mother(y),
+        'half_sibling': n.half_siblings(y),
+        'brother': male(siblings),
+        'sister': female(siblings),
+        'grandparent': grandparents,
+        'grandchild': {x for c in children for x in g.children(c)},
+        'grandfather': male(grandparents),
+        'grandmother': female(grandparents),
+        'great_grandparent': {x for p in parents for x in n.grandparents(p)},
+        'ancestor': ancestors,
+        'descendant': n.closure(g.children, y),
+        'uncle': male(uncles_aunts),
+        'aunt': female(uncles_aunts),
+        'first_cousin': first_cousins,
+        'second_cousin': {x for p2 in parents for p1 in n.first_cousins(p2) for x in g.children(p1) if x != y},
+        'cousin': n.cousins(y, ancestors),
+        'mother_in_law': {x for p in spouses for x in g.mothers(p)},
+        'father_in_law': {x for p in spouses for x in g.fathers(p)},
+        'brother_in_law': brothers_in_law,
+        'sister_in_law': sisters_in_law,
+        'son_in_law': male(children_in_law),
+        'daughter_in_law': female(children_in_law),
+        'sibling_in_law': siblings_in_law,
+        'niece_in_law': female(nieces_nephews_in_law),
+        'nephew_in_law': male(nieces_nephews_in_law),
+        'step_parent': step_parents,
+        'step_child': {x for p in spouses for x in g.children(p) if x not in children},
+        'step_sibling': n.step_siblings(y),
+        'step_grandparent': ({x for p in parents for x in n.step_parents(p)} |
+                             {x for p in step_parents for x in n.grandparents(p)}),
+        'adoptive_parent': set(g.adoptive_parents(y)),
+        'biological_parent': set(g.biological_parents(y)),
+        'half_uncle': {x for p in parents for x in male(n.half_siblings(p))},
+        'step_cousin': step_cousins,
+    }
+
+def kinship_profile(g: FamilyGraph, person: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    Every relative X of person, with the sorted names of the relations relation(X, person)
+    that hold; relatives are in name order. Unknown names have an empty profile.
+    """
+    labels: Dict[str, list] = {}
+    for relation, relatives in relative_sets(g, person).items():
+        for x in relatives:
+            labels.setdefault(x, []).append(relation)
+    return {x: tuple(sorted(labels[x])) for x in sorted(labels)}
@@ -1,6 +1,7 @@
 import sys
 import os
-from typing import List, Tuple, Dict, Any
+from contextlib import contextmanager
+from typing import List, Tuple, Dict, Any, Iterable, Iterator, Optional, Sequence
 
 # Add the project root to sys.path for direct execution
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -8,8 +9,22 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from pyDatalog import pyDatalog
-from src.facts import load_facts_into_pydatalog, load_facts_dataframe, CSV_FILEPATH
+from src.facts import load_facts_into_pydatalog, CSV_FILEPATH
 from src.rules import define_family_rules
+from src.views import get_views
+from src.generations import current_generation_index
+from src.kinship import current_kinship
+from src.governor import governed_ask
+from src.instances import current_instance
+from src.names import current_name_index
+from src.graph import current_graph
+from src.closures import current_closures
+from src.profiles import kinship_profile as _kinship_profile
+from src.nearest import closest_relatives as _closest_relatives
+from src.overlay import what_if as _what_if
+from src.tables import load_tables_into_pydatalog
+from src.timeline import current_timeline
+from src.metrics import ask, instrumented_helper
 
 # Import all terms that might be used in queries
 pyDatalog.create_terms('X, Y, P, P1, P2, F, M, D, Z, S, SP, '
@@ -24,6 +39,7 @@ pyDatalog.create_terms('X, Y, P, P1, P2, F, M, D, Z, S, SP, '
                        'adoptive_father, adoptive_mother, '
                        'M_of_X, M_of_Y, F_of_X, F_of_Y, shares_father, shares_mother') # Added new terms
 
+@instrumented_helper
 def run_all_queries() -> Dict[str, Any]:
     """
     Loads facts, defines rules, and runs all specified queries.
@@ -39,96 +55,122 @@ def run_all_queries() -> Dict[str, Any]:
 
     # Q2.2 Query: List all sons and daughters of any individual.
     # This is already covered by sample_queries in rules.py, but we'll include it here for completeness.
-    all_sons_results = pyDatalog.ask('son(X, Y)')
-    results['all_sons'] = sorted(list(set([(str(r[0]), str(r[1])) for r in all_sons_results.answers]))) if all_sons_results else []
-
-    all_daughters_results = pyDatalog.ask('daughter(X, Y)')
-    results['all_daughters'] = sorted(list(set([(str(r[0]), str(r[1])) for r in all_daughters_results.answers]))) if all_daughters_results else []
+    # Materialized views are deduplicated and sorted once, at build time.
+    views = get_views()
+    results['all_sons'] = list(views['son'].pairs)
+    results['all_daughters'] = list(views['daughter'].pairs)
 
     # Q2.2 Query: Who are the children of John?
-    children_of_john_results = pyDatalog.ask('child(X, "John")')
+    children_of_john_results = ask('child(X, "John")')
     results['children_of_john'] = sorted(set([str(r[0]) for r in children_of_john_results.answers])) if children_of_john_results else []
 
     # Q3.2 Query: All siblings of Alice
-    siblings_of_alice_results = pyDatalog.ask('sibling(X, "Alice")')
-    results['siblings_of_alice'] = sorted(set([str(r[0]) for r in siblings_of_alice_results.answers])) if siblings_of_alice_results else []
+    results['siblings_of_alice'] = list(views['sibling'].firsts('Alice'))
 
     # Q3.2 Query: All half-siblings of Michael
-    half_siblings_of_michael_results = pyDatalog.ask('half_sibling(X, "Michael")')
-    results['half_siblings_of_michael'] = sorted(set([str(r[0]) for r in half_siblings_of_michael_results.answers])) if half_siblings_of_michael_results else []
+    results['half_siblings_of_michael'] = list(views['half_sibling'].firsts('Michael'))
 
     # Q3.2 Query: List all sibling pairs
-    all_sibling_pairs_results = pyDatalog.ask('sibling(X, Y)')
-    results['all_sibling_pairs'] = sorted(list(set([tuple(sorted((str(r[0]), str(r[1])))) for r in all_sibling_pairs_results.answers if str(r[0]) != str(r[1])]))) if all_sibling_pairs_results else []
+    results['all_sibling_pairs'] = list(views['sibling'].canonical_pairs)
 
     # Q4.2 Query: All ancestors of Liam
-    ancestors_of_liam_results = pyDatalog.ask('ancestor(X, "Liam")')
-    results['ancestors_of_liam'] = sorted(set([str(r[0]) for r in ancestors_of_liam_results.answers])) if ancestors_of_liam_results else []
+    # The recursive relations are evaluated iteratively (closure table), at any depth.
+    closures = current_closures()
+    results['ancestors_of_liam'] = list(closures.ancestors('Liam'))
 
     # Q4.2 Query: Who are the great-grandparents of Sophia?
-    great_grandparents_of_sophia_results = pyDatalog.ask('great_grandparent(X, "Sophia")')
+    great_grandparents_of_sophia_results = ask('great_grandparent(X, "Sophia")')
     results['great_grandparents_of_sophia'] = sorted(set([str(r[0]) for r in great_grandparents_of_sophia_results.answers])) if great_grandparents_of_sophia_results else []
 
     # Q4.2 Query: List all descendants of Emma
-    descendants_of_emma_results = pyDatalog.ask('descendant(X, "Emma")')
-    results['descendants_of_emma'] = sorted(set([str(r[0]) for r in descendants_of_emma_results.answers])) if descendants_of_emma_results else []
+    results['descendants_of_emma'] = list(closures.descendants('Emma'))
 
     # Q5.2 Query: Who are the cousins of Noah?
-    cousins_of_noah_results = pyDatalog.ask('cousin(X, "Noah")')
-    results['cousins_of_noah'] = sorted(set([str(r[0]) for r in cousins_of_noah_results.answers])) if cousins_of_noah_results else []
+    results['cousins_of_noah'] = list(closures.cousins('Noah'))
 
     # Q5.2 Query: Find all uncles and aunts of Emily
-    uncles_of_emily_results = pyDatalog.ask('uncle(X, "Emily")')
+    uncles_of_emily_results = ask('uncle(X, "Emily")')
     results['uncles_of_emily'] = sorted(set([str(r[0]) for r in uncles_of_emily_results.answers])) if uncles_of_emily_results else []
 
-    aunts_of_emily_results = pyDatalog.ask('aunt(X, "Emily")')
+    aunts_of_emily_results = ask('aunt(X, "Emily")')
     results['aunts_of_emily'] = sorted(set([str(r[0]) for r in aunts_of_emily_results.answers])) if aunts_of_emily_results else []
 
     # Q5.2 Query: List second cousins of James
-    second_cousins_of_james_results = pyDatalog.ask('second_cousin(X, "James")')
+    second_cousins_of_james_results = ask('second_cousin(X, "James")')
     results['second_cousins_of_james'] = sorted(set([str(r[0]) for r in second_cousins_of_james_results.answers])) if second_cousins_of_james_results else []
 
     # Q6.3 Query: Who is the mother-in-law of Amir?
-    mother_in_law_of_amir_results = pyDatalog.ask('mother_in_law(X, "Amir")')
-    results['mother_in_law_of_amir'] = sorted(set([str(r[0]) for r in mother_in_law_of_amir_results.answers])) if mother_in_law_of_amir_results else []
+    results['mother_in_law_of_amir'] = list(views['mother_in_law'].firsts('Amir'))
 
     # Q6.3 Query: List all siblings-in-law of Fatima
-    siblings_in_law_of_fatima_results = pyDatalog.ask('sibling_in_law(X, "Fatima")')
-    results['siblings_in_law_of_fatima'] = sorted(set([str(r[0]) for r in siblings_in_law_of_fatima_results.answers])) if siblings_in_law_of_fatima_results else []
+    results['siblings_in_law_of_fatima'] = list(views['sibling_in_law'].firsts('Fatima'))
 
     # Q7.2 Query: All step-siblings of Oliver
-    step_siblings_of_oliver_results = pyDatalog.ask('step_sibling(X, "Oliver")')
-    results['step_siblings_of_oliver'] = sorted(set([str(r[0]) for r in step_siblings_of_oliver_results.answers])) if step_siblings_of_oliver_results else []
+    results['step_siblings_of_oliver'] = list(views['step_sibling'].firsts('Oliver'))
 
     # Q7.2 Query: Who is the stepfather of Sophia?
-    stepfather_of_sophia_results = pyDatalog.ask('step_parent(X, "Sophia") & is_male(X)')
+    stepfather_of_sophia_results = ask('step_parent(X, "Sophia") & is_male(X)')
     results['stepfather_of_sophia'] = sorted(set([str(r[0]) for r in stepfather_of_sophia_results.answers])) if stepfather_of_sophia_results else []
 
     # Q8.2 Query: Who are the adoptive parents of Daniel?
-    adoptive_parents_of_daniel_results = pyDatalog.ask('adoptive_parent(X, "Daniel")')
+    adoptive_parents_of_daniel_results = ask('adoptive_parent(X, "Daniel")')
     results['adoptive_parents_of_daniel'] = sorted(set([str(r[0]) for r in adoptive_parents_of_daniel_results.answers])) if adoptive_parents_of_daniel_results else []
 
     # Q8.2 Query: List children of parents with multiple spouses
-    children_of_multiple_spouses_results = pyDatalog.ask('multiple_marriages(P) & child(X, P)')
+    children_of_multiple_spouses_results = ask('multiple_marriages(P) & child(X, P)')
     results['children_of_multiple_spouses'] = sorted(set([str(r[0]) for r in children_of_multiple_spouses_results.answers])) if children_of_multiple_spouses_results else []
 
     # Q8.2 Query: Who are the step-cousins of Grace?
-    step_cousins_of_grace_results = pyDatalog.ask('step_cousin(X, "Grace")')
-    results['step_cousins_of_grace'] = sorted(set([str(r[0]) for r in step_cousins_of_grace_results.answers])) if step_cousins_of_grace_results else []
+    results['step_cousins_of_grace'] = list(views['step_cousin'].firsts('Grace'))
 
     return results
 
+# Set while a kb_session() is active: helpers then reuse the loaded KB instead of reloading it
+_KB_PINNED = False
+
 # Helper to ensure PyDatalog KB is loaded
 def _ensure_kb_loaded():
     """
     Ensures PyDatalog facts and rules are loaded.
     This function clears the knowledge base, loads facts, and defines rules
     every time it's called to ensure a clean state for each query/test.
+    Inside a kb_session() or an activated FamilyKB (see src.instances) the already
+    loaded KB is kept as is.
     """
+    if _KB_PINNED or current_instance() is not None:
+        return
     pyDatalog.clear()
     load_facts_into_pydatalog(CSV_FILEPATH)
     define_family_rules()
 
+@contextmanager
+def kb_session(filepath: str = CSV_FILEPATH) -> Iterator[None]:
+    """
+    Loads facts and rules once and keeps them loaded for the duration of the block,
+    so that the helpers below can be called many times without reloading the KB.
+    filepath is a facts CSV, or a tables file (.npz, or a .parquet directory, see src.tables)
+    whose marriage and adoption dates the as_of helpers then use.
+
+    Example:
+        with kb_session():
+            is_cousin_within_n('Sarah', 'George', 2)
+            is_aunt_or_uncle('Olivia', 'Kevin')
+    """
+    global _KB_PINNED
+    previously_pinned = _KB_PINNED
+    pyDatalog.clear()
+    if filepath.endswith((".npz", ".parquet")):
+        load_tables_into_pydatalog(filepath)
+    else:
+        load_facts_into_pydatalog(filepath)
+    define_family_rules()
+    _KB_PINNED = True
+    try:
+        yield
+    finally:
+        _KB_PINNED = previously_pinned
+
+@instrumented_helper
 def relatives_within_generations(person: str, generations: int) -> set[str]:
     """
     Returns the set of distinct relatives reachable from person within 'generations'
@@ -157,7 +199,7 @@ def relatives_within_generations(person: str, generations: int) -> set[str]:
                 continue # Already processed for this generation
 
             # Find parents
-            parents_results = pyDatalog.ask(f'parent(P, "{current_person}")')
+            parents_results = ask(f'parent(P, "{current_person}")')
             if parents_results:
                 for p_res in parents_results.answers:
                     p_name = str(p_res[0])
@@ -167,7 +209,7 @@ def relatives_within_generations(person: str, generations: int) -> set[str]:
                         visited.add(p_name)
 
             # Find children
-            children_results = pyDatalog.ask(f'child(C, "{current_person}")')
+            children_results = ask(f'child(C, "{current_person}")')
             if children_results:
                 for c_res in children_results.answers:
                     c_name = str(c_res[0])
@@ -178,7 +220,7 @@ def relatives_within_generations(person: str, generations: int) -> set[str]:
             
             # Find siblings (only for current_person, not for newly found parents/children in this iteration)
             if depth <= generations: # Siblings are at the same generation level
-                siblings_results = pyDatalog.ask(f'sibling(S, "{current_person}")')
+                siblings_results = ask(f'sibling(S, "{current_person}")')
                 if siblings_results:
                     for s_res in siblings_results.answers:
                         s_name = str(s_res[0])
@@ -190,7 +232,7 @@ def relatives_within_generations(person: str, generations: int) -> set[str]:
 
             # Find spouses (only for current_person, not for newly found parents/children in this iteration)
             if depth <= generations: # Spouses are at the same generation level
-                spouses_results = pyDatalog.ask(f'spouse(SP, "{current_person}")')
+                spouses_results = ask(f'spouse(SP, "{current_person}")')
                 if spouses_results:
                     for sp_res in spouses_results.answers:
                         sp_name = str(sp_res[0])
@@ -211,6 +253,7 @@ def relatives_within_generations(person: str, generations: int) -> set[str]:
     
     return all_relatives
 
+@instrumented_helper
 def unrelated_individuals() -> set[str]:
     """
     Returns the set of individuals in the dataset that have no family relationship
@@ -222,14 +265,14 @@ def unrelated_individuals() -> set[str]:
     all_individuals = set()
     
     # Get all individuals who are parents
-    parents_results = pyDatalog.ask('parent(X, Y)')
+    parents_results = ask('parent(X, Y)')
     if parents_results:
         for r in parents_results.answers:
             all_individuals.add(str(r[0]))
             all_individuals.add(str(r[1]))
 
     # Get all individuals who are spouses
-    spouses_results = pyDatalog.ask('spouse(X, Y)')
+    spouses_results = ask('spouse(X, Y)')
     if spouses_results:
         for r in spouses_results.answers:
             all_individuals.add(str(r[0]))
@@ -242,9 +285,9 @@ def unrelated_individuals() -> set[str]:
     isolated_individuals = set()
     for person in all_individuals:
         # Check if the person has any parent, child, or spouse
-        has_parent = pyDatalog.ask(f'parent(P, "{person}")')
-        has_child = pyDatalog.ask(f'child(C, "{person}")')
-        has_spouse = pyDatalog.ask(f'spouse(S, "{person}")')
+        has_parent = ask(f'parent(P, "{person}")')
+        has_child = ask(f'child(C, "{person}")')
+        has_spouse = ask(f'spouse(S, "{person}")')
 
         if not has_parent and not has_child and not has_spouse:
             isolated_individuals.add(person)
@@ -261,15 +304,14 @@ def unrelated_individuals() -> set[str]:
     
     # However, we need to ensure `all_individuals` contains *all* people in the dataset,
     # not just those involved in some relationship.
-    # Let's get all names from the CSV directly for a complete list.
-    df = load_facts_dataframe(CSV_FILEPATH) # Use the helper from facts.py
-    all_names_in_dataset = set(df['Name'].tolist())
+    # Take every name of the loaded knowledge base (not the shipped CSV, which may not be the one loaded).
+    all_names_in_dataset = set(current_graph().names)
 
     isolated_individuals_from_dataset = set()
     for person_name in all_names_in_dataset:
-        has_parent_fact = pyDatalog.ask(f'parent(P, "{person_name}")')
-        is_parent_fact = pyDatalog.ask(f'parent("{person_name}", C)')
-        has_spouse_fact = pyDatalog.ask(f'spouse(S, "{person_name}")')
+        has_parent_fact = ask(f'parent(P, "{person_name}")')
+        is_parent_fact = ask(f'parent("{person_name}", C)')
+        has_spouse_fact = ask(f'spouse(S, "{person_name}")')
 
         if not has_parent_fact and not is_parent_fact and not has_spouse_fact:
             isolated_individuals_from_dataset.add(person_name)
@@ -277,15 +319,16 @@ def unrelated_individuals() -> set[str]:
     return isolated_individuals_from_dataset
 
 
+@instrumented_helper
 def is_direct_line_of_descent(descendant: str, ancestor: str) -> bool:
     """
     True if descendant is in a direct line of descent from ancestor
     (i.e., ancestor is an ancestor of descendant, possibly many generations).
     """
     _ensure_kb_loaded()
-    result = pyDatalog.ask(f'ancestor("{ancestor}", "{descendant}")')
-    return bool(result)
+    return (ancestor, descendant) in current_closures().relation('ancestor')
 
+@instrumented_helper
 def is_aunt_or_uncle(x: str, y: str) -> Tuple[bool, str]:
     """
     Returns a tuple (True, "aunt") / (True, "uncle") if x is an aunt or uncle of y.
@@ -293,16 +336,17 @@ def is_aunt_or_uncle(x: str, y: str) -> Tuple[bool, str]:
     """
     _ensure_kb_loaded()
     
-    is_aunt_result = pyDatalog.ask(f'aunt("{x}", "{y}")')
+    is_aunt_result = ask(f'aunt("{x}", "{y}")')
     if is_aunt_result:
         return True, "aunt"
     
-    is_uncle_result = pyDatalog.ask(f'uncle("{x}", "{y}")')
+    is_uncle_result = ask(f'uncle("{x}", "{y}")')
     if is_uncle_result:
         return True, "uncle"
         
     return False, ""
 
+@instrumented_helper
 def is_cousin_within_n(x: str, y: str, n: int) -> bool:
     """
     Determine whether x is a cousin of y within n generations.
@@ -329,7 +373,7 @@ def is_cousin_within_n(x: str, y: str, n: int) -> bool:
                 ancestors_with_depth[current_node] = current_depth
 
             # Find parents of current_node
-            parents_results = pyDatalog.ask(f'parent(P, "{current_node}")')
+            parents_results = ask(f'parent(P, "{current_node}")')
             if parents_results:
                 for p_res in parents_results.answers:
                     parent_name = str(p_res[0])
@@ -359,11 +403,128 @@ def is_cousin_within_n(x: str, y: str, n: int) -> bool:
             # Ensure X and Y are not the same person, and not siblings.
             # The problem states "cousin of Y", implying X != Y.
             # Also, cousins are not siblings.
-            if x != y and not pyDatalog.ask(f'sibling("{x}", "{y}")'):
+            if x != y and not ask(f'sibling("{x}", "{y}")'):
                 return True
     return False
 
 
+@instrumented_helper
+def ancestors_at(person: str, k: int) -> List[str]:
+    """
+    Ancestors exactly k generations above person (k=1 parents, k=2 grandparents, k=3
+    great-grandparents, ...), looked up in the precomputed generation index.
+    """
+    _ensure_kb_loaded()
+    return list(current_generation_index().ancestors_at(person, k))
+
+@instrumented_helper
+def descendants_at(person: str, k: int) -> List[str]:
+    """
+    Descendants exactly k generations below person (k=1 children, k=2 grandchildren, ...),
+    looked up in the precomputed generation index.
+    """
+    _ensure_kb_loaded()
+    return list(current_generation_index().descendants_at(person, k))
+
+@instrumented_helper
+def limited_query(query: str, **limits) -> List[Tuple[str, ...]]:
+    """
+    Runs a PyDatalog query under resource limits (max_seconds, max_derived, max_results;
+    see src.governor), with the unset ones taken from the global defaults.
+
+    Returns:
+        The sorted, deduplicated answer rows as tuples of strings.
+
+    Raises:
+        QueryLimitExceeded: If the query crosses a limit; exc.stats holds the partial counts.
+    """
+    _ensure_kb_loaded()
+    return sorted(set(tuple(str(v) for v in row) for row in governed_ask(query, **limits)))
+
+@instrumented_helper
+def kinship_coefficient(x: str, y: str) -> float:
+    """
+    Kinship coefficient of x and y over the father/mother facts (0.25 for parent and child
+    or full siblings, 0.0625 for first cousins, 0 when unrelated by blood).
+    """
+    _ensure_kb_loaded()
+    return current_kinship().coefficient(x, y)
+
+@instrumented_helper
+def kinship_coefficients(pairs: List[Tuple[str, str]]) -> List[float]:
+    """Kinship coefficients for many (x, y) pairs, sharing memoized ancestral pairs."""
+    _ensure_kb_loaded()
+    return current_kinship().coefficients(tuple(pair) for pair in pairs)
+
+@instrumented_helper
+def find_person(query: str, k: int = 5) -> Dict[str, Any]:
+    """
+    Looks a person up by an inexact name (any case, missing accents, small typos).
+
+    Returns:
+        {"query", "match", "ambiguous", "candidates"}: match is the person's exact name, or
+        None when nobody is close enough or several people are equally plausible (ambiguous);
+        candidates holds up to k (name, similarity) pairs, best first.
+    """
+    _ensure_kb_loaded()
+    return current_name_index().find(query, k)
+
+@instrumented_helper
+def kinship_profile(person: str) -> Dict[str, List[str]]:
+    """
+    Every relative X of person, labelled with every relation(X, person) of src.rules that
+    holds (e.g. {"Peter": ["step_parent"], ...}), from one walk of person's neighbourhood
+    in the family graph instead of one query per relation (see src.profiles).
+    """
+    _ensure_kb_loaded()
+    return {x: list(labels) for x, labels in _kinship_profile(current_graph(), person).items()}
+
+@instrumented_helper
+def closest_relatives(person: str, k: int = 10, weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+    """
+    The k relatives nearest to person, as (name, distance) pairs ranked by a weighted path
+    distance over parent, child, sibling, spouse and adoption links (see src.nearest for
+    the default weights). The search stops once k relatives are settled.
+    """
+    _ensure_kb_loaded()
+    return _closest_relatives(current_graph(), person, k, weights)
+
+@instrumented_helper
+def what_if(relation: str, person: str, assert_facts: Iterable[Sequence[str]] = (),
+            retract_facts: Iterable[Sequence[str]] = ()) -> Dict[str, List[str]]:
+    """
+    relation(X, person) after hypothetically asserting and retracting base facts, given as
+    [predicate, *args] (e.g. ["spouse", "Daniel", "Zoe"]); the loaded KB is left untouched.
+
+    Returns:
+        {"relatives", "gained", "lost"}: every X on the changed family, and the X for
+        which the relation starts or stops holding (see src.overlay).
+    """
+    _ensure_kb_loaded()
+    with _what_if() as overlay:
+        for predicate, *args in assert_facts:
+            overlay.assert_fact(predicate, *args)
+        for predicate, *args in retract_facts:
+            overlay.retract_fact(predicate, *args)
+        return {"relatives": overlay.relatives(relation, person), **overlay.compare(relation, person)}
+
+@instrumented_helper
+def relatives_as_of(relation: str, person: str, as_of: Optional[str] = None) -> List[str]:
+    """
+    Sorted X such that relation(X, person) held on the as_of date ("YYYY-MM-DD"), for the
+    step and in-law relations (src.timeline.AS_OF_RELATIONS). Without a date, or for facts
+    loaded without dates, every marriage and adoption counts, as in the rules.
+    """
+    _ensure_kb_loaded()
+    return current_timeline().relatives(relation, person, as_of)
+
+@instrumented_helper
+def has_multiple_marriages(person: str, as_of: Optional[str] = None) -> bool:
+    """True if person had married two or more different people by the as_of date (any date if None)."""
+    _ensure_kb_loaded()
+    return current_timeline().multiple_marriages(person, as_of)
+
+
 if __name__ == "__main__":
     print("Running all queries...")
     all_results = run_all_queries()
@@ -0,0 +1,288 @@
+"""
+Direct Python evaluation of the rules in src.rules, one person at a time.
+
+Each function takes a graph (a FamilyGraph or anything with the same lookup methods,
+such as a dated snapshot) and a person Y, and returns the set of X such that
+relation(X, Y) holds, following the corresponding PyDatalog rule literally,
+negations and (X != Y) guards included. PERSON_RELATIONS covers every binary
+relation of RELATION_ARITIES, and PERSON_PREDICATES the unary ones.
+
+Example usage:
+    graph = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_FILEPATH))
+    step_parents(graph, "David")             # {'Peter'}
+    PERSON_RELATIONS["sister_in_law"](graph, "Paul")
+"""
+from typing import Callable, Dict, Set
+
+# Base facts
+
+def fathers(g, y: str) -> Set[str]:
+    return set(g.fathers(y))
+
+def mothers(g, y: str) -> Set[str]:
+    return set(g.mothers(y))
+
+def adoptive_fathers(g, y: str) -> Set[str]:
+    return set(g.adoptive_fathers(y))
+
+def adoptive_mothers(g, y: str) -> Set[str]:
+    return set(g.adoptive_mothers(y))
+
+def spouses(g, y: str) -> Set[str]:
+    # spouse facts are registered in both orientations
+    return set(g.spouses(y))
+
+# Q1.2 / Q2.1 Parents and children
+
+def parents(g, y: str) -> Set[str]:
+    return set(g.parents(y))
+
+def children(g, y: str) -> Set[str]:
+    # child(X, Y) <= parent(Y, X)
+    return set(g.children(y))
+
+def sons(g, y: str) -> Set[str]:
+    return {x for x in g.children(y) if g.is_male(x)}
+
+def daughters(g, y: str) -> Set[str]:
+    return {x for x in g.children(y) if g.is_female(x)}
+
+# Q3.1 Sibling Logic
+
+def siblings(g, y: str) -> Set[str]:
+    # sibling(X, Y) <= parent(P, X) & parent(P, Y) & (X != Y)
+    return {x for p in g.parents(y) for x in g.children(p) if x != y}
+
+def shares_mother(g, y: str) -> Set[str]:
+    # shares_mother(X, Y) <= mother(M_of_X, X) & mother(M_of_Y, Y) & (M_of_X == M_of_Y) & (X != Y)
+    return {x for m in g.mothers(y) for x in g.biological_children(m) if x != y and m in g.mothers(x)}
+
+def shares_father(g, y: str) -> Set[str]:
+    return {x for f in g.fathers(y) for x in g.biological_children(f) if x != y and f in g.fathers(x)}
+
+def full_siblings(g, y: str) -> Set[str]:
+    # full_sibling(X, Y) <= shares_father(X, Y) & shares_mother(X, Y)
+    return shares_father(g, y) & shares_mother(g, y)
+
+def half_siblings(g, y: str) -> Set[str]:
+    # half_sibling(X, Y) <= shares_father(X, Y) & ~shares_mother(X, Y), and the other way round
+    return shares_father(g, y) ^ shares_mother(g, y)
+
+def brothers(g, y: str) -> Set[str]:
+    return {x for x in siblings(g, y) if g.is_male(x)}
+
+def sisters(g, y: str) -> Set[str]:
+    return {x for x in siblings(g, y) if g.is_female(x)}
+
+# Q4.1 Ancestry and Descendants
+
+def grandparents(g, y: str) -> Set[str]:
+    # grandparent(X, Y) <= parent(X, P) & parent(P, Y)
+    return {x for p in g.parents(y) for x in g.parents(p)}
+
+def grandchildren(g, y: str) -> Set[str]:
+    # grandchild(X, Y) <= grandparent(Y, X)
+    return {x for c in g.children(y) for x in g.children(c)}
+
+def grandfathers(g, y: str) -> Set[str]:
+    return {x for x in grandparents(g, y) if g.is_male(x)}
+
+def grandmothers(g, y: str) -> Set[str]:
+    return {x for x in grandparents(g, y) if g.is_female(x)}
+
+def great_grandparents(g, y: str) -> Set[str]:
+    # great_grandparent(X, Y) <= grandparent(X, P) & parent(P, Y)
+    return {x for p in g.parents(y) for x in grandparents(g, p)}
+
+def _reachable(step, y: str) -> Set[str]:
+    """Everyone reachable from y in one or more steps (y itself only through a cycle)."""
+    found: Set[str] = set()
+    frontier = list(step(y))
+    while frontier:
+        x = frontier.pop()
+        if x not in found:
+            found.add(x)
+            frontier.extend(step(x))
+    return found
+
+def ancestors(g, y: str) -> Set[str]:
+    # ancestor(X, Y) <= parent(X, Y); ancestor(X, Y) <= parent(X, P) & ancestor(P, Y)
+    return _reachable(g.parents, y)
+
+def descendants(g, y: str) -> Set[str]:
+    # descendant(X, Y) <= ancestor(Y, X)
+    return _reachable(g.children, y)
+
+# Q5.1 Extended Family rules
+
+def uncles(g, y: str) -> Set[str]:
+    # uncle(X, Y) <= sibling(X, P) & parent(P, Y) & is_male(X)
+    return {x for p in g.parents(y) for x in siblings(g, p) if g.is_male(x)}
+
+def aunts(g, y: str) -> Set[str]:
+    return {x for p in g.parents(y) for x in siblings(g, p) if g.is_female(x)}
+
+def first_cousins(g, y: str) -> Set[str]:
+    # first_cousin(X, Y) <= parent(P1, X) & parent(P2, Y) & sibling(P1, P2) & (X != Y)
+    return {x for p2 in g.parents(y) for p1 in siblings(g, p2) for x in g.children(p1) if x != y}
+
+def second_cousins(g, y: str) -> Set[str]:
+    # second_cousin(X, Y) <= parent(P1, X) & parent(P2, Y) & first_cousin(P1, P2) & (X != Y)
+    return {x for p2 in g.parents(y) for p1 in first_cousins(g, p2) for x in g.children(p1) if x != y}
+
+def cousins(g, y: str) -> Set[str]:
+    # cousin(X, Y) <= first_cousin(X, Y)
+    # cousin(X, Y) <= parent(P1, X) & parent(P2, Y) & cousin(P1, P2) & (X != Y)
+    # Least fixpoint over y and its ancestors, so parent cycles terminate
+    people = {y} | ancestors(g, y)
+    found = {p: first_cousins(g, p) for p in people}
+    changed = True
+    while changed:
+        changed = False
+        for p in people:
+            derived = {x for p2 in g.parents(p) for p1 in found[p2] for x in g.children(p1) if x != p}
+            if not derived <= found[p]:
+                found[p] |= derived
+                changed = True
+    return found[y]
+
+# Q6.2 Spouse and In-law Logic
+
+def mothers_in_law(g, y: str) -> Set[str]:
+    # mother_in_law(X, Y) <= spouse(Y, P) & mother(X, P)
+    return {x for p in g.spouses(y) for x in g.mothers(p)}
+
+def fathers_in_law(g, y: str) -> Set[str]:
+    # father_in_law(X, Y) <= spouse(Y, P) & father(X, P)
+    return {x for p in g.spouses(y) for x in g.fathers(p)}
+
+def brothers_in_law(g, y: str) -> Set[str]:
+    # brother_in_law(X, Y) <= spouse(Y, P) & brother(X, P)
+    # brother_in_law(X, Y) <= sibling(X, P) & spouse(P, Y) & is_male(X)
+    # (spouse is symmetric, so both rules give the same set)
+    return {x for p in g.spouses(y) for x in brothers(g, p)}
+
+def sisters_in_law(g, y: str) -> Set[str]:
+    return {x for p in g.spouses(y) for x in sisters(g, p)}
+
+def sons_in_law(g, y: str) -> Set[str]:
+    # son_in_law(X, Y) <= spouse(X, P) & child(P, Y) & is_male(X)
+    return {x for p in g.children(y) for x in g.spouses(p) if g.is_male(x)}
+
+def daughters_in_law(g, y: str) -> Set[str]:
+    return {x for p in g.children(y) for x in g.spouses(p) if g.is_female(x)}
+
+def siblings_in_law(g, y: str) -> Set[str]:
+    return brothers_in_law(g, y) | sisters_in_law(g, y)
+
+def nieces_in_law(g, y: str) -> Set[str]:
+    # niece_in_law(X, Y) <= sibling_in_law(P, Y) & child(X, P) & is_female(X)
+    return {x for p in siblings_in_law(g, y) for x in g.children(p) if g.is_female(x)}
+
+def nephews_in_law(g, y: str) -> Set[str]:
+    return {x for p in siblings_in_law(g, y) for x in g.children(p) if g.is_male(x)}
+
+# Q7.1 Step Relationships
+
+def step_parents(g, y: str) -> Set[str]:
+    # step_parent(X, Y) <= spouse(X, P) & parent(P, Y) & ~parent(X, Y)
+    parents = g.parents(y)
+    return {x for p in parents for x in g.spouses(p) if x not in parents}
+
+def step_children(g, y: str) -> Set[str]:
+    # step_child(X, Y) <= step_parent(Y, X)
+    children = g.children(y)
+    return {x for p in g.spouses(y) for x in g.children(p) if x not in children}
+
+def step_siblings(g, y: str) -> Set[str]:
+    # step_sibling(X, Y) <= parent(P1, X) & parent(P2, Y) & spouse(P1, P2) & ~sibling(X, Y) & (X != Y)
+    own_siblings = siblings(g, y)
+    return {x for p2 in g.parents(y) for p1 in g.spouses(p2) for x in g.children(p1)
+            if x != y and x not in own_siblings}
+
+def step_grandparents(g, y: str) -> Set[str]:
+    # step_grandparent(X, Y) <= step_parent(X, P) & parent(P, Y)
+    # step_grandparent(X, Y) <= grandparent(X, P) & step_parent(P, Y)
+    result = {x for p in g.parents(y) for x in step_parents(g, p)}
+    result.update(x for p in step_parents(g, y) for x in grandparents(g, p))
+    return result
+
+# Q8.1 Blended and Complex Relationships
+
+def adoptive_parents(g, y: str) -> Set[str]:
+    return set(g.adoptive_parents(y))
+
+def biological_parents(g, y: str) -> Set[str]:
+    return set(g.biological_parents(y))
+
+def half_uncles(g, y: str) -> Set[str]:
+    # half_uncle(X, Y) <= half_sibling(X, P) & parent(P, Y) & is_male(X)
+    return {x for p in g.parents(y) for x in half_siblings(g, p) if g.is_male(x)}
+
+def step_cousins(g, y: str) -> Set[str]:
+    # step_cousin(X, Y) <= parent(P1, X) & parent(P2, Y) & step_sibling(P1, P2) & (X != Y)
+    # step_cousin(X, Y) <= parent(P1, X) & step_parent(P2, Y) & sibling(P1, P2) & (X != Y)
+    result = {x for p2 in g.parents(y) for p1 in step_siblings(g, p2) for x in g.children(p1)}
+    result.update(x for p2 in step_parents(g, y) for p1 in siblings(g, p2) for x in g.children(p1))
+    result.discard(y)
+    return result
+
+def multiple_marriages(g, x: str) -> bool:
+    # multiple_marriages(X) <= spouse(X, Y) & spouse(X, Z) & (Y != Z)
+    return len(g.spouses(x)) > 1
+
+# relation name -> function returning {X : relation(X, Y)} for a given Y
+PERSON_RELATIONS: Dict[str, Callable[..., Set[str]]] = {
+    'father': fathers,
+    'mother': mothers,
+    'adoptive_father': adoptive_fathers,
+    'adoptive_mother': adoptive_mothers,
+    'spouse': spouses,
+    'parent': parents,
+    'child': children,
+    'son': sons,
+    'daughter': daughters,
+    'sibling': siblings,
+    'shares_mother': shares_mother,
+    'shares_father': shares_father,
+    'full_sibling': full_siblings,
+    'half_sibling': half_siblings,
+    'brother': brothers,
+    'sister': sisters,
+    'grandparent': grandparents,
+    'grandchild': grandchildren,
+    'grandfather': grandfathers,
+    'grandmother': grandmothers,
+    'great_grandparent': great_grandparents,
+    'ancestor': ancestors,
+    'descendant': descendants,
+    'uncle': uncles,
+    'aunt': aunts,
+    'first_cousin': first_cousins,
+    'second_cousin': second_cousins,
+    'cousin': cousins,
+    'mother_in_law': mothers_in_law,
+    'father_in_law': fathers_in_law,
+    'brother_in_law': brothers_in_law,
+    'sister_in_law': sisters_in_law,
+    'son_in_law': sons_in_law,
+    'daughter_in_law': daughters_in_law,
+    'sibling_in_law': siblings_in_law,
+    'niece_in_law': nieces_in_law,
+    'nephew_in_law': nephews_in_law,
+    'step_parent': step_parents,
+    'step_child': step_children,
+    'step_sibling': step_siblings,
+    'step_grandparent': step_grandparents,
+    'adoptive_parent': adoptive_parents,
+    'biological_parent': biological_parents,
+    'half_uncle': half_uncles,
+    'step_cousin': step_cousins,
+}
+
+# unary relation name -> predicate on a person
+PERSON_PREDICATES: Dict[str, Callable[..., bool]] = {
+    'is_male': lambda g, x: g.is_male(x),
+    'is_female': lambda g, x: g.is_female(x),
+    'multiple_marriages': multiple_marriages,
+}
@@ -1,3 +1,7 @@
+"""
+This module defines the logical rules for family relationships using PyDatalog.
+It includes base rules for parent-child relationships and a basic sibling rule.
+"""
 import sys
 import os
 
@@ -6,10 +10,6 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-"""
-This module defines the logical rules for family relationships using PyDatalog.
-It includes base rules for parent-child relationships and a basic sibling rule.
-"""
 from typing import List, Tuple, Dict
 from pyDatalog import pyDatalog
 
@@ -28,8 +28,79 @@ pyDatalog.create_terms('P1, P2, grandparent, grandchild, uncle, aunt, cousin, GP
 
 # Terms are created globally by src.facts when it's imported.
 # We import them directly from src.facts.
+from src.views import get_views
+from src.metrics import ask, timed_stage
 from src.facts import X, Y, P, father, mother, parent, child, son, daughter, is_male, is_female, spouse, sibling, adoptive_father, adoptive_mother, M1, M2, F1, F2, M_X, M_Y, F_X, F_Y, shares_father, shares_mother, M_of_X, M_of_Y, F_of_X, F_of_Y
 
+# Arity of every predicate that can be queried once facts and rules are loaded
+RELATION_ARITIES: Dict[str, int] = {
+    # Base facts (src.facts)
+    'father': 2, 'mother': 2, 'adoptive_father': 2, 'adoptive_mother': 2,
+    'spouse': 2, 'is_male': 1, 'is_female': 1,
+    # Derived relations (define_family_rules)
+    'parent': 2, 'child': 2, 'son': 2, 'daughter': 2,
+    'sibling': 2, 'shares_mother': 2, 'shares_father': 2, 'full_sibling': 2, 'half_sibling': 2,
+    'brother': 2, 'sister': 2,
+    'grandparent': 2, 'grandchild': 2, 'grandfather': 2, 'grandmother': 2, 'great_grandparent': 2,
+    'ancestor': 2, 'descendant': 2,
+    'uncle': 2, 'aunt': 2, 'first_cousin': 2, 'second_cousin': 2, 'cousin': 2,
+    'mother_in_law': 2, 'father_in_law': 2, 'brother_in_law': 2, 'sister_in_law': 2,
+    'son_in_law': 2, 'daughter_in_law': 2, 'sibling_in_law': 2, 'niece_in_law': 2, 'nephew_in_law': 2,
+    'step_parent': 2, 'step_child': 2, 'step_sibling': 2, 'step_grandparent': 2,
+    'adoptive_parent': 2, 'biological_parent': 2, 'multiple_marriages': 1, 'half_uncle': 2, 'step_cousin': 2,
+}
+
+# Relations asserted as facts; every other relation of RELATION_ARITIES is derived by the rules
+BASE_RELATIONS = ('father', 'mother', 'adoptive_father', 'adoptive_mother', 'spouse', 'is_male', 'is_female')
+DERIVED_RELATIONS = tuple(r for r in RELATION_ARITIES if r not in BASE_RELATIONS)
+
+# Relations used in the bodies of the rules of each derived relation (negated ones included),
+# as written in define_family_rules; ancestor and cousin refer to themselves
+RULE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    'parent': ('father', 'mother', 'adoptive_father', 'adoptive_mother'),
+    'child': ('parent',),
+    'son': ('child', 'is_male'),
+    'daughter': ('child', 'is_female'),
+    'sibling': ('parent',),
+    'shares_mother': ('mother',),
+    'shares_father': ('father',),
+    'full_sibling': ('shares_father', 'shares_mother'),
+    'half_sibling': ('shares_father', 'shares_mother'),
+    'brother': ('sibling', 'is_male'),
+    'sister': ('sibling', 'is_female'),
+    'grandparent': ('parent',),
+    'grandchild': ('grandparent',),
+    'grandfather': ('grandparent', 'is_male'),
+    'grandmother': ('grandparent', 'is_female'),
+    'great_grandparent': ('grandparent', 'parent'),
+    'ancestor': ('parent', 'ancestor'),
+    'descendant': ('ancestor',),
+    'uncle': ('sibling', 'parent', 'is_male'),
+    'aunt': ('sibling', 'parent', 'is_female'),
+    'first_cousin': ('parent', 'sibling'),
+    'second_cousin': ('parent', 'first_cousin'),
+    'cousin': ('first_cousin', 'parent', 'cousin'),
+    'mother_in_law': ('spouse', 'mother'),
+    'father_in_law': ('spouse', 'father'),
+    'brother_in_law': ('spouse', 'brother', 'sibling', 'is_male'),
+    'sister_in_law': ('spouse', 'sister', 'sibling', 'is_female'),
+    'son_in_law': ('spouse', 'child', 'is_male'),
+    'daughter_in_law': ('spouse', 'child', 'is_female'),
+    'sibling_in_law': ('brother_in_law', 'sister_in_law'),
+    'niece_in_law': ('sibling_in_law', 'child', 'is_female'),
+    'nephew_in_law': ('sibling_in_law', 'child', 'is_male'),
+    'step_parent': ('spouse', 'parent'),
+    'step_child': ('step_parent',),
+    'step_sibling': ('parent', 'spouse', 'sibling'),
+    'step_grandparent': ('step_parent', 'parent', 'grandparent'),
+    'adoptive_parent': ('adoptive_father', 'adoptive_mother'),
+    'biological_parent': ('father', 'mother'),
+    'multiple_marriages': ('spouse',),
+    'half_uncle': ('half_sibling', 'parent', 'is_male'),
+    'step_cousin': ('parent', 'step_sibling', 'step_parent', 'sibling'),
+}
+
+@timed_stage("define_rules")
 def define_family_rules() -> None:
     """
     Declares PyDatalog terms and defines logical rules for family relationships.
@@ -123,31 +194,28 @@ def sample_queries() -> Dict[str, List]:
         A dictionary containing results of sample queries as sorted lists/tuples.
     """
     # Query for children of John
-    children_of_john_results = pyDatalog.ask('child(X, "John")')
+    children_of_john_results = ask('child(X, "John")')
     children_of_john = sorted(set([str(r[0]) for r in children_of_john_results.answers])) if children_of_john_results else []
 
-    # Query for all sons (son, parent) tuples
-    all_sons_results = pyDatalog.ask('son(X, Y)')
-    all_sons = sorted(list(set([(str(r[0]), str(r[1])) for r in all_sons_results.answers]))) if all_sons_results else []
-
-    # Query for all daughters (daughter, parent) tuples
-    all_daughters_results = pyDatalog.ask('daughter(X, Y)')
-    all_daughters = sorted(list(set([(str(r[0]), str(r[1])) for r in all_daughters_results.answers]))) if all_daughters_results else []
+    # All sons and daughters (child, parent) tuples, from the pre-sorted materialized views
+    views = get_views()
+    all_sons = list(views['son'].pairs)
+    all_daughters = list(views['daughter'].pairs)
 
     # Query for all grandchildren of John
-    all_grandchildren_of_john_results = pyDatalog.ask('grandchild(X, "John")')
+    all_grandchildren_of_john_results = ask('grandchild(X, "John")')
     all_grandchildren_of_john = sorted(set([str(r[0]) for r in all_grandchildren_of_john_results.answers])) if all_grandchildren_of_john_results else []
 
     # Query for all uncles of Kevin
-    all_uncles_of_kevin_results = pyDatalog.ask('uncle(X, "Kevin")')
+    all_uncles_of_kevin_results = ask('uncle(X, "Kevin")')
     all_uncles_of_kevin = sorted(set([str(r[0]) for r in all_uncles_of_kevin_results.answers])) if all_uncles_of_kevin_results else []
 
     # Query for all aunts of Kevin
-    all_aunts_of_kevin_results = pyDatalog.ask('aunt(X, "Kevin")')
+    all_aunts_of_kevin_results = ask('aunt(X, "Kevin")')
     all_aunts_of_kevin = sorted(set([str(r[0]) for r in all_aunts_of_kevin_results.answers])) if all_aunts_of_kevin_results else []
 
     # Query for all cousins of Sarah
-    all_cousins_of_sarah_results = pyDatalog.ask('cousin(X, "Sarah")')
+    all_cousins_of_sarah_results = ask('cousin(X, "Sarah")')
     all_cousins_of_sarah = sorted(set([str(r[0]) for r in all_cousins_of_sarah_results.answers])) if all_cousins_of_sarah_results else []
 
     return {
@@ -0,0 +1,284 @@
+"""
+Pre-fork query server sharing one loaded knowledge base between worker processes.
+
+The parent process loads the facts and rules once (a FamilyKB, see src.instances), builds
+the views (plus any extra hot relations), the family graph, the generation, kinship and
+name indexes, freezes them out of the garbage collector (gc.freeze, so that collections
+in the workers do not write to the shared pages) and then forks the workers. A swap
+unfreezes the heap and releases the previous knowledge base before freezing again. Each worker
+activates the inherited instance, so the helpers of src.queries never reload the CSV, and
+accepts connections on the shared listening socket. A connection carries the JSONL
+protocol of src.cli: one query per line in, one result per line out.
+
+The parent supervises the workers: a worker that exits is replaced. swap() (or SIGHUP
+while serve_forever runs) loads and warms a new dataset, forks a new generation of
+workers on it, and asks the old workers to stop once their current connection is done,
+so the socket keeps being served throughout. SIGTERM or SIGINT stops the server.
+Forking requires a POSIX system.
+
+Example usage:
+    server = PreforkServer("family-expert-system/data/family_facts.csv", port=8765, workers=4)
+    server.serve_forever()
+
+    query_server(("127.0.0.1", 8765), [{"id": 1, "relation": "sibling", "args": [None, "Alice"]}])
+
+    python src/server.py --port 8765 --workers 4
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import argparse
+import contextlib
+import gc
+import json
+import select
+import signal
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.cli import run_batch
+from src.facts import CSV_FILEPATH, load_facts_dataframe
+from src.generations import current_generation_index
+from src.graph import current_graph
+from src.instances import FamilyKB
+from src.kinship import current_kinship
+from src.names import current_name_index
+from src.views import build_view, get_views
+
+# Seconds a stopping worker gets to finish its connection before it is killed
+STOP_TIMEOUT = 10.0
+
+def _serve_connections(listener: socket.socket, kb: FamilyKB) -> None:
+    """
+    Worker loop: answers one connection at a time until asked to stop (SIGTERM).
+    The signal only wakes up select() through a pipe, so an accepted connection is
+    always answered before the worker exits.
+    """
+    wakeup_r, wakeup_w = os.pipe()
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        os.write(wakeup_w, b"x")
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    with kb.activate():
+        while not stopping:
+            ready, _, _ = select.select([listener, wakeup_r], [], [])
+            if stopping or listener not in ready:
+                continue
+            try:
+                conn, _ = listener.accept()
+            except BlockingIOError:  # another worker took the connection
+                continue
+            with conn, conn.makefile("r", encoding="utf-8") as rfile, \
+                    conn.makefile("w", encoding="utf-8") as wfile:
+                try:
+                    run_batch(rfile, wfile)
+                except OSError:  # the client went away
+                    pass
+
+class PreforkServer:
+    """A listening socket, one warmed-up FamilyKB and the worker processes serving it."""
+
+    def __init__(self, source: Union[str, pd.DataFrame] = CSV_FILEPATH, host: str = "127.0.0.1",
+                 port: int = 0, workers: Optional[int] = None, hot_relations: Iterable[str] = ()):
+        """
+        Args:
+            source: Family facts CSV path or DataFrame served by the workers.
+            host, port: Address to listen on (port 0 picks a free port, see address).
+            workers: Number of worker processes (default: one per CPU).
+            hot_relations: Binary relations materialized as views before forking, on top
+                of the default views.
+        """
+        self.source = source
+        self.num_workers = workers or os.cpu_count() or 1
+        self.hot_relations = tuple(hot_relations)
+        self.restarts = 0
+        self.generation = 0
+        self._host, self._port = host, port
+        self._listener: Optional[socket.socket] = None
+        self._kb: Optional[FamilyKB] = None
+        self._workers: Dict[int, int] = {}   # pid -> generation
+        self._retiring: Dict[int, float] = {}  # pid -> deadline
+        self._swap_requested = False
+        self._stop_requested = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._listener.getsockname()[:2]
+
+    @property
+    def worker_pids(self) -> List[int]:
+        """Pids of the workers of the current generation."""
+        return sorted(self._workers)
+
+    def _prepare(self, source: Union[str, pd.DataFrame]) -> FamilyKB:
+        """Loads source into a new FamilyKB and builds every index the workers use."""
+        kb = FamilyKB(f"server-{self.generation + 1}")
+        df = source if isinstance(source, pd.DataFrame) else load_facts_dataframe(source)
+        kb.load(df)
+        with kb.activate():
+            views = get_views()
+            views.update((r, build_view(r)) for r in self.hot_relations if r not in views)
+            current_graph()
+            current_generation_index()
+            current_kinship()
+            current_name_index()
+        return kb
+
+    def _install(self, kb: FamilyKB) -> None:
+        """
+        Makes kb the knowledge base forked workers inherit. The previous one (already
+        inherited by its workers) is released, and the heap is frozen again without it.
+        """
+        old, self._kb = self._kb, kb
+        gc.unfreeze()  # otherwise the previous knowledge base stays frozen, i.e. is never freed
+        if old is not None:
+            old.drop()
+        del old
+        gc.collect()
+        gc.freeze()
+
+    def _fork_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_connections(self._listener, self._kb)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self._workers[pid] = self.generation
+        return pid
+
+    def start(self) -> None:
+        """Loads and warms the knowledge base, binds the socket and forks the workers."""
+        self._install(self._prepare(self.source))
+        self.generation += 1
+        self._listener = socket.create_server((self._host, self._port), backlog=128)
+        self._listener.setblocking(False)  # workers wait in select(), see _serve_connections
+        for _ in range(self.num_workers):
+            self._fork_worker()
+
+    def swap(self, source: Optional[Union[str, pd.DataFrame]] = None) -> None:
+        """
+        Serves a new dataset (default: reload the current source): the new generation of
+        workers is started before the old one is asked to stop.
+        """
+        source = self.source if source is None else source
+        kb = self._prepare(source)
+        old = list(self._workers)
+        self.source = source
+        self._install(kb)
+        self.generation += 1
+        self._workers = {}
+        for _ in range(self.num_workers):
+            self._fork_worker()
+        for pid in old:
+            self._retire(pid)
+
+    def _retire(self, pid: int) -> None:
+        self._retiring[pid] = time.monotonic() + STOP_TIMEOUT
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+
+    def poll(self) -> List[int]:
+        """
+        Reaps exited workers, replaces those of the current generation and kills retiring
+        workers past their deadline. Called by serve_forever; call it yourself after start().
+
+        Returns:
+            The pids of the workers that were replaced.
+        """
+        replaced = []
+        for pid in list(self._workers) + list(self._retiring):
+            try:
+                exited, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                exited = pid
+            if exited == 0:
+                continue
+            self._retiring.pop(pid, None)
+            if self._workers.pop(pid, None) is not None and not self._stop_requested:
+                self._fork_worker()
+                self.restarts += 1
+                replaced.append(pid)
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now > deadline:
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+        return replaced
+
+    def stop(self) -> None:
+        """Stops every worker (each finishes its current connection first) and closes the socket."""
+        self._stop_requested = True
+        for pid in list(self._workers):
+            self._retire(pid)
+        self._workers = {}
+        while self._retiring:
+            self.poll()
+            time.sleep(0.05)
+        if self._listener is not None:
+            self._listener.close()
+        self._kb = None
+        gc.unfreeze()
+
+    def serve_forever(self, poll_interval: float = 0.2) -> None:
+        """
+        Starts the server and supervises the workers until SIGTERM or SIGINT; SIGHUP swaps
+        in the current source again (e.g. an updated CSV file). Must run in the main thread.
+        """
+        def request_swap(signum, frame):
+            self._swap_requested = True
+
+        def request_stop(signum, frame):
+            self._stop_requested = True
+
+        signal.signal(signal.SIGHUP, request_swap)
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        if self._listener is None:
+            self.start()
+        while not self._stop_requested:
+            if self._swap_requested:
+                self._swap_requested = False
+                self.swap()
+            self.poll()
+            time.sleep(poll_interval)
+        self.stop()
+
+def query_server(address: Tuple[str, int], queries: Iterable[Dict[str, Any]],
+                 timeout: Optional[float] = 30.0) -> List[Dict[str, Any]]:
+    """Sends queries over one connection and returns the results, in order."""
+    with socket.create_connection(address, timeout=timeout) as conn:
+        conn.sendall("".join(json.dumps(q) + "\n" for q in queries).encode("utf-8"))
+        conn.shutdown(socket.SHUT_WR)
+        with conn.makefile("r", encoding="utf-8") as rfile:
+            return [json.loads(line) for line in rfile if line.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve JSONL family queries from pre-forked workers.")
+    parser.add_argument("--csv", default=CSV_FILEPATH, help="Family facts CSV to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--hot", nargs="*", default=[], help="extra relations to materialize before forking")
+    args = parser.parse_args()
+    server = PreforkServer(args.csv, args.host, args.port, args.workers, args.hot)
+    server.start()
+    print(f"Serving {args.csv} on {server.address[0]}:{server.address[1]} with {server.num_workers} workers "
+          f"(pid {os.getpid()}; SIGHUP reloads)")
+    server.serve_forever()
@@ -0,0 +1,109 @@
+"""
+Per-person aggregate statistics in one pass over the parent DAG.
+
+Counting descendants with one descendant(X, "...") query per person re-derives the
+same sub-trees over and over. person_stats walks the topological order of the parent
+graph once in each direction and keeps, per person, the set of descendants (ancestors)
+as a bitset, i.e. a Python int with one bit per person: a person's set is the union (OR)
+of the sets of their children (parents) plus the children (parents) themselves, and
+its size is a popcount. A set is released as soon as every person needing it has been
+processed, so a long line of descent only holds a couple of sets at a time.
+
+Like the generation index, edges ignored by FamilyGraph.topological_order (someone
+recorded as their own parent, parent cycles) are left out, so nobody counts as their
+own descendant.
+
+Columns:
+    name, generation (longest line of ancestry above, as in src.generations), num_parents,
+    num_children, num_descendants, generations_below (longest line of descent below),
+    num_ancestors, num_marriages, num_step_children
+The facts record no deaths, so every recorded generation below counts.
+
+Example usage:
+    table = person_stats(graph)                  # one row per person, sorted by name
+    table.nlargest(3, "num_descendants")
+    current_person_stats().set_index("name").loc["John", "num_step_children"]
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.graph import FamilyGraph, current_graph
+from src.relations import step_children
+from src.views import cached_on_logic
+
+COLUMNS = ["name", "generation", "num_parents", "num_children", "num_descendants", "generations_below",
+           "num_ancestors", "num_marriages", "num_step_children"]
+
+def _closure_counts(order: List[str], neighbours: Dict[str, List[str]]):
+    """
+    For each person in order (every neighbour coming before the people pointing to it),
+    the number of people reachable through neighbours and the longest such path.
+    """
+    position = {x: i for i, x in enumerate(order)}
+    # How many people still need each person's set
+    pending = {x: 0 for x in order}
+    for x in order:
+        for n in neighbours[x]:
+            pending[n] += 1
+
+    reach: Dict[str, int] = {}
+    counts = np.zeros(len(order), dtype=np.int64)
+    depths = np.zeros(len(order), dtype=np.int64)
+    for x in order:
+        bits = 0
+        depth = 0
+        for n in neighbours[x]:
+            bits |= reach[n] | (1 << position[n])
+            depth = max(depth, int(depths[position[n]]) + 1)
+            pending[n] -= 1
+            if pending[n] == 0:
+                del reach[n]
+        i = position[x]
+        counts[i] = bits.bit_count()
+        depths[i] = depth
+        if pending[x]:
+            reach[x] = bits
+    return counts, depths
+
+def person_stats(graph: FamilyGraph) -> pd.DataFrame:
+    """
+    Aggregate statistics of every person of the graph (see the module docstring for the columns).
+
+    Returns:
+        A DataFrame with one row per person, sorted by name.
+    """
+    order, ignored = graph.topological_order()
+    ignored = set(ignored)
+    dag_parents = {x: [p for p in graph.parents(x) if (p, x) not in ignored] for x in order}
+    dag_children = {x: [c for c in graph.children(x) if (x, c) not in ignored] for x in order}
+
+    num_ancestors, generations = _closure_counts(order, dag_parents)
+    num_descendants, generations_below = _closure_counts(order[::-1], dag_children)
+    num_descendants, generations_below = num_descendants[::-1], generations_below[::-1]
+
+    table = pd.DataFrame({
+        "name": order,
+        "generation": generations,
+        "num_parents": [len(dag_parents[x]) for x in order],
+        "num_children": [len(dag_children[x]) for x in order],
+        "num_descendants": num_descendants,
+        "generations_below": generations_below,
+        "num_ancestors": num_ancestors,
+        "num_marriages": [len(graph.spouses(x)) for x in order],
+        "num_step_children": [len(step_children(graph, x)) for x in order],
+    }, columns=COLUMNS)
+    return table.sort_values("name", ignore_index=True)
+
+def current_person_stats() -> pd.DataFrame:
+    """person_stats of the currently loaded knowledge base, computed on first use."""
+    return cached_on_logic('person_stats', lambda: person_stats(current_graph()))
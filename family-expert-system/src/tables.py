@@ -0,0 +1,243 @@
+"""
+This module provides a normalized, multi-table representation of the family facts
+(people, parentage, marriages and adoptions), stored column-wise in a compact binary file.
+
+Unlike the CSV, where adoptions are free text in the Notes column and spouses are a
+';'-delimited string, every fact is one row of a typed table, so loading involves no
+string parsing and a person can adopt any number of children.
+
+Tables and columns:
+    people:    name, gender
+    parentage: parent, child, role ("father" or "mother")
+    marriages: a, b (each marriage listed once), start, end
+    adoptions: parent, child, role ("father" or "mother"), start, end
+
+start/end are optional ISO dates ("YYYY-MM-DD"); an empty string means unknown/open-ended.
+
+Example usage:
+    tables = tables_from_dataframe(load_facts_dataframe(CSV_FILEPATH))
+    save_tables(tables, "family-expert-system/data/family_facts.npz")
+    tables = load_tables_into_pydatalog("family-expert-system/data/family_facts.npz")
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from pyDatalog import pyDatalog
+
+from src.facts import VALIDATION_MODES
+from src.validation import validate_tables, quarantine_tables
+
+# Attribute of the pyDatalog logic holding the tables its facts were registered from
+LOADED_TABLES_ATTRIBUTE = '_loaded_tables'
+
+# Column layout of each table
+TABLE_COLUMNS: Dict[str, tuple] = {
+    "people": ("name", "gender"),
+    "parentage": ("parent", "child", "role"),
+    "marriages": ("a", "b", "start", "end"),
+    "adoptions": ("parent", "child", "role", "start", "end"),
+}
+
+# Columns that may be absent from a file; they are filled with empty strings on load
+OPTIONAL_COLUMNS = frozenset({("marriages", "start"), ("marriages", "end"),
+                              ("adoptions", "start"), ("adoptions", "end")})
+
+Tables = Dict[str, Dict[str, np.ndarray]]
+
+def _column(values) -> np.ndarray:
+    """Builds a fixed-width unicode column, which .npz stores without pickling."""
+    return np.array(list(values), dtype=str)
+
+def tables_from_dataframe(df: pd.DataFrame) -> Tables:
+    """
+    Converts a cleaned facts DataFrame (see load_facts_dataframe) into normalized tables.
+    This is the only step that parses the Spouses and Notes strings.
+
+    Args:
+        df: A pandas DataFrame with the columns Name, Gender, Father, Mother, Spouses, Notes.
+
+    Returns:
+        A dictionary mapping table names to dictionaries of NumPy columns.
+    """
+    parentage = {"parent": [], "child": [], "role": []}
+    adoptions = {"parent": [], "child": [], "role": []}
+    marriages = set()
+
+    for name, father_name, mother_name, spouses_str, notes in zip(
+            df["Name"], df["Father"], df["Mother"], df["Spouses"], df["Notes"]):
+        for parent_name, role in ((father_name, "father"), (mother_name, "mother")):
+            if parent_name:
+                parentage["parent"].append(parent_name)
+                parentage["child"].append(name)
+                parentage["role"].append(role)
+
+        if spouses_str:
+            for spouse_name in spouses_str.split(';'):
+                if spouse_name and spouse_name != name:
+                    marriages.add(tuple(sorted((name, spouse_name))))
+
+        if isinstance(notes, str):
+            for marker, role in (("Adoptive mother of ", "mother"), ("Adoptive father of ", "father")):
+                if marker in notes:
+                    adoptions["parent"].append(name)
+                    adoptions["child"].append(notes.split(marker)[1].strip())
+                    adoptions["role"].append(role)
+                    break
+
+    # The CSV carries no dates
+    marriages = sorted(marriages)
+    adoptions["start"] = adoptions["end"] = [""] * len(adoptions["child"])
+    return {
+        "people": {"name": _column(df["Name"]), "gender": _column(df["Gender"].fillna(""))},
+        "parentage": {col: _column(values) for col, values in parentage.items()},
+        "marriages": {"a": _column(m[0] for m in marriages), "b": _column(m[1] for m in marriages),
+                      "start": _column([""] * len(marriages)), "end": _column([""] * len(marriages))},
+        "adoptions": {col: _column(values) for col, values in adoptions.items()},
+    }
+
+def save_tables(tables: Tables, path: str) -> None:
+    """
+    Saves tables to a compressed NumPy .npz file, or to a directory of Parquet files
+    (one per table) when path ends with .parquet. Parquet requires pyarrow or fastparquet.
+    """
+    if path.endswith(".parquet"):
+        os.makedirs(path, exist_ok=True)
+        for table, columns in tables.items():
+            pd.DataFrame(columns).to_parquet(os.path.join(path, f"{table}.parquet"), index=False)
+        return
+    arrays = {f"{table}.{col}": values for table, columns in tables.items() for col, values in columns.items()}
+    np.savez_compressed(path, **arrays)
+
+def load_tables(path: str) -> Tables:
+    """
+    Loads tables saved by save_tables, column by column.
+
+    Raises:
+        ValueError: If a table or column is missing from the file.
+    """
+    tables: Tables = {}
+    if path.endswith(".parquet"):
+        for table, columns in TABLE_COLUMNS.items():
+            frame = pd.read_parquet(os.path.join(path, f"{table}.parquet"))
+            tables[table] = {col: frame[col].to_numpy(dtype=str) for col in columns if col in frame}
+    else:
+        with np.load(path, allow_pickle=False) as data:
+            for table, columns in TABLE_COLUMNS.items():
+                tables[table] = {col: data[f"{table}.{col}"] for col in columns if f"{table}.{col}" in data}
+
+    for table, columns in TABLE_COLUMNS.items():
+        present = tables[table]
+        missing = [col for col in columns if col not in present and (table, col) not in OPTIONAL_COLUMNS]
+        if missing:
+            raise ValueError(f"Table '{table}' is missing columns {missing} in {path}")
+        num_rows = len(present[columns[0]])
+        for col in columns:
+            if col not in present:
+                present[col] = _column([""] * num_rows)
+    return tables
+
+def register_tables(tables: Tables, on_invalid: str = "report") -> Dict[str, int]:
+    """
+    Validates normalized tables and registers them into PyDatalog, asserting the same
+    facts as register_pydatalog_facts does for the CSV. The registered tables are kept on
+    the logic (see LOADED_TABLES_ATTRIBUTE).
+
+    Args:
+        tables: The tables, as returned by load_tables or tables_from_dataframe.
+        on_invalid: As for load_facts_dataframe: "report" registers every fact and counts the
+            issues; "quarantine" first drops the offending facts; "raise" raises on any issue;
+            "ignore" skips validation.
+
+    Returns:
+        A dictionary summarizing the number of registered facts (same keys as register_pydatalog_facts),
+        plus num_issues, the number of validation issues found.
+
+    Raises:
+        ValueError: If on_invalid is unknown, or on_invalid is "raise" and validation finds an issue.
+    """
+    if on_invalid not in VALIDATION_MODES:
+        raise ValueError(f"on_invalid must be one of {VALIDATION_MODES}, got '{on_invalid}'")
+    num_issues = 0
+    if on_invalid != "ignore":
+        report = validate_tables(tables)
+        num_issues = len(report.issues)
+        if on_invalid == "raise" and not report.ok:
+            raise ValueError(f"Invalid family tables: {report}")
+        if on_invalid == "quarantine":
+            tables = quarantine_tables(tables, report)
+
+    # Clear existing facts to ensure a clean state for registration
+    pyDatalog.clear()
+
+    people = tables["people"]
+    for name, gender in zip(people["name"].tolist(), people["gender"].tolist()):
+        if gender == "Male":
+            pyDatalog.assert_fact('is_male', name)
+        elif gender == "Female":
+            pyDatalog.assert_fact('is_female', name)
+
+    parentage = tables["parentage"]
+    for parent_name, child_name, role in zip(parentage["parent"].tolist(), parentage["child"].tolist(),
+                                             parentage["role"].tolist()):
+        pyDatalog.assert_fact(role, parent_name, child_name)
+
+    # Spouse facts in both orientations, once per marriage
+    marriages = tables["marriages"]
+    unique_marriages = sorted({tuple(sorted((a, b))) for a, b in zip(marriages["a"].tolist(), marriages["b"].tolist())
+                               if a != b})
+    for a, b in unique_marriages:
+        pyDatalog.assert_fact('spouse', a, b)
+        pyDatalog.assert_fact('spouse', b, a)
+
+    adoptions = tables["adoptions"]
+    for parent_name, child_name, role in zip(adoptions["parent"].tolist(), adoptions["child"].tolist(),
+                                             adoptions["role"].tolist()):
+        pyDatalog.assert_fact(f'adoptive_{role}', parent_name, child_name)
+    setattr(pyDatalog.Logic(True), LOADED_TABLES_ATTRIBUTE, tables)
+
+    return {
+        "num_fathers": int(np.count_nonzero(parentage["role"] == "father")),
+        "num_mothers": int(np.count_nonzero(parentage["role"] == "mother")),
+        "num_spouses": len(unique_marriages),
+        "num_males": int(np.count_nonzero(people["gender"] == "Male")),
+        "num_females": int(np.count_nonzero(people["gender"] == "Female")),
+        "num_adoptions": len(adoptions["child"]),
+        "num_issues": num_issues,
+    }
+
+def load_tables_into_pydatalog(path: str, on_invalid: str = "report") -> Tables:
+    """
+    Convenience function to load tables from a .npz file (or .parquet directory),
+    validate and register them in PyDatalog, print a summary, and return the registered tables.
+    """
+    summary = register_tables(load_tables(path), on_invalid)
+    tables = getattr(pyDatalog.Logic(True), LOADED_TABLES_ATTRIBUTE)
+
+    print("\n--- PyDatalog Facts Registration Summary ---")
+    print(f"Number of males registered: {summary['num_males']}")
+    print(f"Number of females registered: {summary['num_females']}")
+    print(f"Number of father facts registered: {summary['num_fathers']}")
+    print(f"Number of mother facts registered: {summary['num_mothers']}")
+    print(f"Number of spouse facts registered (symmetric): {summary['num_spouses']}")
+    print(f"Number of adoption facts registered: {summary['num_adoptions']}")
+    print(f"Number of validation issues in registered tables: {summary['num_issues']}")
+    print("------------------------------------------")
+
+    return tables
+
+if __name__ == "__main__":
+    from src.facts import load_facts_dataframe, CSV_FILEPATH
+
+    npz_path = os.path.splitext(CSV_FILEPATH)[0] + ".npz"
+    print(f"Converting {CSV_FILEPATH} to {npz_path}")
+    save_tables(tables_from_dataframe(load_facts_dataframe(CSV_FILEPATH)), npz_path)
+    load_tables_into_pydatalog(npz_path)
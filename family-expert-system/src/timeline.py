@@ -0,0 +1,192 @@
+"""
+Time-aware ("as of") evaluation of the step and in-law relations.
+
+The PyDatalog spouse facts carry no dates, so step_parent, step_sibling and the
+in-law rules treat every marriage as simultaneous. This module reads the optional
+start/end dates of the marriages and adoptions tables (see src.tables), indexes them
+in per-person interval trees, and answers the same rules against the family as it
+stood on a given date. Missing dates are treated as open-ended.
+
+current_timeline() indexes the currently loaded knowledge base: the tables it was
+registered from (with their dates), or, for facts loaded from a CSV file, the same
+family without dates.
+
+Example usage:
+    timeline = FamilyTimeline(load_tables("family-expert-system/data/family_facts.npz"))
+    timeline.relatives("step_parent", "David", as_of="1990-06-01")
+    timeline.spouses_at("Mary", "1990-06-01")
+    current_timeline().relatives("step_parent", "David", as_of="1990-06-01")
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+
+from pyDatalog import pyDatalog
+
+from src.facts import LOADED_FACTS_ATTRIBUTE
+from src.graph import FamilyGraph
+from src.intervals import IntervalTree
+from src.relations import PERSON_RELATIONS
+from src.tables import LOADED_TABLES_ATTRIBUTE, Tables, tables_from_dataframe
+from src.views import cached_on_logic
+
+DateLike = Union[date, str]
+
+# Relations that can be evaluated as of a date
+AS_OF_RELATIONS = (
+    'mother_in_law', 'father_in_law', 'brother_in_law', 'sister_in_law',
+    'son_in_law', 'daughter_in_law', 'sibling_in_law', 'niece_in_law', 'nephew_in_law',
+    'step_parent', 'step_child', 'step_sibling', 'step_grandparent', 'step_cousin',
+)
+
+def _to_date(value: DateLike) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def _interval(start: str, end: str) -> Tuple[date, date]:
+    """[start, end) from optional ISO strings; a missing bound is open."""
+    return (date.fromisoformat(start) if start else date.min,
+            date.fromisoformat(end) if end else date.max)
+
+def _person_trees(rows) -> Dict[str, IntervalTree]:
+    """Builds one interval tree per key from (key, start, end, payload) rows."""
+    grouped: Dict[str, list] = {}
+    for key, start, end, payload in rows:
+        grouped.setdefault(key, []).append((start, end, payload))
+    return {key: IntervalTree(intervals) for key, intervals in grouped.items()}
+
+class GraphSnapshot:
+    """
+    The family graph as of one date: same lookups as FamilyGraph, with spouses and
+    adoptive parents/children restricted to marriages and adoptions in force on that date.
+    """
+
+    def __init__(self, timeline: "FamilyTimeline", when: date):
+        self._timeline = timeline
+        self._graph = timeline.graph
+        self.when = when
+
+    def fathers(self, person: str) -> Tuple[str, ...]:
+        return self._graph.fathers(person)
+
+    def mothers(self, person: str) -> Tuple[str, ...]:
+        return self._graph.mothers(person)
+
+    def biological_parents(self, person: str) -> Tuple[str, ...]:
+        return self._graph.biological_parents(person)
+
+    def adoptive_parents(self, person: str) -> Tuple[str, ...]:
+        return self._timeline.adoptive_parents_at(person, self.when)
+
+    def parents(self, person: str) -> Tuple[str, ...]:
+        adoptive = self.adoptive_parents(person)
+        return tuple(sorted(set(self._graph.biological_parents(person)) | set(adoptive)))
+
+    def children(self, person: str) -> Tuple[str, ...]:
+        adopted = self._timeline.adoptive_children_at(person, self.when)
+        return tuple(sorted(set(self._graph.biological_children(person)) | set(adopted)))
+
+    def spouses(self, person: str) -> Tuple[str, ...]:
+        return self._timeline.spouses_at(person, self.when)
+
+    def is_male(self, person: str) -> bool:
+        return self._graph.is_male(person)
+
+    def is_female(self, person: str) -> bool:
+        return self._graph.is_female(person)
+
+class FamilyTimeline:
+    """
+    Interval index over dated marriages and adoptions, with as-of relation queries.
+    """
+
+    def __init__(self, tables: Tables):
+        self.graph = FamilyGraph.from_tables(tables)
+
+        marriages = tables["marriages"]
+        marriage_rows = []
+        for a, b, start, end in zip(marriages["a"].tolist(), marriages["b"].tolist(),
+                                    marriages["start"].tolist(), marriages["end"].tolist()):
+            if a == b:
+                continue
+            lo, hi = _interval(start, end)
+            marriage_rows.append((a, lo, hi, b))
+            marriage_rows.append((b, lo, hi, a))
+        self._spouses = _person_trees(marriage_rows)
+        # Start dates per person, for counting marriages entered so far
+        self._marriage_starts: Dict[str, List[Tuple[date, str]]] = {}
+        for person, lo, _, other in marriage_rows:
+            self._marriage_starts.setdefault(person, []).append((lo, other))
+
+        adoptions = tables["adoptions"]
+        adoption_rows = [(parent, child) + _interval(start, end) for parent, child, start, end in zip(
+            adoptions["parent"].tolist(), adoptions["child"].tolist(),
+            adoptions["start"].tolist(), adoptions["end"].tolist())]
+        self._adoptive_parents = _person_trees((c, lo, hi, p) for p, c, lo, hi in adoption_rows)
+        self._adoptive_children = _person_trees((p, lo, hi, c) for p, c, lo, hi in adoption_rows)
+
+    def spouses_at(self, person: str, when: DateLike) -> Tuple[str, ...]:
+        """Spouses of person whose marriage was in force on the given date."""
+        tree = self._spouses.get(person)
+        return tuple(sorted(set(tree.at(_to_date(when))))) if tree else ()
+
+    def adoptive_parents_at(self, child: str, when: DateLike) -> Tuple[str, ...]:
+        tree = self._adoptive_parents.get(child)
+        return tuple(sorted(set(tree.at(_to_date(when))))) if tree else ()
+
+    def adoptive_children_at(self, parent: str, when: DateLike) -> Tuple[str, ...]:
+        tree = self._adoptive_children.get(parent)
+        return tuple(sorted(set(tree.at(_to_date(when))))) if tree else ()
+
+    def snapshot(self, when: DateLike) -> GraphSnapshot:
+        """A FamilyGraph-like view of the family on the given date."""
+        return GraphSnapshot(self, _to_date(when))
+
+    def relatives(self, relation: str, person: str, as_of: Optional[DateLike] = None) -> List[str]:
+        """
+        Sorted X such that relation(X, person) holds on the as_of date.
+        Without a date, every marriage and adoption counts, as in the PyDatalog rules.
+
+        Raises:
+            ValueError: If the relation is not one of AS_OF_RELATIONS.
+        """
+        if relation not in AS_OF_RELATIONS:
+            raise ValueError(f"Relation '{relation}' does not support as_of; expected one of {AS_OF_RELATIONS}")
+        graph = self.graph if as_of is None else self.snapshot(as_of)
+        return sorted(PERSON_RELATIONS[relation](graph, person))
+
+    def multiple_marriages(self, person: str, as_of: Optional[DateLike] = None) -> bool:
+        """
+        True if person has married two or more different people, counting only marriages
+        that had started by the as_of date (divorced spouses still count).
+        """
+        starts = self._marriage_starts.get(person, [])
+        if as_of is not None:
+            when = _to_date(as_of)
+            starts = [(lo, other) for lo, other in starts if lo <= when]
+        return len({other for _, other in starts}) > 1
+
+def _loaded_timeline() -> FamilyTimeline:
+    logic = pyDatalog.Logic(True)
+    tables = getattr(logic, LOADED_TABLES_ATTRIBUTE, None)
+    if tables is None:
+        df = getattr(logic, LOADED_FACTS_ATTRIBUTE, None)
+        if df is None:
+            raise ValueError("as_of queries need facts loaded from a CSV file or a tables file")
+        tables = tables_from_dataframe(df)
+    return FamilyTimeline(tables)
+
+def current_timeline() -> FamilyTimeline:
+    """
+    FamilyTimeline of the currently loaded knowledge base, built on first use.
+
+    Raises:
+        ValueError: If the facts were not loaded from a CSV file or tables (e.g. asserted by hand).
+    """
+    return cached_on_logic('timeline', _loaded_timeline)
@@ -0,0 +1,298 @@
+"""
+Linear-time validation of the family facts before they reach PyDatalog.
+
+The recursive rules (ancestor, descendant, cousin, ...) assume the parent links form
+a DAG of consistent records. This module checks a cleaned facts DataFrame for:
+    duplicate_name:      the same Name on several rows
+    invalid_gender:      a Gender other than Male/Female (an empty Gender means unknown)
+    self_reference:      a person listed as their own father, mother, spouse or adoptee
+    gender_inconsistent: a Father (or adoptive father) whose known gender is not Male, or a
+                         Mother (or adoptive mother) whose known gender is not Female
+    dangling_reference:  a Father, Mother, Spouses entry or adoptee without a person row
+    cycle:               parent links (biological or adoptive) that loop through several people,
+                         found with Tarjan's strongly connected components
+
+Reference checks are vectorized over the DataFrame, and the cycle check visits every
+parent edge once, so validation stays linear in the number of records.
+quarantine_facts removes the offending references (not the whole rows) so the rest
+of the family can still be loaded. validate_tables and quarantine_tables do the same for
+the normalized tables of src.tables.
+
+Example usage:
+    df = load_facts_dataframe(CSV_FILEPATH)
+    report = validate_facts(df)
+    print(report.issues[["name", "kind", "column", "value"]])
+    clean_df = quarantine_facts(df, report)
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+ISSUE_KINDS = ("duplicate_name", "invalid_gender", "self_reference", "gender_inconsistent",
+               "dangling_reference", "cycle")
+
+_ADOPTION_PATTERN = r"Adoptive (mother|father) of (.+)"
+_ISSUE_COLUMNS = ["row", "name", "kind", "column", "value", "detail"]
+
+class ValidationReport:
+    """
+    Issues found by validate_facts, one row per offending reference.
+
+    Attributes:
+        issues: DataFrame with columns row (DataFrame index), name, kind, column, value, detail.
+    """
+
+    def __init__(self, issues: pd.DataFrame):
+        self.issues = issues.sort_values(["row", "kind", "column", "value"], kind="stable").reset_index(drop=True)
+
+    @property
+    def ok(self) -> bool:
+        """True if no issue was found."""
+        return self.issues.empty
+
+    def counts(self) -> Dict[str, int]:
+        """Number of issues of each kind (every kind is present, possibly with 0)."""
+        found = self.issues["kind"].value_counts()
+        return {kind: int(found.get(kind, 0)) for kind in ISSUE_KINDS}
+
+    def of_kind(self, kind: str) -> pd.DataFrame:
+        return self.issues[self.issues["kind"] == kind]
+
+    def __repr__(self) -> str:
+        found = {kind: n for kind, n in self.counts().items() if n}
+        return f"ValidationReport({found or 'ok'})"
+
+def _references(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every name reference of the DataFrame as one long table with columns row, name,
+    column ("Father", "Mother", "Spouses" or "Notes"), value, and the gender the role requires.
+    """
+    parts = []
+    for column, required in (("Father", "Male"), ("Mother", "Female")):
+        parts.append(pd.DataFrame({"row": df.index, "name": df["Name"], "column": column,
+                                   "value": df[column], "required": required}))
+
+    spouses = df["Spouses"].fillna("").str.split(";").explode().str.strip()
+    parts.append(pd.DataFrame({"row": spouses.index, "name": df.loc[spouses.index, "Name"].to_numpy(),
+                               "column": "Spouses", "value": spouses.to_numpy(), "required": ""}))
+
+    adoptions = df["Notes"].fillna("").astype(str).str.extract(_ADOPTION_PATTERN).dropna()
+    parts.append(pd.DataFrame({"row": adoptions.index, "name": df.loc[adoptions.index, "Name"].to_numpy(),
+                               "column": "Notes", "value": adoptions[1].str.strip().to_numpy(),
+                               "required": adoptions[0].map({"father": "Male", "mother": "Female"}).to_numpy()}))
+
+    references = pd.concat(parts, ignore_index=True)
+    return references[references["value"].fillna("") != ""].reset_index(drop=True)
+
+def _strongly_connected_components(edges: List[Tuple[str, str]]) -> List[List[str]]:
+    """Tarjan's algorithm, iterative so that long lineages do not hit the recursion limit."""
+    successors: Dict[str, List[str]] = {}
+    for a, b in edges:
+        successors.setdefault(a, []).append(b)
+        successors.setdefault(b, [])
+
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    for root in successors:
+        if root in index:
+            continue
+        work = [(root, iter(successors[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors[child])))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+def validate_facts(df: pd.DataFrame) -> ValidationReport:
+    """
+    Checks a cleaned facts DataFrame (see load_facts_dataframe) for inconsistent records.
+
+    Args:
+        df: A pandas DataFrame with the columns Name, Gender, Father, Mother, Spouses, Notes.
+
+    Returns:
+        A ValidationReport listing every offending reference.
+    """
+    people = pd.DataFrame({"row": df.index, "name": df["Name"], "value": df["Name"],
+                           "gender": df["Gender"].fillna("")})
+    return _validate(people, _references(df))
+
+def _table_references(tables: Dict[str, Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """
+    The parentage, marriages and adoptions tables (see src.tables) as the long reference
+    table of _references: each fact is attributed to the person whose CSV row would hold it.
+    """
+    rows = pd.Series(np.arange(len(tables["people"]["name"])), index=tables["people"]["name"])
+    rows = rows[~rows.index.duplicated()]
+    required = {"father": "Male", "mother": "Female"}
+
+    def part(names, column, values, required_genders) -> pd.DataFrame:
+        names = pd.Series(names, dtype=str)
+        return pd.DataFrame({"row": names.map(rows).fillna(-1).astype(int), "name": names, "column": column,
+                             "value": pd.Series(values, dtype=str), "required": required_genders})
+
+    parentage, marriages, adoptions = tables["parentage"], tables["marriages"], tables["adoptions"]
+    # A marriage is listed once; attribute it to a partner with a people row, as the CSV does
+    swap = ~np.isin(marriages["a"], rows.index) & np.isin(marriages["b"], rows.index)
+    references = pd.concat([
+        part(parentage["child"], pd.Series(parentage["role"], dtype=str).str.capitalize(), parentage["parent"],
+             pd.Series(parentage["role"], dtype=str).map(required).fillna("")),
+        part(np.where(swap, marriages["b"], marriages["a"]), "Spouses",
+             np.where(swap, marriages["a"], marriages["b"]), ""),
+        part(adoptions["parent"], "Notes", adoptions["child"],
+             pd.Series(adoptions["role"], dtype=str).map(required).fillna("")),
+    ], ignore_index=True)
+    return references[references["value"] != ""].reset_index(drop=True)
+
+def validate_tables(tables: Dict[str, Dict[str, np.ndarray]]) -> ValidationReport:
+    """
+    Checks normalized tables (see src.tables) for the same issues as validate_facts.
+    A fact whose own person (the child of a parentage row, the adopter, or both partners of
+    a marriage) has no people row is reported as a dangling_reference with row -1.
+    """
+    people = pd.DataFrame({"row": np.arange(len(tables["people"]["name"])),
+                           "name": pd.Series(tables["people"]["name"], dtype=str)})
+    people["value"] = people["name"]
+    people["gender"] = pd.Series(tables["people"]["gender"], dtype=str)
+    return _validate(people, _table_references(tables))
+
+def _validate(people: pd.DataFrame, references: pd.DataFrame) -> ValidationReport:
+    """Runs every check on the people (row, name, value, gender) and references of a family."""
+    found = []
+
+    def add(frame: pd.DataFrame, kind: str, detail) -> None:
+        if not frame.empty:
+            found.append(pd.DataFrame({"row": frame["row"].to_numpy(), "name": frame["name"].to_numpy(),
+                                       "kind": kind, "column": frame["column"].to_numpy(),
+                                       "value": frame["value"].to_numpy(), "detail": detail}))
+
+    add(people[people["name"].duplicated(keep=False)].assign(column="Name"), "duplicate_name",
+        "name appears on several rows")
+    gender = people["gender"]
+    invalid = ~gender.isin(["Male", "Female", ""])
+    add(people[invalid].assign(column="Gender", value=gender[invalid]),
+        "invalid_gender", "gender must be Male or Female")
+
+    add(references[references["value"] == references["name"]], "self_reference",
+        "record refers to itself")
+
+    others = references[references["value"] != references["name"]]
+    genders = people.drop_duplicates("name").set_index("name")["gender"]
+    known = others["value"].isin(people["name"])
+    add(others[~known], "dangling_reference", "no person row with this name")
+    owner_known = others["name"].isin(people["name"])
+    add(others[known & ~owner_known], "dangling_reference", "no person row for the record's own person")
+    # The parent is the referenced person for Father/Mother, and the row's own person for adoptions
+    parent_gender = others["value"].map(genders).where(others["column"] != "Notes", others["name"].map(genders))
+    parent_gender = parent_gender.fillna("")
+    # An empty Gender is unknown: only a known gender can contradict the parent role
+    wrong_gender = (known | (others["column"] == "Notes")) & (others["required"] != "") \
+        & (parent_gender != "") & (parent_gender != others["required"])
+    add(others[wrong_gender], "gender_inconsistent",
+        others.loc[wrong_gender, "required"].radd("parent should be ").to_numpy())
+
+    # Cycles through two or more people; self-parenting is reported as self_reference above
+    parent_links = others[others["column"] != "Spouses"]
+    # (parent, child) edges: the row is the child for Father/Mother and the parent for adoptions
+    adoption = parent_links["column"] == "Notes"
+    edges = list(zip(parent_links["value"].where(~adoption, parent_links["name"]),
+                     parent_links["name"].where(~adoption, parent_links["value"])))
+    cyclic = {}
+    for component in _strongly_connected_components(edges):
+        if len(component) > 1:
+            members = ", ".join(component)
+            cyclic.update((member, members) for member in component)
+    if cyclic:
+        in_cycle = [cyclic.get(p) is not None and cyclic.get(p) == cyclic.get(c) for p, c in edges]
+        cycle_links = parent_links[in_cycle]
+        add(cycle_links, "cycle", cycle_links["name"].map(cyclic).radd("parent links loop through ").to_numpy())
+
+    issues = pd.concat(found, ignore_index=True) if found else pd.DataFrame(columns=_ISSUE_COLUMNS)
+    return ValidationReport(issues)
+
+def quarantine_facts(df: pd.DataFrame, report: ValidationReport) -> pd.DataFrame:
+    """
+    Returns a copy of df with the offending references removed: parent, spouse and
+    adoption references flagged by the report are blanked, invalid genders are cleared
+    (left unknown, so the person gets no gender fact), and later rows repeating a Name
+    are dropped. The result passes validate_facts.
+    """
+    cleaned = df.copy()
+    issues = report.issues
+    for column in ("Father", "Mother", "Gender", "Notes"):
+        rows = issues.loc[(issues["column"] == column) & (issues["kind"] != "duplicate_name"), "row"]
+        cleaned.loc[cleaned.index.isin(rows), column] = ""
+
+    bad_spouses = issues[issues["column"] == "Spouses"]
+    for row, values in bad_spouses.groupby("row")["value"]:
+        drop = set(values)
+        kept = [s for s in cleaned.at[row, "Spouses"].split(";") if s.strip() not in drop]
+        cleaned.at[row, "Spouses"] = ";".join(kept)
+
+    return cleaned[~cleaned["Name"].duplicated(keep="first")]
+
+def quarantine_tables(tables: Dict[str, Dict[str, np.ndarray]],
+                      report: ValidationReport) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Returns a copy of the tables without the offending facts, like quarantine_facts:
+    flagged parentage, marriage and adoption rows are dropped, invalid genders are cleared,
+    and later people rows repeating a name are dropped. The result passes validate_tables.
+    """
+    issues = report.issues
+    flagged = set(zip(issues["name"], issues["column"], issues["value"]))
+
+    def kept(names, columns, values) -> np.ndarray:
+        return np.array([(n, c, v) not in flagged for n, c, v in zip(names, columns, values)], dtype=bool)
+
+    people = {col: values.copy() for col, values in tables["people"].items()}
+    invalid = issues.loc[issues["kind"] == "invalid_gender", "row"].to_numpy(dtype=int)
+    people["gender"][invalid] = ""
+    first = ~pd.Series(people["name"]).duplicated(keep="first").to_numpy()
+
+    parentage, marriages, adoptions = tables["parentage"], tables["marriages"], tables["adoptions"]
+    masks = {
+        "people": first,
+        "parentage": kept(parentage["child"], np.char.capitalize(parentage["role"].astype(str)),
+                          parentage["parent"]),
+        "marriages": kept(marriages["a"], ["Spouses"] * len(marriages["a"]), marriages["b"])
+                     & kept(marriages["b"], ["Spouses"] * len(marriages["b"]), marriages["a"]),
+        "adoptions": kept(adoptions["parent"], ["Notes"] * len(adoptions["parent"]), adoptions["child"]),
+    }
+    source = dict(tables, people=people)
+    return {table: {col: values[masks[table]] for col, values in source[table].items()} for table in masks}
@@ -0,0 +1,169 @@
+"""
+Materialized views of commonly used relations.
+
+Each view is built with a single pyDatalog query once facts and rules are loaded.
+The answers are deduplicated and sorted at build time and indexed by both arguments,
+so lookups return ordered results without building sets or sorting per call.
+
+Example usage:
+    views = get_views()
+    views['sibling'].firsts('Alice')      # ('Grace', 'Henry', ...)
+    views['son'].pairs                    # (('Adam', 'Emily'), ...)
+    views['sibling'].canonical_pairs      # unordered sibling pairs, each once
+"""
+import sys
+import os
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from pyDatalog import pyDatalog
+from src.metrics import ask
+
+T = TypeVar("T")
+
+# Relations materialized by default
+DEFAULT_VIEWS = (
+    'son', 'daughter',
+    'sibling', 'full_sibling', 'half_sibling',
+    'mother_in_law', 'father_in_law', 'brother_in_law', 'sister_in_law',
+    'son_in_law', 'daughter_in_law', 'sibling_in_law', 'niece_in_law', 'nephew_in_law',
+    'step_parent', 'step_child', 'step_sibling', 'step_grandparent', 'step_cousin',
+)
+
+# Relations where rel(X, Y) holds exactly when rel(Y, X) holds
+SYMMETRIC_RELATIONS = frozenset({'spouse', 'sibling', 'full_sibling', 'half_sibling', 'step_sibling'})
+
+class RelationView:
+    """
+    A deduplicated, sorted snapshot of a binary relation rel(X, Y), indexed by both arguments.
+
+    Symmetric relations are stored once per unordered pair, as canonical (smaller, larger)
+    pairs plus one neighbour index that serves lookups by either argument; both
+    orientations are only expanded when iterated. (This applies to the view only: pyDatalog
+    holds both orientations, as spouse facts and as derived sibling rows.)
+    """
+
+    def __init__(self, name: str, pairs: Iterable[Tuple[str, str]]):
+        self.name = name
+        self.symmetric = name in SYMMETRIC_RELATIONS
+
+        if self.symmetric:
+            # Each unordered pair once as (smaller, larger); X == Y is dropped
+            self.canonical_pairs: Tuple[Tuple[str, str], ...] = tuple(sorted({
+                (x, y) if x < y else (y, x) for x, y in pairs if x != y}))
+            neighbours: Dict[str, list] = {}
+            for x, y in self.canonical_pairs:
+                neighbours.setdefault(x, []).append(y)
+                neighbours.setdefault(y, []).append(x)
+            self._by_first = self._by_second = {k: tuple(sorted(v)) for k, v in neighbours.items()}
+        else:
+            self.canonical_pairs = tuple(sorted(set(pairs)))
+            by_first: Dict[str, list] = {}
+            by_second: Dict[str, list] = {}
+            # pairs are sorted, so every index list is built already in order
+            for x, y in self.canonical_pairs:
+                by_first.setdefault(x, []).append(y)
+            for x, y in sorted(self.canonical_pairs, key=lambda p: (p[1], p[0])):
+                by_second.setdefault(y, []).append(x)
+            self._by_first = {k: tuple(v) for k, v in by_first.items()}
+            self._by_second = {k: tuple(v) for k, v in by_second.items()}
+        self._firsts_sorted: Tuple[str, ...] = tuple(sorted(self._by_first))
+
+    @property
+    def pairs(self) -> Tuple[Tuple[str, str], ...]:
+        """Every (X, Y) pair, sorted (expanded to both orientations for symmetric relations)."""
+        return tuple(self.iter_pairs()) if self.symmetric else self.canonical_pairs
+
+    def iter_pairs(self, after: Optional[Tuple[str, str]] = None) -> Iterator[Tuple[str, str]]:
+        """Yields the sorted (X, Y) pairs, starting strictly after the given pair if any."""
+        start = bisect_left(self._firsts_sorted, after[0]) if after is not None else 0
+        for x in self._firsts_sorted[start:]:
+            seconds = self._by_first[x]
+            skip = bisect_right(seconds, after[1]) if after is not None and x == after[0] else 0
+            for y in seconds[skip:]:
+                yield (x, y)
+
+    def firsts(self, y: str) -> Tuple[str, ...]:
+        """Sorted X such that rel(X, y)."""
+        return self._by_second.get(y, ())
+
+    def seconds(self, x: str) -> Tuple[str, ...]:
+        """Sorted Y such that rel(x, Y)."""
+        return self._by_first.get(x, ())
+
+    def __contains__(self, pair: Tuple[str, str]) -> bool:
+        seconds = self._by_first.get(pair[0], ())
+        i = bisect_left(seconds, pair[1])
+        return i < len(seconds) and seconds[i] == pair[1]
+
+    def __len__(self) -> int:
+        """Number of (X, Y) pairs, counting both orientations of symmetric relations."""
+        return len(self.canonical_pairs) * (2 if self.symmetric else 1)
+
+    def __repr__(self) -> str:
+        return f"RelationView({self.name!r}, {len(self)} pairs)"
+
+def build_view(relation: str) -> RelationView:
+    """
+    Materializes relation(X, Y) from the currently loaded PyDatalog knowledge base.
+    The step relations are read from the household index (src.households) and the
+    recursive ones from the closure table (src.closures) instead of evaluating their rules.
+    """
+    # Imported here: both build on src.graph, which caches itself through this module
+    from src.closures import CLOSURE_RELATIONS, current_closures
+    from src.households import HOUSEHOLD_RELATIONS, current_households
+    if relation in HOUSEHOLD_RELATIONS:
+        return RelationView(relation, current_households().relation_pairs(relation))
+    if relation in CLOSURE_RELATIONS:
+        return RelationView(relation, current_closures().relation_pairs(relation))
+    answer = ask(f'{relation}(X, Y)')
+    return RelationView(relation, ((str(r[0]), str(r[1])) for r in answer.answers) if answer else ())
+
+def materialize_views(relations: Iterable[str] = DEFAULT_VIEWS) -> Dict[str, RelationView]:
+    """
+    Builds views for the given relations. Assumes facts and rules are already loaded.
+
+    Returns:
+        A dictionary mapping relation names to their views.
+    """
+    return {relation: build_view(relation) for relation in relations}
+
+# Prefix of the attributes under which derived structures are cached on the pyDatalog logic
+_CACHE_PREFIX = '_family_'
+
+def cached_on_logic(key: str, build: Callable[[], T]) -> T:
+    """
+    Returns the structure cached under key on the current pyDatalog logic, building it on first use.
+    pyDatalog.clear() replaces the logic, so cached structures are discarded together with
+    the facts they were built from.
+    """
+    logic = pyDatalog.Logic(True)
+    attribute = _CACHE_PREFIX + key
+    value = getattr(logic, attribute, None)
+    if value is None:
+        value = build()
+        setattr(logic, attribute, value)
+    return value
+
+def peek_cached(key: str) -> Optional[object]:
+    """Returns the structure cached under key on the current pyDatalog logic, or None if it was not built."""
+    return getattr(pyDatalog.Logic(True), _CACHE_PREFIX + key, None)
+
+def get_views() -> Dict[str, RelationView]:
+    """Returns the default views of the currently loaded knowledge base, building them on first use."""
+    return cached_on_logic('views', materialize_views)
+
+def invalidate_views() -> None:
+    """
+    Drops the cached views (and every other structure cached on the logic, such as the
+    family graph), e.g. after asserting or retracting facts in place.
+    """
+    logic = pyDatalog.Logic(True)
+    for attribute in [a for a in vars(logic) if a.startswith(_CACHE_PREFIX)]:
+        delattr(logic, attribute)
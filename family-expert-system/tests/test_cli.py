@@ -0,0 +1,70 @@
+import sys
+import os
+import io
+import json
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.cli import run_batch, main
+from src.queries import kb_session
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_run_batch_streams_one_result_per_line():
+    lines = [
+        json.dumps({"id": 1, "relation": "child", "args": [None, "John"]}),
+        "",
+        json.dumps({"id": 2, "relation": "aunt", "args": ["Olivia", "Kevin"]}),
+        json.dumps({"id": 3, "helper": "is_cousin_within_n", "args": ["Sarah", "George", 2]}),
+        json.dumps({"id": 4, "ask": 'step_parent(X, "Sophia") & is_male(X)'}),
+        json.dumps({"id": 5, "relation": "no_such_relation", "args": ["A", "B"]}),
+        "not json",
+    ]
+    out = io.StringIO()
+    with kb_session(CSV_PATH):
+        assert run_batch(lines, out) == 6
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert results[0] == {**results[0], "id": 1, "ok": True, "results": ["David", "Diana", "Emma"]}
+    assert results[1]["results"] is True
+    assert results[2]["results"] is True
+    assert results[3]["ok"] and results[3]["results"] == []
+    assert not results[4]["ok"] and "Unknown relation" in results[4]["error"]
+    assert not results[5]["ok"] and results[5]["line"] == 7
+
+def test_helpers_reuse_the_loaded_kb():
+    with kb_session(CSV_PATH):
+        # Facts asserted in the session stay visible: the helper does not reload the CSV
+        pyDatalog.assert_fact('father', 'Adam', 'Baby')
+        out = io.StringIO()
+        run_batch([json.dumps({"helper": "is_direct_line_of_descent", "args": ["Baby", "Paul"]})], out)
+    assert json.loads(out.getvalue())["results"] is True
+
+def test_main_reads_file_and_writes_output(tmp_path):
+    query_file = tmp_path / "queries.jsonl"
+    query_file.write_text(json.dumps({"id": "a", "relation": "sibling", "args": [None, "Alice"]}) + "\n")
+    output_file = tmp_path / "results.jsonl"
+    assert main([str(query_file), "--csv", CSV_PATH, "-o", str(output_file)]) == 0
+    result = json.loads(output_file.read_text())
+    assert result["results"] == ["Grace", "Henry", "Isla", "Layla", "Noah", "Ryan", "Zoe"]
+
+def test_limits_stop_closure_relations():
+    lines = [json.dumps({"id": 1, "relation": "cousin", "args": [None, None], "limits": {"max_results": 5}}),
+             json.dumps({"id": 2, "relation": "ancestor", "args": [None, "Adam"], "limits": {"max_seconds": 0}}),
+             json.dumps({"id": 3, "relation": "cousin", "args": [None, "Noah"], "limits": {"max_results": 50}})]
+    out = io.StringIO()
+    with kb_session(CSV_PATH):
+        run_batch(lines, out)
+    first, second, third = [json.loads(line) for line in out.getvalue().splitlines()]
+    # The rows are checked as they are produced, so the query stops at the sixth one
+    assert not first["ok"] and "max_results" in first["error"] and first["stats"]["results"] == 6
+    assert not second["ok"] and "max_seconds" in second["error"]
+    assert third["ok"] and third["results"]
@@ -0,0 +1,83 @@
+import sys
+import os
+import io
+import json
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.cli import run_batch
+from src.closures import CLOSURE_RELATIONS, ClosureTable, current_closures
+from src.graph import FamilyGraph
+from src.oracle import datalog_rows, pedigree_session, random_pedigree
+from src.pagination import page_relation
+from src.queries import is_direct_line_of_descent, kb_session
+from src.relations import PERSON_RELATIONS
+from src.views import build_view
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _matches_relations(g, table):
+    for relation in CLOSURE_RELATIONS:
+        closure = table.relation(relation)
+        for y in g.names:
+            assert set(closure.firsts(y)) == PERSON_RELATIONS[relation](g, y), (relation, y)
+
+def test_closures_match_the_recursive_rules():
+    for seed in range(2):
+        with pedigree_session(random_pedigree(seed, num_people=18, deep_generations=3)):
+            for relation in CLOSURE_RELATIONS:
+                assert set(current_closures().relation_pairs(relation)) == datalog_rows(relation), relation
+                assert set(build_view(relation).pairs) == datalog_rows(relation), relation
+
+def test_cousin_table_reaches_the_fixpoint_through_parent_cycles():
+    # A and B are siblings; C, D their children; E, F grandchildren; F is also D's parent
+    genders = {name: "Male" for name in "PABCDEF"}
+    fathers = [("P", "A"), ("P", "B"), ("A", "C"), ("B", "D"), ("C", "E"), ("D", "F"), ("F", "D")]
+    g = FamilyGraph(genders, fathers, [], [], [], [])
+    assert g.topological_order()[1]
+    table = ClosureTable(g)
+    _matches_relations(g, table)
+    assert table.cousins("E") == ("F",)
+    for seed in range(3):
+        g = FamilyGraph.from_dataframe(random_pedigree(seed, num_people=40, deep_generations=5))
+        _matches_relations(g, ClosureTable(g))
+
+def test_relation_lookups_and_cursor():
+    with kb_session(CSV_PATH):
+        closures = current_closures()
+        ancestor = closures.relation("ancestor")
+        assert all((a, "Liam") in ancestor for a in closures.ancestors("Liam"))
+        assert ("Liam", "Liam") not in ancestor
+        assert closures.relation("descendant").seconds("Liam") == closures.ancestors("Liam")
+        pairs = list(ancestor.iter_pairs())
+        assert pairs == sorted(pairs)
+        assert list(ancestor.iter_pairs(after=pairs[9])) == pairs[10:]
+        with pytest.raises(ValueError):
+            closures.relation("sibling")
+
+def test_thousand_generation_chain():
+    df = random_pedigree(1, num_people=10, adoption_rate=0, deep_generations=1000)
+    first, last = df["Name"].iloc[10], df["Name"].iloc[-1]
+    with pedigree_session(df):
+        closures = current_closures()
+        assert len(closures.ancestors(last)) >= 1000
+        assert first in closures.ancestors(last) and last in closures.descendants(first)
+        assert is_direct_line_of_descent(last, first)
+        assert not is_direct_line_of_descent(first, last)
+        rows, cursor = page_relation("ancestor", [None, last], limit=50)
+        assert len(rows) == 50 and cursor == rows[-1]
+        out = io.StringIO()
+        run_batch([json.dumps({"id": 1, "relation": "cousin", "args": [None, last]}),
+                   json.dumps({"id": 2, "relation": "descendant", "args": [last, first]})], out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert results[0]["results"] == list(closures.cousins(last))
+        assert results[1]["results"] is True
@@ -0,0 +1,43 @@
+import sys
+import os
+import numpy as np
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.graph import FamilyGraph
+from src.cousins import cousin_matrix, cousin_relationship, iter_cousin_blocks, NOT_COUSINS
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+GRAPH = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH))
+
+def test_cousin_relationships_on_shipped_family():
+    assert cousin_relationship(GRAPH, "Sarah", "George") == (1, 0)   # first cousins
+    assert cousin_relationship(GRAPH, "Nora", "Kevin") == (1, 0)
+    assert cousin_relationship(GRAPH, "Nora", "Noah") == (1, 1)      # first cousins once removed
+    assert cousin_relationship(GRAPH, "Adam", "Zoe") == (2, 0)       # second cousins
+    assert cousin_relationship(GRAPH, "Isla", "Henry") is None       # half-siblings through Linda
+    assert cousin_relationship(GRAPH, "Paul", "Kevin") is None       # uncle and nephew
+    assert cousin_relationship(GRAPH, "Adam", "John") is None        # direct line
+    assert cousin_relationship(GRAPH, "Adam", "Hassan") is None      # unrelated by blood
+
+def test_matrix_is_symmetric_and_blocks_agree():
+    component = GRAPH.component_of("John")
+    names, degree, removal = cousin_matrix(GRAPH, component)
+    assert names == list(component)
+    assert (degree == degree.T).all() and (removal == removal.T).all()
+    assert (np.diag(degree) == NOT_COUSINS).all()
+
+    streamed = np.vstack([block for _, block, _ in iter_cousin_blocks(GRAPH, component, block_size=7)])
+    assert (streamed == degree).all()
+
+def test_components_partition_everyone():
+    components = GRAPH.components()
+    assert sorted(name for c in components for name in c) == list(GRAPH.names)
+    assert GRAPH.component_of("Hassan") == GRAPH.component_of("Paul")
+    assert GRAPH.component_of("Nobody") == ()
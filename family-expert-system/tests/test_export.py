@@ -0,0 +1,88 @@
+import sys
+import os
+import csv
+import gzip
+import json
+import pandas as pd
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.export import export_relations, plan_partitions
+from src.facts import load_facts_dataframe
+from src.graph import FamilyGraph
+from src.oracle import random_pedigree
+from src.queries import kb_session
+from src.rules import DERIVED_RELATIONS
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _all_rows(relation):
+    answer = pyDatalog.ask(f'{relation}(X, Y)')
+    return set((str(r[0]), str(r[1])) for r in answer.answers) if answer else set()
+
+def _two_families():
+    # Two unrelated random families: P000, P001, ... and Q000, Q001, ...
+    first = random_pedigree(1, num_people=15, deep_generations=3)
+    second = random_pedigree(2, num_people=15).apply(lambda column: column.str.replace("P", "Q"))
+    return pd.concat([first, second], ignore_index=True)
+
+def test_partitions_export_every_name_once():
+    graph = FamilyGraph.from_dataframe(_two_families())
+    partitions = plan_partitions(graph, 4)
+    assert len(partitions) == 4
+    assert sorted(name for _, names in partitions for name in names) == list(graph.names)
+    for members, names in partitions:
+        for component in graph.components():
+            if set(component) & set(names):
+                assert set(component) <= set(members)
+
+def test_single_component_is_split_into_name_ranges(tmp_path):
+    graph = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH))
+    assert len(graph.components()) == 1
+    partitions = plan_partitions(graph, 3)
+    assert [len(names) for _, names in partitions] == [14, 14, 13]
+    assert all(members == list(graph.names) for members, _ in partitions)
+
+    relations = ['sibling', 'cousin', 'multiple_marriages']
+    stats = export_relations(str(tmp_path), relations, fmt="csv", workers=3, source=CSV_PATH)
+    assert stats["_total"]["partitions"] == 3
+    with kb_session(CSV_PATH):
+        with gzip.open(tmp_path / "cousin.csv.gz", "rt", newline="") as handle:
+            rows = [tuple(row) for row in csv.reader(handle)][1:]
+        assert rows == sorted(rows) and set(rows) == _all_rows('cousin')
+
+def test_parallel_jsonl_export_matches_queries(tmp_path):
+    df = _two_families()
+    relations = ['sibling', 'half_sibling', 'cousin', 'step_parent', 'ancestor']
+    stats = export_relations(str(tmp_path), relations, fmt="jsonl", workers=2, source=df)
+    assert stats["_total"]["partitions"] == 2
+    df.to_csv(tmp_path / "family.csv", index=False)
+    with kb_session(str(tmp_path / "family.csv")):
+        for relation in relations:
+            with gzip.open(tmp_path / f"{relation}.jsonl.gz", "rt") as handle:
+                exported = [tuple(json.loads(line).values()) for line in handle]
+            assert len(exported) == stats[relation]["rows"]
+            assert set(exported) == _all_rows(relation)
+
+def test_csv_export_of_every_relation(tmp_path):
+    stats = export_relations(str(tmp_path), fmt="csv", compression=None, workers=1, source=CSV_PATH)
+    assert set(stats) == set(DERIVED_RELATIONS) | {"_total"}
+    with kb_session(CSV_PATH):
+        with open(tmp_path / "cousin.csv", newline="") as handle:
+            rows = list(csv.reader(handle))
+        assert rows[0] == ["x", "y"]
+        assert set(map(tuple, rows[1:])) == _all_rows('cousin')
+        with open(tmp_path / "multiple_marriages.csv", newline="") as handle:
+            assert next(csv.reader(handle)) == ["x"]
+    assert stats["cousin"]["rows_per_s"] > 0
+    with pytest.raises(ValueError):
+        export_relations(str(tmp_path), ['no_such_relation'])
@@ -0,0 +1,75 @@
+import sys
+import os
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.graph import FamilyGraph
+from src.generations import GenerationIndex
+from src.queries import ancestors_at, descendants_at, kb_session
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_topological_order_skips_self_parenting():
+    graph = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH))
+    order, ignored = graph.topological_order()
+    assert sorted(order) == list(graph.names)
+    assert ignored == [("Mark", "Mark")]
+    position = {name: i for i, name in enumerate(order)}
+    for parent, child in graph.parent_edges():
+        if (parent, child) not in ignored:
+            assert position[parent] < position[child]
+
+def test_cycles_are_broken_deterministically():
+    graph = FamilyGraph({"A": "Male", "B": "Male", "C": "Male"},
+                        [("A", "B"), ("B", "A"), ("B", "C")], [], [], [], [])
+    order, ignored = graph.topological_order()
+    assert order == ["A", "B", "C"]
+    assert ignored == [("B", "A")]
+    index = GenerationIndex(graph)
+    assert [index.generation(x) for x in order] == [0, 1, 2]
+
+def test_cycles_only_drop_edges_inside_the_cycle():
+    # B and C are each other's father; A hangs off the cycle as B's son
+    graph = FamilyGraph({"A": "Male", "B": "Male", "C": "Male"},
+                        [("B", "A"), ("B", "C"), ("C", "B")], [], [], [], [])
+    order, ignored = graph.topological_order()
+    assert order == ["B", "A", "C"]
+    assert ignored == [("C", "B")]
+    index = GenerationIndex(graph)
+    assert index.ancestors_at("A", 1) == ("B",)
+    assert index.generation("A") == 1
+    assert index.descendants_at("B", 1) == ("A", "C")
+
+def test_generation_levels_and_distances():
+    index = GenerationIndex(FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH)))
+    assert index.generation("John") == 0
+    assert index.generation("David") == 1
+    assert index.generation("Adam") == 4
+    assert index.descendants_at("John", 1) == ("David", "Diana", "Emma")
+    assert index.ancestors_at("Adam", 2) == ("Emma", "Paul")
+    assert index.ancestors_at("Adam", 0) == ("Adam",)
+    assert index.ancestors_at("Adam", 9) == ()
+    with pytest.raises(ValueError):
+        index.ancestors_at("Adam", -1)
+
+def test_distances_match_grandparent_rules():
+    with kb_session(CSV_PATH):
+        # (Isla is left out: her adoptive mother's father "Mark" is listed as his own father,
+        # an edge the rules follow but the generation index ignores.)
+        for person in ("George", "Sarah", "Noah", "Zoe", "Oliver"):
+            for k, rule in ((2, 'grandparent'), (3, 'great_grandparent')):
+                answer = pyDatalog.ask(f'{rule}(X, "{person}")')
+                expected = sorted(set(str(r[0]) for r in answer.answers)) if answer else []
+                assert ancestors_at(person, k) == expected
+        # Fourth-generation descendants of John: only reachable through chained joins before
+        assert "Adam" in descendants_at("John", 4)
@@ -0,0 +1,73 @@
+import sys
+import os
+import io
+import json
+import pytest
+from pyDatalog import pyDatalog, pyEngine
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.cli import run_batch
+from src.governor import (QueryLimitExceeded, governed_ask, query_limits, set_default_limits,
+                          get_default_limits)
+from src.queries import kb_session, limited_query
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_derived_limit_aborts_evaluation_with_stats():
+    with kb_session(CSV_PATH):
+        with pytest.raises(QueryLimitExceeded) as info:
+            governed_ask('cousin(X, Y)', max_derived=50)
+        assert info.value.limit == "max_derived"
+        assert info.value.stats["derived"] == 51
+        assert info.value.stats["query"] == 'cousin(X, Y)'
+        assert pyEngine.Logging is False
+        # The engine is still usable after an aborted query
+        assert limited_query('sibling(X, "Alice")', max_derived=10_000) == [
+            ("Grace",), ("Henry",), ("Isla",), ("Layla",), ("Noah",), ("Ryan",), ("Zoe",)]
+
+def test_time_and_result_limits():
+    with kb_session(CSV_PATH):
+        with pytest.raises(QueryLimitExceeded) as info:
+            governed_ask('step_cousin(X, Y)', max_seconds=0)
+        assert info.value.limit == "max_seconds"
+        with pytest.raises(QueryLimitExceeded) as info:
+            governed_ask('sibling(X, "Alice")', max_results=3)
+        assert info.value.limit == "max_results" and info.value.stats["results"] == 7
+        # A lookup without answers derives nothing, but the ask itself checks the clock
+        with pytest.raises(QueryLimitExceeded) as info:
+            governed_ask('father(X, "Nobody")', max_seconds=0)
+        assert info.value.limit == "max_seconds" and info.value.stats["derived"] == 0
+        with query_limits(max_derived=10_000) as stats:
+            pyDatalog.ask('child(X, "John")')
+        assert 0 < stats["derived"] <= 10_000
+
+def test_defaults_and_per_call_override():
+    saved = get_default_limits()
+    try:
+        set_default_limits(max_results=1)
+        with kb_session(CSV_PATH):
+            with pytest.raises(QueryLimitExceeded):
+                governed_ask('child(X, "John")')
+            assert len(governed_ask('child(X, "John")', max_results=None)) == 3
+        with pytest.raises(ValueError):
+            set_default_limits(max_memory=1)
+    finally:
+        set_default_limits(**saved)
+
+def test_cli_reports_limit_errors():
+    lines = [json.dumps({"id": 1, "relation": "step_cousin", "args": [None, None], "limits": {"max_derived": 20}}),
+             json.dumps({"id": 2, "relation": "child", "args": [None, "John"], "limits": {"max_results": 5}})]
+    out = io.StringIO()
+    with kb_session(CSV_PATH):
+        run_batch(lines, out)
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert not first["ok"] and "max_derived" in first["error"] and first["stats"]["derived"] == 21
+    assert second["ok"] and second["results"] == ["David", "Diana", "Emma"]
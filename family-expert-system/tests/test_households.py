@@ -0,0 +1,39 @@
+import sys
+import os
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.households import HOUSEHOLD_RELATIONS, current_households
+from src.oracle import datalog_rows, pedigree_session, random_pedigree
+from src.queries import kb_session
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_households_split_joint_and_own_children():
+    with kb_session(CSV_PATH):
+        index = current_households()
+        mary_peter = [h for h in index.households_of("Mary") if h.partner("Mary") == "Peter"][0]
+        assert mary_peter.joint == () and "David" in mary_peter.own_children("Mary")
+        assert index.step_parents("David") == ("Peter",)
+        assert "David" in index.step_children("Peter")
+        with pytest.raises(ValueError):
+            list(index.relation_pairs("sibling"))
+
+def test_household_relations_match_the_step_rules():
+    for seed in range(4):
+        df = random_pedigree(seed, num_people=30, remarriage_rate=0.35, deep_generations=2)
+        with pedigree_session(df):
+            index = current_households()
+            for relation in HOUSEHOLD_RELATIONS:
+                assert set(index.relation_pairs(relation)) == datalog_rows(relation), relation
+            assert set(get_views()['step_cousin'].pairs) == datalog_rows('step_cousin')
@@ -0,0 +1,98 @@
+import sys
+import os
+import threading
+import pandas as pd
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.instances import KBRegistry, current_instance
+from src.queries import is_aunt_or_uncle, kb_session, unrelated_individuals
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+# A second, unrelated family
+SMALL_FAMILY = pd.DataFrame([
+    {"Name": "Ann", "Gender": "Female", "Father": "", "Mother": "", "Spouses": "Bob", "Notes": ""},
+    {"Name": "Bob", "Gender": "Male", "Father": "", "Mother": "", "Spouses": "Ann", "Notes": ""},
+    {"Name": "Cid", "Gender": "Male", "Father": "Bob", "Mother": "Ann", "Spouses": "", "Notes": ""},
+    {"Name": "Dee", "Gender": "Female", "Father": "Bob", "Mother": "Ann", "Spouses": "", "Notes": ""},
+])
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_instances_are_isolated_from_each_other_and_from_clear():
+    registry = KBRegistry()
+    registry.load("shipped", CSV_PATH)
+    registry.load("small", SMALL_FAMILY)
+    pyDatalog.clear()  # wipes the current logic only
+    assert registry.get("small").ask('sibling(X, "Cid")') == [("Dee",)]
+    assert registry.get("shipped").ask('sibling(X, "Cid")') == []
+    assert ("Grace",) in registry.get("shipped").ask('sibling(X, "Alice")')
+    with pytest.raises(AttributeError):  # the current logic has no rules at all
+        pyDatalog.ask('sibling(X, Y)')
+    assert current_instance() is None
+
+def test_helpers_and_indexes_belong_to_the_active_instance():
+    registry = KBRegistry()
+    registry.load("small", SMALL_FAMILY)
+    with kb_session(CSV_PATH):
+        with registry.get("small").activate():
+            assert current_instance() == "small"
+            assert is_aunt_or_uncle("Olivia", "Kevin") == (False, "")
+            assert get_views()['sibling'].firsts("Cid") == ("Dee",)
+        # The caller's knowledge base is back in place
+        assert is_aunt_or_uncle("Olivia", "Kevin") == (True, "aunt")
+        assert "Grace" in get_views()['sibling'].firsts("Alice")
+
+def test_unrelated_individuals_per_instance():
+    loner = {"Name": "Eve", "Gender": "Female", "Father": "", "Mother": "", "Spouses": "", "Notes": ""}
+    registry = KBRegistry()
+    registry.load("shipped", CSV_PATH)
+    registry.load("small", pd.concat([SMALL_FAMILY, pd.DataFrame([loner])], ignore_index=True))
+    with registry.get("small").activate():
+        assert unrelated_individuals() == {"Eve"}
+    with registry.get("shipped").activate():
+        assert unrelated_individuals() == set()
+    with registry.get("small").activate():
+        assert unrelated_individuals() == {"Eve"}
+
+def test_memory_accounting_and_drop():
+    registry = KBRegistry()
+    registry.load("shipped", CSV_PATH)
+    registry.load("small", SMALL_FAMILY)
+    usage = registry.memory_usage()
+    assert 0 < usage["small"] < usage["shipped"]
+    registry.drop("shipped")
+    assert registry.names() == ["small"] and "shipped" not in registry
+    with pytest.raises(KeyError):
+        registry.get("shipped")
+
+def test_concurrent_queries_on_different_instances():
+    registry = KBRegistry()
+    registry.load("shipped", CSV_PATH)
+    registry.load("small", SMALL_FAMILY)
+    results, errors = {}, []
+
+    def worker(name, query):
+        try:
+            for _ in range(20):
+                results[name] = registry.get(name).ask(query)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=("small", 'child(X, "Ann")')),
+               threading.Thread(target=worker, args=("shipped", 'child(X, "John")'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert results == {"small": [("Cid",), ("Dee",)], "shipped": [("David",), ("Diana",), ("Emma",)]}
@@ -0,0 +1,81 @@
+import sys
+import os
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.graph import FamilyGraph
+from src.kinship import KinshipCalculator
+from src.queries import kb_session, kinship_coefficient, kinship_coefficients
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+@pytest.fixture(scope="module")
+def calculator():
+    return KinshipCalculator(FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH)))
+
+def test_standard_relationships(calculator):
+    assert calculator.coefficient("John", "John") == 0.5
+    assert calculator.coefficient("John", "David") == 0.25      # parent and child
+    assert calculator.coefficient("Paul", "Olivia") == 0.25     # full siblings
+    assert calculator.coefficient("Paul", "Emma") == 0.125      # nephew and aunt
+    assert calculator.coefficient("Oliver", "Paul") == 0        # step-siblings only
+    assert calculator.coefficient("Mark", "Mark") == 0.5        # self-parenting edge ignored
+    assert calculator.coefficient("Nobody", "Nobody") == 0.5
+    assert calculator.coefficient("Nobody", "John") == 0
+
+def test_consanguinity(calculator):
+    # Kevin and Linda are full siblings whose parents are themselves full siblings
+    assert calculator.coefficient("Kevin", "Linda") == 0.375
+    assert calculator.inbreeding("Isla") == 0.375
+    assert calculator.inbreeding("Kevin") == 0.25
+    assert calculator.inbreeding("John") == 0
+
+def test_adoption_is_not_followed():
+    graph = FamilyGraph({"A": "Male", "B": "Female"}, [], [], [("A", "B")], [], [])
+    assert KinshipCalculator(graph).coefficient("A", "B") == 0
+
+def test_parent_cycle_does_not_hide_the_father():
+    # B and C are each other's father; A and E are full siblings, children of B and M.
+    # Only C -> B is ignored, so B is a founder: phi(A, E) = (phi(B, B) + phi(M, M)) / 4 = 0.25
+    graph = FamilyGraph({"A": "Male", "B": "Male", "C": "Male", "E": "Female", "M": "Female"},
+                        [("B", "A"), ("B", "E"), ("B", "C"), ("C", "B")], [("M", "A"), ("M", "E")], [], [], [])
+    calculator = KinshipCalculator(graph)
+    assert calculator.coefficient("A", "E") == 0.25
+    assert calculator.coefficient("A", "B") == 0.25
+    assert calculator.coefficient("B", "C") == 0.25
+
+def test_bounded_cache_and_bulk():
+    graph = FamilyGraph.from_dataframe(load_facts_dataframe(CSV_PATH))
+    unbounded = KinshipCalculator(graph)
+    tiny = KinshipCalculator(graph, max_cache_size=5)
+    pairs = [(x, y) for x in graph.names for y in graph.names]
+    expected = [unbounded.coefficient(x, y) for x, y in pairs]
+    assert tiny.coefficients(pairs) == expected
+    assert tiny.cache_info()["size"] <= 5
+    assert unbounded.coefficient("Isla", "Isla") == 0.6875
+    assert unbounded.cache_info()["hits"] >= 1
+
+def test_deep_lineage_does_not_recurse():
+    chain = [f"p{i}" for i in range(5000)]
+    graph = FamilyGraph({name: "Male" for name in chain}, list(zip(chain, chain[1:])), [], [], [], [])
+    calculator = KinshipCalculator(graph)
+    # 0.5 ** 5000 underflows to 0.0, so check values that a float can still tell apart
+    assert calculator.coefficient(chain[3999], chain[-1]) == 0.5 ** 1001
+    assert calculator.coefficient(chain[4989], chain[-1]) == 0.5 ** 11
+    assert calculator.coefficient(chain[-1], chain[-1]) == 0.5
+
+def test_queries_helpers():
+    with kb_session(CSV_PATH):
+        # Siblings whose parents (James and Emily) are themselves related
+        assert kinship_coefficient("Sarah", "Adam") == 0.4375
+        assert kinship_coefficients([("Sarah", "Adam"), ("Paul", "Emma")]) == [0.4375, 0.125]
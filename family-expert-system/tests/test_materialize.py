@@ -0,0 +1,65 @@
+import sys
+import os
+import inspect
+import re
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.materialize import materialize_current_views, materialize_relations, plan_strata, relation_strata
+from src.oracle import datalog_rows, pedigree_session, random_pedigree
+from src.queries import kb_session
+from src.rules import DERIVED_RELATIONS, RELATION_ARITIES, RULE_DEPENDENCIES, define_family_rules
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_dependencies_match_the_rule_definitions():
+    found = {}
+    for line in inspect.getsource(define_family_rules).splitlines():
+        match = re.match(r"\s*(\w+)\(.*?\)\s*<=(.*)", line)
+        if match:
+            body = re.findall(r"(\w+)\(", match.group(2).split("#")[0])
+            found.setdefault(match.group(1), set()).update(r for r in body if r in RELATION_ARITIES)
+    assert set(found) == set(DERIVED_RELATIONS)
+    assert {r: set(d) for r, d in RULE_DEPENDENCIES.items()} == found
+
+def test_strata_order_every_relation_after_its_dependencies():
+    strata = relation_strata()
+    for relation, dependencies in RULE_DEPENDENCIES.items():
+        assert all(strata[d] < strata[relation] for d in dependencies if d != relation)
+    assert strata['parent'] == 1 and strata['sibling'] == 2
+    plan = plan_strata()
+    assert sorted(r for stratum in plan for r in stratum) == sorted(DERIVED_RELATIONS)
+    assert [len({strata[r] for r in stratum}) for stratum in plan] == [1] * len(plan)
+    with pytest.raises(ValueError):
+        plan_strata(['father'])
+
+def test_parallel_materialization_matches_pydatalog():
+    df = random_pedigree(3, num_people=25)
+    relations = ['sibling', 'half_sibling', 'ancestor', 'step_sibling', 'step_cousin', 'multiple_marriages']
+    timings = {}
+    rows = materialize_relations(relations, workers=2, source=df, timings=timings)
+    assert list(rows) == [r for stratum in plan_strata(relations) for r in stratum]
+    assert set(timings) == set(relations) | {"_total"}
+    with pedigree_session(df):
+        for relation in relations:
+            assert set(rows[relation]) == datalog_rows(relation)
+            assert list(rows[relation]) == sorted(rows[relation])
+
+def test_current_views_are_merged_into_the_cache():
+    with kb_session(CSV_PATH):
+        views = materialize_current_views(['cousin', 'sibling'], workers=1)
+        assert get_views()['cousin'] is views['cousin']
+        assert set(views['cousin'].pairs) == datalog_rows('cousin')
+        assert get_views()['son'].pairs
+        with pytest.raises(ValueError):
+            materialize_current_views(['multiple_marriages'])
@@ -0,0 +1,122 @@
+import sys
+import os
+import json
+import threading
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import metrics
+from src.metrics import LATENCY_BUCKETS, instrumented_helper, observe, snapshot, to_prometheus
+from src.queries import is_aunt_or_uncle, kb_session
+from src.rules import BASE_RELATIONS
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def _series(data, kind, metric, **labels):
+    return [s for s in data[kind].get(metric, []) if all(s["labels"].get(k) == v for k, v in labels.items())]
+
+def test_helper_asks_are_attributed_to_the_helper():
+    with kb_session(CSV_PATH):
+        metrics.reset()
+        is_aunt_or_uncle("Kevin", "Kevin")
+        data = snapshot()
+    asks = {s["labels"]["relation"]: s["value"] for s in _series(data, "counters", "family_asks_total",
+                                                                 helper="is_aunt_or_uncle")}
+    assert asks == {"aunt": 1, "uncle": 1}
+    [helper] = _series(data, "histograms", "family_helper_seconds", helper="is_aunt_or_uncle")
+    assert helper["count"] == 1 and helper["buckets"]["+Inf"] == 1
+    [per_call] = _series(data, "histograms", "family_helper_asks", helper="is_aunt_or_uncle")
+    assert per_call["sum"] == 2
+    assert sum(s["count"] for s in _series(data, "histograms", "family_ask_seconds")) == 2
+
+def test_nested_helpers_count_every_ask():
+    @instrumented_helper
+    def inner():
+        return metrics.ask('child(X, "John")')
+
+    @instrumented_helper
+    def outer():
+        inner()
+        return metrics.ask('aunt(X, "Kevin")')
+
+    with kb_session(CSV_PATH):
+        metrics.reset()
+        outer()
+        data = snapshot()
+    assert _series(data, "histograms", "family_helper_asks", helper="outer")[0]["sum"] == 2
+    assert _series(data, "histograms", "family_helper_asks", helper="inner")[0]["sum"] == 1
+    asks = {(s["labels"]["helper"], s["labels"]["relation"]): s["value"] for s in data["counters"]["family_asks_total"]}
+    assert asks == {("inner", "child"): 1, ("outer", "aunt"): 1}
+    # The size queries of the snapshot itself go through ask() too
+    sizes = _series(snapshot(include_kb=False), "counters", "family_asks_total", helper="", relation="father")
+    assert sizes[0]["value"] == 1
+
+def test_load_stages_and_kb_size():
+    with kb_session(CSV_PATH):
+        views = get_views()
+        data = snapshot()
+    stages = {s["labels"]["stage"] for s in data["histograms"]["family_load_seconds"]}
+    assert {"read_csv", "register_facts", "define_rules"} <= stages
+    facts = {s["labels"]["relation"]: s["value"] for s in data["gauges"]["family_facts"]}
+    assert set(facts) == set(BASE_RELATIONS)
+    assert facts["is_male"] > 0 and facts["father"] > 0
+    derived = {s["labels"]["relation"]: s["value"] for s in data["gauges"]["family_derived_tuples"]}
+    assert derived == {name: len(view) for name, view in views.items()}
+    json.loads(json.dumps(data))
+
+def test_helper_errors_are_counted():
+    @instrumented_helper
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        failing()
+    assert _series(snapshot(include_kb=False), "counters", "family_helper_errors_total",
+                   helper="failing")[0]["value"] == 1
+
+def test_histogram_buckets_are_cumulative():
+    for value in (0.0001, 0.003, 0.003, 100.0):
+        observe("family_ask_seconds", value, relation="parent")
+    [series] = snapshot(include_kb=False)["histograms"]["family_ask_seconds"]
+    buckets = series["buckets"]
+    assert list(buckets) == [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+    assert buckets["0.0005"] == 1 and buckets["0.005"] == 3 and buckets["30.0"] == 3 and buckets["+Inf"] == 4
+    assert series["count"] == 4 and series["sum"] == pytest.approx(100.0061)
+
+def test_prometheus_exposition():
+    observe("family_ask_seconds", 0.002, relation="parent")
+    metrics.increment("family_asks_total", helper="", relation='we"ird')
+    text = to_prometheus(include_kb=False)
+    assert "# TYPE family_ask_seconds histogram" in text
+    assert 'family_ask_seconds_bucket{relation="parent",le="0.0025"} 1' in text
+    assert 'family_ask_seconds_bucket{relation="parent",le="+Inf"} 1' in text
+    assert 'family_ask_seconds_count{relation="parent"} 1' in text
+    assert 'family_asks_total{helper="",relation="we\\"ird"} 1' in text
+
+def test_recording_is_thread_safe():
+    def record():
+        for _ in range(2000):
+            metrics.increment("family_asks_total", helper="", relation="parent")
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert snapshot(include_kb=False)["counters"]["family_asks_total"][0]["value"] == 16000
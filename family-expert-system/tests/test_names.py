@@ -0,0 +1,60 @@
+import sys
+import os
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import src.names
+from src.names import NameIndex, fold
+from src.queries import find_person, kb_session
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_folding_ignores_case_accents_and_spacing():
+    assert fold("  Zoë   Ségolène ") == "zoe segolene"
+    index = NameIndex(["José Ramírez", "Jose Ramos", "Anna"])
+    assert index.find("jose  ramirez")["match"] == "José Ramírez"
+    assert index.find("ANNA")["candidates"] == [("Anna", 1.0)]
+
+def test_find_person_resolves_typos_in_the_loaded_family():
+    with kb_session(CSV_PATH):
+        assert find_person("alcie")["match"] == "Alice"
+        assert find_person("Sofia")["match"] == "Sophia"
+        assert find_person("kevn")["match"] == "Kevin"
+        result = find_person("xyz")
+        assert result["match"] is None and not result["ambiguous"] and result["candidates"] == []
+        candidates = find_person("Ela", k=3)["candidates"]
+        assert candidates[0][0] == "Ella" and len(candidates) == 3
+
+def test_ambiguous_names_are_reported_not_guessed():
+    index = NameIndex(["Zoe", "Zoë", "Maria", "Marie", "Peter"])
+    assert index.ambiguous_names() == {"zoe": ("Zoe", "Zoë")}
+    result = index.find("ZOE")
+    assert result["match"] is None and result["ambiguous"]
+    assert sorted(result["candidates"]) == [("Zoe", 1.0), ("Zoë", 1.0)]
+    # "Mari" is as close to Maria as to Marie
+    result = index.find("Mari")
+    assert result["match"] is None and result["ambiguous"]
+    assert {name for name, _ in result["candidates"][:2]} == {"Maria", "Marie"}
+    assert index.find("Petr")["match"] == "Peter"
+
+def test_every_word_must_match_to_resolve():
+    index = NameIndex(["Anna Kovac", "Anna Kovacs", "Bob Smith"] + [f"Anna X{i:03d}" for i in range(20)])
+    result = index.find("Anna Mdqvac")
+    assert result["match"] is None and not result["ambiguous"]
+    assert result["candidates"][0][0] == "Anna Kovac"   # 0.70, clearly ahead of Anna Kovacs
+    assert NameIndex(["Anna Kovac", "Bob Smith"]).find("anna kovak")["match"] == "Anna Kovac"
+
+def test_posting_budget_applies_to_every_list(monkeypatch):
+    index = NameIndex([f"Ann{i:02d}" for i in range(30)])
+    monkeypatch.setattr(src.names, "MAX_POSTINGS", 10)
+    # Every trigram of "ann" is shared by all 30 names, more than the budget
+    assert index.candidates("ann") == []
+    assert index.find("Ann07")["match"] == "Ann07"
@@ -0,0 +1,80 @@
+import sys
+import os
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.graph import FamilyGraph
+from src.nearest import DEFAULT_WEIGHTS, closest_relatives
+from src.oracle import random_pedigree
+from src.queries import closest_relatives as closest_in_kb, kb_session
+from src.relations import siblings
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+class _CountingGraph(FamilyGraph):
+    """Counts the people whose neighbourhood was looked up."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.expanded = set()
+
+    def spouses(self, person):
+        self.expanded.add(person)
+        return super().spouses(person)
+
+def _bellman_ford(g, person, weights):
+    """Every distance from person, by relaxing every edge until nothing changes."""
+    edges = []
+    for y in g.names:
+        adopted = set(g.adoptive_parents(y)) | (set(g.children(y)) - set(g.biological_children(y)))
+        edges += [(y, x, weights["parent"]) for x in g.biological_parents(y)]
+        edges += [(y, x, weights["child"]) for x in g.biological_children(y)]
+        edges += [(y, x, weights["sibling"]) for x in siblings(g, y)]
+        edges += [(y, x, weights["spouse"]) for x in g.spouses(y)]
+        edges += [(y, x, weights["adoption"]) for x in adopted]
+    distance = {person: 0.0}
+    changed = True
+    while changed:
+        changed = False
+        for a, b, w in edges:
+            if a in distance and distance[a] + w < distance.get(b, float("inf")):
+                distance[b] = distance[a] + w
+                changed = True
+    del distance[person]
+    return distance
+
+def test_ranking_matches_shortest_paths_on_random_pedigrees():
+    weights = {**DEFAULT_WEIGHTS, "sibling": 0.5, "spouse": 2.5}
+    for seed in range(3):
+        g = FamilyGraph.from_dataframe(random_pedigree(seed, num_people=30))
+        for person in g.names[::7]:
+            expected = _bellman_ford(g, person, weights)
+            ranked = closest_relatives(g, person, len(g.names), {"sibling": 0.5, "spouse": 2.5})
+            assert dict(ranked) == pytest.approx(expected)
+            assert ranked == sorted(ranked, key=lambda r: (r[1], r[0]))
+            assert closest_relatives(g, person, 4, {"sibling": 0.5, "spouse": 2.5}) == ranked[:4]
+
+def test_search_stops_once_k_relatives_are_settled():
+    df = random_pedigree(1, num_people=10, adoption_rate=0, deep_generations=500)
+    g = _CountingGraph.from_dataframe(df)
+    last = df["Name"].iloc[-1]
+    assert [d for _, d in closest_relatives(g, last, 3)] == [1.0, 2.0, 3.0]
+    assert len(g.expanded) <= 4
+    with pytest.raises(ValueError):
+        closest_relatives(g, last, 3, {"cousin": 1.0})
+    with pytest.raises(ValueError):
+        closest_relatives(g, last, 3, {"spouse": 0})
+
+def test_helper_ranks_relatives_of_the_loaded_family():
+    with kb_session(CSV_PATH):
+        assert closest_in_kb("Liam", 3) == [("Ella", 1.0), ("Emily", 1.0), ("Emma", 1.0)]
+        assert closest_in_kb("Nobody", 3) == []
@@ -0,0 +1,145 @@
+import sys
+import os
+import random
+import threading
+import pytest
+import pandas as pd
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import row_facts
+from src.graph import FamilyGraph, current_graph
+from src.oracle import random_pedigree
+from src.overlay import Overlay, what_if
+from src.queries import kb_session, what_if as what_if_helper
+from src.relations import PERSON_RELATIONS
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _random_changes(df, rng, n):
+    """n random assertions and retractions of base facts of df."""
+    names = df["Name"].tolist()
+    facts = [fact for _, row in df.iterrows() for fact in row_facts(row)]
+    changes = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.4:
+            changes.append((False, rng.choice(facts)))
+        elif roll < 0.6:
+            changes.append((rng.random() < 0.7, (rng.choice(['is_male', 'is_female']), rng.choice(names))))
+        else:
+            predicate = rng.choice(['father', 'mother', 'adoptive_father', 'adoptive_mother', 'spouse'])
+            a, b = rng.sample(names, 2)
+            changes.append((True, (predicate, a, b)))
+    return changes
+
+def _rebuilt(df, changes):
+    """The family graph rebuilt from scratch with the changes applied to its facts."""
+    facts = {fact for _, row in df.iterrows() for fact in row_facts(row)}
+    for present, fact in changes:
+        if fact[0] == 'spouse':
+            variants = {fact, (fact[0], fact[2], fact[1])}
+            facts -= variants
+            if present:
+                facts |= variants
+        elif present:
+            facts.add(fact)
+        else:
+            facts.discard(fact)
+    # Gender facts are kept per predicate: a person may hold both, or neither
+    males = {f[1] for f in facts if f[0] == 'is_male'}
+    females = {f[1] for f in facts if f[0] == 'is_female'}
+
+    def pairs(predicate):
+        return [f[1:] for f in facts if f[0] == predicate]
+
+    graph = FamilyGraph({name: "Male" for name in males | females}, pairs('father'), pairs('mother'),
+                        pairs('adoptive_father'), pairs('adoptive_mother'), pairs('spouse'))
+    graph.is_male, graph.is_female = males.__contains__, females.__contains__
+    return graph
+
+def test_overlay_matches_a_rebuilt_family():
+    rng = random.Random(7)
+    for seed in range(6):
+        df = random_pedigree(seed, num_people=45, remarriage_rate=0.3, deep_generations=4)
+        base = FamilyGraph.from_dataframe(df)
+        changes = _random_changes(df, rng, 4)
+        overlay = Overlay(base)
+        for present, fact in changes:
+            (overlay.assert_fact if present else overlay.retract_fact)(*fact)
+        expected = _rebuilt(df, changes)
+        for relation, evaluate in PERSON_RELATIONS.items():
+            truth = {(x, y) for y in expected.names for x in evaluate(expected, y)}
+            before = {(x, y) for y in base.names for x in evaluate(base, y)}
+            diff = overlay.diff(relation)
+            assert set(diff["added"]) == truth - before, relation
+            assert set(diff["removed"]) == before - truth, relation
+            for y in rng.sample(expected.names, 5):
+                assert overlay.relatives(relation, y) == sorted(evaluate(expected, y)), (relation, y)
+
+def test_only_the_neighbourhood_is_recomputed():
+    # Two separate families: a change in one leaves the other alone
+    df = random_pedigree(2, num_people=30, adoption_rate=0)
+    other = random_pedigree(3, num_people=30, adoption_rate=0)
+    other["Name"] = "Q" + other["Name"]
+    for column in ("Father", "Mother"):
+        other[column] = other[column].where(other[column] == "", "Q" + other[column])
+    other["Spouses"] = other["Spouses"].apply(lambda s: ";".join("Q" + x for x in s.split(";") if x))
+    base = FamilyGraph.from_dataframe(pd.concat([df, other], ignore_index=True))
+    overlay = Overlay(base).assert_fact('spouse', 'P003', 'P010')
+    affected = overlay.affected_people('step_parent')
+    assert "P003" in affected and not any(name.startswith("Q") for name in affected)
+
+def test_overlays_leave_the_base_alone_and_run_concurrently():
+    with kb_session(CSV_PATH):
+        base = current_graph()
+        before = PERSON_RELATIONS['step_parent'](base, "Isla")
+        results = {}
+
+        def run(name, partner):
+            with what_if(base) as overlay:
+                overlay.assert_fact('spouse', name, partner)
+                results[partner] = overlay.compare('step_parent', "Isla")
+
+        threads = [threading.Thread(target=run, args=("Kevin", p)) for p in ("Ella", "Grace", "Zoe")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == {p: {"gained": [p], "lost": []} for p in ("Ella", "Grace", "Zoe")}
+        assert PERSON_RELATIONS['step_parent'](base, "Isla") == before
+
+        # If Isla were adopted by Tom, Tom's other children become her siblings
+        result = what_if_helper('sibling', 'Isla', [['adoptive_father', 'Tom', 'Isla']])
+        assert set(result["gained"]) == {"Daniel", "Ivy"} and result["lost"] == []
+        assert what_if_helper('spouse', 'Kevin', retract_facts=[['spouse', 'Kevin', 'Linda']])["lost"] == ["Linda"]
+
+def test_discard_and_validation():
+    with kb_session(CSV_PATH):
+        overlay = Overlay().retract_fact('spouse', 'Linda', 'Kevin')
+        assert overlay.holds('spouse', 'Kevin', 'Linda') is False
+        overlay.discard()
+        assert overlay.holds('spouse', 'Kevin', 'Linda') is True
+        overlay.assert_fact('is_female', 'Newborn').assert_fact('mother', 'Isla', 'Newborn')
+        assert overlay.relatives('daughter', 'Isla') == ['Newborn']
+        # Like PyDatalog, a second gender fact is added next to the first, not instead of it
+        overlay.assert_fact('is_male', 'Newborn')
+        assert overlay.relatives('son', 'Isla') == ['Newborn'] == overlay.relatives('daughter', 'Isla')
+        assert overlay.graph.gender_set('Newborn') == {"Male", "Female"}
+        overlay.retract_fact('is_female', 'Newborn')
+        assert overlay.relatives('daughter', 'Isla') == []
+        assert 'Newborn' in overlay.graph.names
+        with pytest.raises(ValueError):
+            overlay.assert_fact('sibling', 'Isla', 'Noah')
+        with pytest.raises(ValueError):
+            overlay.assert_fact('father', 'Isla')
+        with pytest.raises(ValueError):
+            overlay.relatives('nobody', 'Isla')
@@ -0,0 +1,82 @@
+import sys
+import os
+import io
+import json
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.cli import run_batch
+from src.pagination import iter_relation, page_relation
+from src.queries import kb_session
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _all_rows(relation):
+    answer = pyDatalog.ask(f'{relation}(X, Y)')
+    return sorted(set((str(r[0]), str(r[1])) for r in answer.answers)) if answer else []
+
+def test_iter_relation_matches_ask_in_sorted_order():
+    with kb_session(CSV_PATH):
+        for relation in ('sibling', 'cousin', 'aunt', 'step_parent'):
+            assert list(iter_relation(relation)) == _all_rows(relation)
+        assert list(iter_relation('sibling', [None, "Alice"], limit=2)) == [("Grace", "Alice"), ("Henry", "Alice")]
+        assert list(iter_relation('child', ["David", "John"])) == [("David", "John")]
+        assert list(iter_relation('is_female', limit=1)) == [("Alice",)]
+        with pytest.raises(ValueError):
+            list(iter_relation('sibling', ["Alice"]))
+
+def test_keyset_pages_cover_the_relation_once():
+    with kb_session(CSV_PATH):
+        expected = _all_rows('first_cousin')
+        for materialized in (False, True):
+            if materialized:
+                get_views()
+            pages, cursor = [], None
+            while True:
+                rows, cursor = page_relation('first_cousin', limit=7, after=cursor)
+                pages.extend(rows)
+                if cursor is None:
+                    break
+            assert pages == expected
+        assert list(iter_relation('sibling', offset=3, limit=2)) == _all_rows('sibling')[3:5]
+
+def test_generator_stops_evaluating_early(monkeypatch):
+    from src import pagination
+    evaluated = []
+    ask_rows = pagination._ask_rows
+
+    def counting_ask_rows(relation, args):
+        evaluated.append(args[0])
+        return ask_rows(relation, args)
+
+    monkeypatch.setattr(pagination, "_ask_rows", counting_ask_rows)
+    with kb_session(CSV_PATH):
+        # (cousin itself is read from the closure table, see src.closures)
+        assert next(iter_relation('first_cousin'))[0] == "Adam"
+        # Only the first person (alphabetically) was evaluated
+        assert evaluated == ["Adam"]
+        # With the second argument bound, the relation is asked once, not once per person
+        evaluated.clear()
+        assert list(iter_relation('first_cousin', [None, "Noah"]))
+        assert evaluated == [None]
+
+def test_cli_pagination():
+    lines = [json.dumps({"id": 1, "relation": "sibling", "args": [None, "Alice"], "limit": 4}),
+             json.dumps({"id": 2, "relation": "sibling", "args": [None, "Alice"], "limit": 4,
+                         "after": ["Layla", "Alice"]})]
+    out = io.StringIO()
+    with kb_session(CSV_PATH):
+        run_batch(lines, out)
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert first["results"] == ["Grace", "Henry", "Isla", "Layla"] and first["next"] == ["Layla", "Alice"]
+    assert second["results"] == ["Noah", "Ryan", "Zoe"] and second["next"] is None
@@ -0,0 +1,43 @@
+import sys
+import os
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.graph import current_graph
+from src.oracle import datalog_rows, pedigree_session, random_pedigree
+from src.profiles import kinship_profile as graph_profile
+from src.queries import kb_session, kinship_profile
+from src.rules import RELATION_ARITIES
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+PROFILED = [r for r, arity in RELATION_ARITIES.items() if arity == 2]
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _datalog_profiles():
+    """(y, x, relation) for every relation(x, y) answered by PyDatalog."""
+    return {(y, x, relation) for relation in PROFILED for x, y in datalog_rows(relation)}
+
+def test_profile_labels_every_relation_of_the_loaded_family():
+    with kb_session(CSV_PATH):
+        profile = kinship_profile("David")
+        assert "step_parent" in profile["Peter"]
+        assert list(profile) == sorted(profile)
+        assert kinship_profile("Nobody") == {}
+        g = current_graph()
+        found = {(y, x, r) for y in g.names for x, labels in graph_profile(g, y).items() for r in labels}
+        assert found == _datalog_profiles()
+
+def test_profiles_match_pydatalog_on_random_pedigrees():
+    for seed in range(3):
+        with pedigree_session(random_pedigree(seed, num_people=25, deep_generations=3)):
+            g = current_graph()
+            found = {(y, x, r) for y in g.names for x, labels in graph_profile(g, y).items() for r in labels}
+            assert found == _datalog_profiles()
@@ -0,0 +1,77 @@
+import sys
+import os
+import pandas as pd
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.queries import kb_session
+from src.reload import reload_facts
+from src.rules import RELATION_ARITIES
+from src.tables import register_tables, tables_from_dataframe
+from src.rules import define_family_rules
+from src.views import get_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _snapshot():
+    """Every row of every relation of the loaded knowledge base."""
+    snapshot = {}
+    for relation, arity in RELATION_ARITIES.items():
+        answer = pyDatalog.ask(f"{relation}({', '.join(f'Q{i}' for i in range(arity))})")
+        snapshot[relation] = set(tuple(str(v) for v in row) for row in answer.answers) if answer else set()
+    return snapshot
+
+def _edited_family(tmp_path):
+    df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False)
+    df.loc[df["Name"] == "Zoe", "Mother"] = "Grace"                       # changed parent link
+    df.loc[df["Name"] == "Ryan", "Notes"] = "Adoptive father of Kevin"    # new adoption
+    df = df[df["Name"] != "Noah"]                                         # removed person
+    df = pd.concat([df, pd.DataFrame([{"Name": "Maya", "Gender": "Female", "Father": "Adam",
+                                       "Mother": "Sarah", "Spouses": "", "Notes": ""}])])
+    path = tmp_path / "family_facts.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+def test_incremental_reload_matches_a_full_load(tmp_path):
+    edited = _edited_family(tmp_path)
+    with kb_session(edited):
+        expected = _snapshot()
+    with kb_session(CSV_PATH):
+        get_views()  # cached indexes must not go stale
+        report = reload_facts(edited)
+        assert not report["full_reload"]
+        assert report["added"] == ["Maya"] and report["removed"] == ["Noah"]
+        assert report["changed"] == ["Ryan", "Zoe"]
+        assert report["facts_asserted"] >= 4 and report["facts_retracted"] >= 2
+        assert _snapshot() == expected
+        assert "Maya" in get_views()['daughter'].firsts("Adam")
+        # Reloading the same file again changes nothing
+        again = reload_facts(edited)
+        assert (again["added"], again["removed"], again["changed"], again["facts_asserted"]) == ([], [], [], 0)
+
+def test_marriage_survives_while_one_partner_still_lists_it(tmp_path):
+    df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False)
+    df.loc[df["Name"] == "John", "Spouses"] = ""
+    path = tmp_path / "family_facts.csv"
+    df.to_csv(path, index=False)
+    with kb_session(CSV_PATH):
+        report = reload_facts(str(path))
+        assert report["changed"] == ["John"] and report["facts_retracted"] == 0
+        assert pyDatalog.ask('spouse("John", "Mary")')
+
+def test_full_load_when_no_csv_version_is_known():
+    pyDatalog.clear()
+    register_tables(tables_from_dataframe(load_facts_dataframe(CSV_PATH)))
+    define_family_rules()
+    report = reload_facts(CSV_PATH)
+    assert report["full_reload"] and len(report["added"]) == report["rows"]
+    assert reload_facts(CSV_PATH)["changed"] == []
@@ -0,0 +1,66 @@
+import sys
+import os
+import signal
+import gc
+import time
+import pandas as pd
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.server import PreforkServer, query_server
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+SMALL_FAMILY = pd.DataFrame([
+    {"Name": "Ann", "Gender": "Female", "Father": "", "Mother": "", "Spouses": "Bob", "Notes": ""},
+    {"Name": "Bob", "Gender": "Male", "Father": "", "Mother": "", "Spouses": "Ann", "Notes": ""},
+    {"Name": "Cid", "Gender": "Male", "Father": "Bob", "Mother": "Ann", "Spouses": "", "Notes": ""},
+    {"Name": "Dee", "Gender": "Female", "Father": "Bob", "Mother": "Ann", "Spouses": "", "Notes": ""},
+])
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="the server forks its workers")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _wait_for_restart(server, killed):
+    deadline = time.monotonic() + 10
+    while killed not in server.poll() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+def test_workers_serve_restart_and_swap_datasets():
+    server = PreforkServer(CSV_PATH, workers=2, hot_relations=['cousin'])
+    server.start()
+    try:
+        queries = [{"id": 1, "relation": "child", "args": [None, "John"]},
+                   {"id": 2, "helper": "is_aunt_or_uncle", "args": ["Olivia", "Kevin"]}]
+        results = query_server(server.address, queries)
+        assert results[0]["results"] == ["David", "Diana", "Emma"]
+        assert results[1]["results"] == [True, "aunt"]
+
+        killed = server.worker_pids[0]
+        os.kill(killed, signal.SIGKILL)
+        _wait_for_restart(server, killed)
+        assert server.restarts == 1 and killed not in server.worker_pids
+        assert len(server.worker_pids) == 2
+        assert query_server(server.address, queries[:1])[0]["results"] == ["David", "Diana", "Emma"]
+
+        old = server.worker_pids
+        server.swap(SMALL_FAMILY)
+        assert set(server.worker_pids).isdisjoint(old)
+        # Swapping releases the previous knowledge base instead of keeping it frozen
+        frozen = gc.get_freeze_count()
+        for _ in range(3):
+            server.swap()
+        assert gc.get_freeze_count() <= frozen + 50
+        assert query_server(server.address, [{"relation": "sibling", "args": [None, "Cid"]}])[0]["results"] == ["Dee"]
+        assert query_server(server.address, queries[:1])[0]["results"] == []
+    finally:
+        server.stop()
+    assert server.worker_pids == []
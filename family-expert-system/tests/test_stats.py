@@ -0,0 +1,58 @@
+import sys
+import os
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.graph import FamilyGraph, current_graph
+from src.oracle import pedigree_session, random_pedigree
+from src.queries import kb_session
+from src.relations import ancestors, descendants
+from src.stats import COLUMNS, current_person_stats, person_stats
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _datalog_others(query, name):
+    """Answers of a one-variable query, leaving out the person asked about."""
+    answer = pyDatalog.ask(query)
+    return len({str(row[0]) for row in answer.answers} - {name}) if answer else 0
+
+def test_stats_match_the_rules_on_the_loaded_family():
+    with kb_session(CSV_PATH):
+        table = current_person_stats().set_index("name")
+        assert list(table.reset_index().columns) == COLUMNS
+        # Mark is recorded as his own father, but neither side counts him as his own descendant
+        for name in ("David", "John", "Mark", "Zoe"):
+            row = table.loc[name]
+            assert row["num_descendants"] == _datalog_others(f'descendant(Q0, "{name}")', name)
+            assert row["num_step_children"] == _datalog_others(f'step_child(Q0, "{name}")', name)
+            assert row["num_marriages"] == _datalog_others(f'spouse("{name}", Q0)', name)
+
+def test_stats_match_the_graph_closures_on_random_pedigrees():
+    for seed in range(3):
+        with pedigree_session(random_pedigree(seed, num_people=40, deep_generations=12)):
+            graph = current_graph()
+            table = current_person_stats()
+            for row in table.itertuples():
+                assert row.num_descendants == len(descendants(graph, row.name) - {row.name})
+                assert row.num_ancestors == len(ancestors(graph, row.name) - {row.name})
+            assert table["generations_below"].max() == table["generation"].max() >= 12
+
+def test_branch_below_a_parent_cycle_is_counted():
+    # B and C are each other's father; A (son of B) and his son D hang off the cycle
+    graph = FamilyGraph({name: "Male" for name in "ABCD"},
+                        [("B", "A"), ("B", "C"), ("C", "B"), ("A", "D")], [], [], [], [])
+    table = person_stats(graph).set_index("name")
+    for name in ("A", "D"):
+        assert table.loc[name, "num_descendants"] == len(descendants(graph, name) - {name})
+    assert table.loc["B", "num_descendants"] == 3
+    assert table.loc["B", "generations_below"] == 2
+    assert list(table.loc[["A", "B", "C", "D"], "generation"]) == [1, 0, 1, 2]
+    assert table.loc["D", "num_ancestors"] == 2
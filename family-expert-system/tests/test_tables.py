@@ -0,0 +1,84 @@
+import sys
+import os
+import numpy as np
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe, register_pydatalog_facts
+from src.rules import define_family_rules
+from src.tables import tables_from_dataframe, save_tables, load_tables, register_tables, LOADED_TABLES_ATTRIBUTE
+from src.validation import validate_tables
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _answers(query):
+    result = pyDatalog.ask(query)
+    return sorted(set(tuple(str(v) for v in r) for r in result.answers)) if result else []
+
+def test_tables_from_dataframe_normalizes_spouses_and_adoptions():
+    tables = tables_from_dataframe(load_facts_dataframe(CSV_PATH))
+    assert len(tables["people"]["name"]) == 40
+    marriages = set(zip(tables["marriages"]["a"].tolist(), tables["marriages"]["b"].tolist()))
+    assert ("John", "Mary") in marriages and ("Mary", "John") not in marriages
+    adoptions = set(zip(tables["adoptions"]["parent"].tolist(), tables["adoptions"]["child"].tolist(),
+                        tables["adoptions"]["role"].tolist()))
+    assert adoptions == {("Anna", "Isla", "mother"), ("Daniel", "Zoe", "father")}
+
+def test_npz_round_trip_registers_same_facts_as_csv(tmp_path):
+    df = load_facts_dataframe(CSV_PATH)
+    pyDatalog.clear()
+    csv_summary = register_pydatalog_facts(df)
+    define_family_rules()
+    expected = {q: _answers(q) for q in ('parent(X, Y)', 'spouse(X, Y)', 'is_male(X)', 'step_cousin(X, Y)')}
+
+    path = str(tmp_path / "family_facts.npz")
+    save_tables(tables_from_dataframe(df), path)
+    summary = register_tables(load_tables(path))
+    define_family_rules()
+    for key, value in csv_summary.items():
+        assert summary[key] == value
+    for query, answers in expected.items():
+        assert _answers(query) == answers
+
+def test_person_can_adopt_several_children(tmp_path):
+    tables = tables_from_dataframe(load_facts_dataframe(CSV_PATH))
+    tables["adoptions"] = {
+        "parent": np.array(["Anna", "Anna"]),
+        "child": np.array(["Isla", "Noah"]),
+        "role": np.array(["mother", "mother"]),
+    }
+    path = str(tmp_path / "family_facts.npz")
+    save_tables(tables, path)
+    register_tables(load_tables(path))
+    define_family_rules()
+    assert _answers('adoptive_parent("Anna", Y)') == [("Isla",), ("Noah",)]
+
+def test_register_tables_validates_like_the_csv():
+    df = load_facts_dataframe(CSV_PATH)
+    tables = tables_from_dataframe(df)
+    shipped = len(df.attrs["validation"].issues)
+    assert len(validate_tables(tables).issues) == shipped
+    tables["parentage"] = {col: np.append(values, extra) for (col, values), extra in
+                           zip(tables["parentage"].items(), ("Mary", "John", "father"))}
+    tables["marriages"] = {col: np.append(values, extra) for (col, values), extra in
+                           zip(tables["marriages"].items(), ("Ghost", "Phantom", "", ""))}
+    # Mary as a father, and a marriage of two people without a people row
+    assert register_tables(tables)["num_issues"] == shipped + 2
+    with pytest.raises(ValueError, match="Invalid family tables"):
+        register_tables(tables, on_invalid="raise")
+
+    summary = register_tables(tables, on_invalid="quarantine")
+    define_family_rules()
+    assert summary["num_issues"] == shipped + 2
+    assert _answers('father(X, "John")') == []
+    assert _answers('spouse("Ghost", Y)') == []
+    assert validate_tables(getattr(pyDatalog.Logic(True), LOADED_TABLES_ATTRIBUTE)).ok
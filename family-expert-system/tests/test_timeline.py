@@ -0,0 +1,99 @@
+import sys
+import os
+import io
+import json
+import numpy as np
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.intervals import IntervalTree
+from src.cli import run_batch
+from src.queries import has_multiple_marriages, kb_session, relatives_as_of
+from src.tables import save_tables, tables_from_dataframe
+from src.timeline import FamilyTimeline
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _dated_tables():
+    """The shipped family, with Mary married to John until 1980 and to Peter from 1985."""
+    tables = tables_from_dataframe(load_facts_dataframe(CSV_PATH))
+    marriages = tables["marriages"]
+    starts, ends = marriages["start"].tolist(), marriages["end"].tolist()
+    for i, pair in enumerate(zip(marriages["a"].tolist(), marriages["b"].tolist())):
+        if pair == ("John", "Mary"):
+            starts[i], ends[i] = "1960-05-01", "1980-01-01"
+        elif pair == ("Mary", "Peter"):
+            starts[i] = "1985-03-10"
+    marriages["start"], marriages["end"] = np.array(starts), np.array(ends)
+    return tables
+
+def test_interval_tree_point_lookup():
+    tree = IntervalTree([(1, 5, "a"), (3, 9, "b"), (9, 12, "c"), (4, 4, "empty")])
+    assert sorted(tree.at(4)) == ["a", "b"]
+    assert tree.at(5) == ["b"]
+    assert tree.at(9) == ["c"]
+    assert tree.at(0) == [] and tree.at(12) == []
+    assert len(tree) == 3
+
+def test_undated_timeline_matches_rules():
+    timeline = FamilyTimeline(tables_from_dataframe(load_facts_dataframe(CSV_PATH)))
+    assert timeline.relatives("step_parent", "David") == ["Peter"]
+    assert timeline.relatives("step_sibling", "Oliver") == ["Emily", "James", "Liam", "Nora"]
+    assert timeline.relatives("mother_in_law", "Amir", as_of="2020-01-01") == ["Emily"]
+    assert timeline.multiple_marriages("Mary")
+
+def test_step_relations_follow_marriage_dates():
+    timeline = FamilyTimeline(_dated_tables())
+    assert timeline.spouses_at("Mary", "1970-01-01") == ("John",)
+    assert timeline.spouses_at("Mary", "1982-01-01") == ()
+    assert timeline.relatives("step_parent", "David", as_of="1970-01-01") == []
+    assert timeline.relatives("step_parent", "David", as_of="1990-01-01") == ["Peter"]
+    assert "Peter" not in timeline.relatives("step_grandparent", "Nora", as_of="1970-01-01")
+    assert "Peter" in timeline.relatives("step_grandparent", "Nora", as_of="1990-01-01")
+    assert timeline.relatives("daughter_in_law", "Peter", as_of="1970-01-01") == []
+    assert not timeline.multiple_marriages("Mary", as_of="1970-01-01")
+    assert timeline.multiple_marriages("Mary", as_of="1990-01-01")
+
+def test_adoption_dates_limit_adoptive_parents():
+    tables = _dated_tables()
+    tables["adoptions"]["start"] = np.array(["2015-01-01" if c == "Isla" else "" for c in tables["adoptions"]["child"]])
+    timeline = FamilyTimeline(tables)
+    assert "Anna" not in timeline.snapshot("2010-01-01").parents("Isla")
+    assert "Anna" in timeline.snapshot("2016-01-01").parents("Isla")
+
+def test_unsupported_relation_raises():
+    timeline = FamilyTimeline(_dated_tables())
+    with pytest.raises(ValueError):
+        timeline.relatives("ancestor", "David", as_of="1990-01-01")
+
+def test_as_of_helpers_and_cli(tmp_path):
+    path = str(tmp_path / "dated.npz")
+    save_tables(_dated_tables(), path)
+    lines = [json.dumps({"id": 1, "relation": "step_parent", "args": [None, "David"], "as_of": "1970-01-01"}),
+             json.dumps({"id": 2, "relation": "step_parent", "args": ["Peter", "David"], "as_of": "1990-01-01"}),
+             json.dumps({"id": 3, "helper": "has_multiple_marriages", "args": ["Mary", "1970-01-01"]}),
+             json.dumps({"id": 4, "relation": "step_parent", "args": ["Peter", None], "as_of": "1990-01-01"})]
+    out = io.StringIO()
+    with kb_session(path):
+        assert relatives_as_of("step_parent", "David", "1970-01-01") == []
+        assert relatives_as_of("step_parent", "David", "1990-01-01") == ["Peter"]
+        assert relatives_as_of("step_parent", "David") == ["Peter"]
+        assert has_multiple_marriages("Mary") and not has_multiple_marriages("Mary", "1970-01-01")
+        run_batch(lines, out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert results[0]["results"] == [] and results[1]["results"] is True
+    assert results[2]["results"] is False
+    assert not results[3]["ok"] and "second one bound" in results[3]["error"]
+    # Facts loaded from the CSV have no dates: every marriage counts
+    with kb_session(CSV_PATH):
+        assert relatives_as_of("step_parent", "David", "1970-01-01") == ["Peter"]
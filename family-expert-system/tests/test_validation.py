@@ -0,0 +1,78 @@
+import sys
+import os
+import pytest
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_dataframe
+from src.validation import validate_facts, quarantine_facts, _strongly_connected_components
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def _found(report):
+    return sorted(zip(report.issues["name"], report.issues["kind"], report.issues["column"], report.issues["value"]))
+
+def test_shipped_data_issues_are_reported():
+    df = load_facts_dataframe(CSV_PATH)
+    report = df.attrs["validation"]
+    assert _found(report) == [("Emma", "dangling_reference", "Spouses", "Alex"),
+                              ("Mark", "self_reference", "Father", "Mark")]
+    # Reporting keeps every record
+    assert df.loc[df["Name"] == "Mark", "Father"].item() == "Mark"
+    with pytest.raises(ValueError):
+        load_facts_dataframe(CSV_PATH, on_invalid="raise")
+
+def test_quarantine_removes_offending_references():
+    df = load_facts_dataframe(CSV_PATH, on_invalid="quarantine")
+    assert df.loc[df["Name"] == "Mark", "Father"].item() == ""
+    assert df.loc[df["Name"] == "Mark", "Mother"].item() == "Diana"
+    assert df.loc[df["Name"] == "Emma", "Spouses"].item() == "Paul"
+    assert len(df) == 40
+    assert validate_facts(df).ok
+
+def test_cycles_gender_and_duplicates():
+    df = load_facts_dataframe(CSV_PATH, on_invalid="ignore")
+    df.loc[df["Name"] == "John", "Father"] = "Adam"      # John -> David -> Paul -> James -> Adam -> John
+    df.loc[df["Name"] == "Ivy", "Mother"] = "Daniel"     # a male mother
+    df.loc[df["Name"] == "Anna", "Notes"] = "Adoptive father of Isla"
+    df.loc[len(df)] = ["Ryan", "Male", "", "", "", ""]
+    report = validate_facts(df)
+    counts = report.counts()
+    assert counts["duplicate_name"] == 2
+    assert counts["gender_inconsistent"] == 2
+    cycle_children = set(report.of_kind("cycle")["name"])
+    assert cycle_children == {"John", "David", "Emma", "Paul", "Emily", "James", "Adam"}
+    cleaned = quarantine_facts(df, report)
+    assert (cleaned["Name"] == "Ryan").sum() == 1
+    assert validate_facts(cleaned).counts()["cycle"] == 0
+
+def test_quarantined_genders_revalidate():
+    df = load_facts_dataframe(CSV_PATH, on_invalid="ignore")
+    df.loc[df["Name"] == "John", "Gender"] = "M"        # John is David's father
+    df.loc[df["Name"] == "Zoe", "Gender"] = "unknown"
+    report = validate_facts(df)
+    assert report.counts()["invalid_gender"] == 2
+    cleaned = quarantine_facts(df, report)
+    assert cleaned.loc[cleaned["Name"] == "John", "Gender"].item() == ""
+    assert cleaned.loc[cleaned["Name"] == "David", "Father"].item() == ""
+    assert validate_facts(cleaned).ok
+
+def test_unknown_parent_gender_is_not_inconsistent():
+    df = load_facts_dataframe(CSV_PATH, on_invalid="quarantine")
+    df.loc[df["Name"] == "John", "Gender"] = ""         # John is David's father
+    report = validate_facts(df)
+    assert report.ok
+    assert quarantine_facts(df, report).loc[lambda d: d["Name"] == "David", "Father"].item() == "John"
+
+def test_tarjan_handles_long_chains():
+    chain = [(i, i + 1) for i in range(20000)] + [(20000, 0)]
+    components = _strongly_connected_components(chain)
+    assert len(components) == 1 and len(components[0]) == 20001
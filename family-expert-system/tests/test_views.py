@@ -0,0 +1,64 @@
+import sys
+import os
+from pyDatalog import pyDatalog
+
+# Add the project root to sys.path for direct execution
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.facts import load_facts_into_pydatalog
+from src.rules import define_family_rules
+from src.views import RelationView, get_views, materialize_views
+
+# CSV path (relative to repo root)
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "family_facts.csv")
+
+def teardown_module(module):
+    pyDatalog.clear()
+
+def test_relation_view_is_sorted_deduplicated_and_indexed_both_ways():
+    view = RelationView('sibling', [('B', 'A'), ('A', 'B'), ('A', 'B'), ('C', 'A'), ('A', 'C')])
+    assert view.pairs == (('A', 'B'), ('A', 'C'), ('B', 'A'), ('C', 'A'))
+    assert view.seconds('A') == ('B', 'C')
+    assert view.firsts('A') == ('B', 'C')
+    assert view.firsts('Nobody') == ()
+    assert ('C', 'A') in view and ('B', 'C') not in view
+    assert view.canonical_pairs == (('A', 'B'), ('A', 'C'))
+
+def test_views_match_pydatalog_answers():
+    pyDatalog.clear()
+    load_facts_into_pydatalog(CSV_PATH)
+    define_family_rules()
+    views = materialize_views(['son', 'step_cousin'])
+    sons = pyDatalog.ask('son(X, Y)')
+    assert list(views['son'].pairs) == sorted(set((str(r[0]), str(r[1])) for r in sons.answers))
+    step_cousins = pyDatalog.ask('step_cousin(X, "Grace")')
+    assert list(views['step_cousin'].firsts('Grace')) == sorted(set(str(r[0]) for r in step_cousins.answers))
+
+def test_get_views_is_cached_until_clear():
+    pyDatalog.clear()
+    load_facts_into_pydatalog(CSV_PATH)
+    define_family_rules()
+    views = get_views()
+    assert get_views() is views
+    assert views['sibling'].firsts('Alice') == ('Grace', 'Henry', 'Isla', 'Layla', 'Noah', 'Ryan', 'Zoe')
+
+    pyDatalog.clear()
+    load_facts_into_pydatalog(CSV_PATH)
+    define_family_rules()
+    assert get_views() is not views
+
+def test_symmetric_relations_are_stored_once():
+    view = RelationView('spouse', [('B', 'A'), ('A', 'B'), ('C', 'A')])
+    assert view.canonical_pairs == (('A', 'B'), ('A', 'C'))
+    assert len(view) == 4
+    assert list(view.iter_pairs(after=('A', 'B'))) == [('A', 'C'), ('B', 'A'), ('C', 'A')]
+
+    pyDatalog.clear()
+    load_facts_into_pydatalog(CSV_PATH)
+    define_family_rules()
+    spouses = pyDatalog.ask('spouse(X, Y)').answers
+    view = RelationView('spouse', ((str(a), str(b)) for a, b in spouses))
+    assert len(view.canonical_pairs) == 16 and len(spouses) == 32
+    assert sorted((str(a), str(b)) for a, b in spouses) == list(view.pairs)